@@ -1,4 +1,5 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
 import environ
 
@@ -41,8 +42,23 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Removes itself unless PROFILING_ENABLED
+    "core.profiling.ProfilingMiddleware",
 ]
 
+# API_ONLY=1 for autoscaled API workers: no admin (or the messages it
+# uses) and no schema generation, so none of it is imported at startup.
+# The OpenAPI document is served prebuilt (see OPENAPI_SCHEMA_FILE).
+API_ONLY = env.bool("API_ONLY", default=False)
+if API_ONLY:
+    ADMIN_ONLY_APPS = [
+        "django.contrib.admin",
+        "django.contrib.messages",
+        "drf_spectacular",
+    ]
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
+    MIDDLEWARE.remove("django.contrib.messages.middleware.MessageMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -91,7 +107,115 @@ STATIC_URL = "static/"
 # 9. Default Primary Key Field Type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-# 10. DRF Configuration
+# 10. Admin
+# Unfiltered changelists on tables at least this big show the planner's row
+# estimate instead of running COUNT(*). 0 always counts exactly.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=10000
+)
+
+# 11. Embeddings
+# Dotted path to the embedder class (see core/embeddings.py). Switching it
+# makes `manage.py update_embeddings` re-embed every row.
+EMBEDDER = env("EMBEDDER", default="core.embeddings.HashingEmbedder")
+
+# 12. Cache
+# e.g. CACHE_URL=rediscache://localhost:6379/1 (see docker-compose)
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+# Coalesced list responses (core/cache.py `coalesced`): served without
+# recomputing for SOFT seconds, served stale while one request refreshes them
+# until HARD seconds. Concurrent misses wait up to WAIT seconds for the one
+# request computing the entry (whose lock expires after LOCK seconds).
+CACHE_SOFT_TTL = env.int("CACHE_SOFT_TTL", default=30)
+CACHE_HARD_TTL = env.int("CACHE_HARD_TTL", default=600)
+CACHE_WAIT_TIMEOUT = 10
+CACHE_LOCK_TIMEOUT = 30
+# Formats whose cached responses are stored rendered and compressed (br,
+# zstd, gzip) when computed, so hits are sent without any per-request work.
+# Bodies under COMPRESSION_MIN_SIZE bytes are stored uncompressed.
+CACHE_COMPRESSED_FORMATS = env.list(
+    "CACHE_COMPRESSED_FORMATS", default=["json", "msgpack"]
+)
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+
+# 13. Change Events (see core/events.py)
+# Redis for pub/sub and the replay buffer, and for the throttle buckets.
+# Events and throttling are disabled when unset.
+REDIS_URL = env("REDIS_URL", default="")
+# Events kept for Last-Event-ID resume; older clients get a "reset" event
+EVENTS_REPLAY_SIZE = env.int("EVENTS_REPLAY_SIZE", default=1000)
+# Comment frames on idle streams, so proxies don't close them
+EVENTS_HEARTBEAT_SECONDS = env.float("EVENTS_HEARTBEAT_SECONDS", default=15)
+EVENTS_RETRY_MS = 3000
+
+# 14. OpenAPI
+# Built at deploy time and served as is by /api/schema/:
+#   manage.py spectacular --format openapi-json --file openapi.json
+# Without the file the schema is generated per request (not in API_ONLY).
+OPENAPI_SCHEMA_FILE = Path(
+    env("OPENAPI_SCHEMA_FILE", default=str(BASE_DIR / "openapi.json"))
+)
+# Cold start budgets checked by `manage.py bench_startup` (in CI)
+STARTUP_IMPORT_BUDGET_MS = env.float("STARTUP_IMPORT_BUDGET_MS", default=1200)
+STARTUP_FIRST_RESPONSE_BUDGET_MS = env.float(
+    "STARTUP_FIRST_RESPONSE_BUDGET_MS", default=2000
+)
+
+# 15. Request Profiling (see core/profiling.py)
+# Off: the middleware isn't loaded at all. On: requests with a signed
+# X-Profile header (`manage.py profile_token`), staff requests with
+# ?profile=1 and a PROFILING_SAMPLE_RATE fraction of all requests are
+# profiled; captures are listed in the admin.
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=False)
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_INTERVAL_MS = env.float("PROFILING_INTERVAL_MS", default=1)
+PROFILING_TOKEN_MAX_AGE = env.int("PROFILING_TOKEN_MAX_AGE", default=3600)
+PROFILING_KEEP = env.int("PROFILING_KEEP", default=500)
+
+# 16. Slow Queries (see core/slow_queries.py)
+# Statements slower than this are aggregated per fingerprint in the admin
+# ("Slow queries"). 0 disables the recorder entirely.
+SLOW_QUERY_MS = env.float("SLOW_QUERY_MS", default=0)
+# Per fingerprint, re-run under EXPLAIN (ANALYZE, BUFFERS) at most this often
+SLOW_QUERY_EXPLAIN_INTERVAL = env.int("SLOW_QUERY_EXPLAIN_INTERVAL", default=3600)
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 10000
+# Sequential scans of tables at least this big are flagged
+SLOW_QUERY_LARGE_TABLE_ROWS = env.int("SLOW_QUERY_LARGE_TABLE_ROWS", default=10000)
+
+# 17. Query Budgets (see core/budgets.py)
+# Per-view limits on query count, statement time and total database time,
+# declared on the views. Over budget: 503/504 with this Retry-After.
+QUERY_BUDGETS_ENABLED = env.bool("QUERY_BUDGETS_ENABLED", default=True)
+QUERY_BUDGET_RETRY_AFTER = env.int("QUERY_BUDGET_RETRY_AFTER", default=5)
+
+# 18. DRF Configuration
+# Token buckets per client, shared by all workers (see core/throttling.py):
+# "expensive" is search and combined filters, "cheap" everything else.
+THROTTLE_ENABLED = env.bool("THROTTLE_ENABLED", default=True)
+
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        # Binary formats (Accept: application/msgpack or application/cbor)
+        *[
+            renderer
+            for module, renderer in [
+                ("msgpack", "core.renderers.MessagePackRenderer"),
+                ("cbor2", "core.renderers.CBORRenderer"),
+            ]
+            if find_spec(module)
+        ],
+    ],
+    "DEFAULT_THROTTLE_CLASSES": ["core.throttling.TokenBucketThrottle"],
+    # Proxies in front of the app that append to X-Forwarded-For. With 0 the
+    # client IP is REMOTE_ADDR: the header is the client's to forge
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+    "DEFAULT_THROTTLE_RATES": {
+        "cheap": env("THROTTLE_CHEAP_RATE", default="1200/min"),
+        "expensive": env("THROTTLE_EXPENSIVE_RATE", default="60/min"),
+    },
 }
+if not API_ONLY:
+    # Resolved by the router's views: API workers never import drf_spectacular
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
@@ -1,5 +1,15 @@
+import json
+
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
 from django.db.models import Prefetch
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from . import profiling
+from .admin_tools import AutocompleteFilter, CodeSearchFilter, PerformanceAdminMixin
 from .models import (
     Category,
     Competency,
@@ -7,9 +17,22 @@ from .models import (
     Artifact,
     ArtifactCompetency,
     CommitCodeReference,
+    Technology,
+    RequestProfile,
+    SlowQuery,
 )
 
 
+class ArtifactAdminForm(forms.ModelForm):
+    class Meta:
+        model = Artifact
+        fields = "__all__"
+
+    def clean_tech_stack(self):
+        # Reuse the dictionary's spelling so "python" doesn't fork "Python"
+        return Technology.objects.canonicalize(self.cleaned_data["tech_stack"])
+
+
 class TechStackFilter(admin.SimpleListFilter):
     """Custom filter for ArrayField tech_stack"""
 
@@ -17,13 +40,11 @@ class TechStackFilter(admin.SimpleListFilter):
     parameter_name = "tech_stack"
 
     def lookups(self, request, model_admin):
-        # Optimized: Get distinct values faster
-        artifacts = model_admin.model.objects.values_list("tech_stack", flat=True)
-        unique_tags = set()
-        for stack in artifacts:
-            if stack:  # Guard against None/Empty
-                unique_tags.update(stack)
-        return sorted([(tag, tag) for tag in unique_tags])
+        # One index scan over the maintained dictionary, not every artifact row
+        names = Technology.objects.filter(artifact_count__gt=0).values_list(
+            "name", flat=True
+        )
+        return [(name, name) for name in names]
 
     def queryset(self, request, queryset):
         if self.value():
@@ -46,7 +67,7 @@ class SubCompetencyInline(admin.TabularInline):
 
 
 @admin.register(Competency)
-class CompetencyAdmin(admin.ModelAdmin):
+class CompetencyAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "category",
@@ -56,14 +77,15 @@ class CompetencyAdmin(admin.ModelAdmin):
         "portfolio_highlight",
     )
     list_filter = (
-        "category",
+        ("category", AutocompleteFilter),
         "competency_type",
         "proficiency",
         "showcase_priority",
         "portfolio_highlight",
     )
     search_fields = ("name", "summary")
-    filter_horizontal = ("related_competencies",)
+    autocomplete_fields = ("category", "related_competencies")
+    list_defer = ("summary", "summary_html", "history", "tags")
     inlines = [SubCompetencyInline]
 
     fieldsets = (
@@ -86,16 +108,25 @@ class CompetencyAdmin(admin.ModelAdmin):
 
 
 @admin.register(SubCompetency)
-class SubCompetencyAdmin(admin.ModelAdmin):
+class SubCompetencyAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("name", "parent", "display_order")
-    list_filter = ("parent",)
+    list_filter = (("parent", AutocompleteFilter),)
+    list_select_related = ("parent",)
     search_fields = ("name", "desc")
-    filter_horizontal = ("code_references",)
+    autocomplete_fields = ("parent", "code_references")
+    list_defer = (
+        "desc",
+        "desc_html",
+        "parent__summary",
+        "parent__summary_html",
+        "parent__history",
+        "parent__tags",
+    )
     ordering = ("parent", "display_order")
 
 
 @admin.register(CommitCodeReference)
-class CommitCodeReferenceAdmin(admin.ModelAdmin):
+class CommitCodeReferenceAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         "file_path",
         "commit_hash_short",
@@ -103,8 +134,9 @@ class CommitCodeReferenceAdmin(admin.ModelAdmin):
         "line_range",
         "created_at",
     )
-    list_filter = ("language", "repository")
-    search_fields = ("file_path", "commit_hash", "cached_snippet")
+    list_filter = ("language", "repository", CodeSearchFilter)
+    search_fields = ("file_path", "commit_hash")
+    list_defer = ("cached_snippet",)
     readonly_fields = ("created_at", "updated_at", "github_url", "raw_url")
 
     fieldsets = (
@@ -123,6 +155,13 @@ class CommitCodeReferenceAdmin(admin.ModelAdmin):
         ("Timestamps", {"fields": ("created_at", "updated_at")}),
     )
 
+    def get_search_fields(self, request):
+        # Snippet search is opt-in (see CodeSearchFilter); it's served by the
+        # trigram index on UPPER(cached_snippet)
+        if request.GET.get(CodeSearchFilter.parameter_name) == "1":
+            return (*self.search_fields, "cached_snippet")
+        return self.search_fields
+
     def commit_hash_short(self, obj):
         return obj.commit_hash[:7]
 
@@ -142,8 +181,21 @@ class ArtifactCompetencyInline(admin.TabularInline):
     autocomplete_fields = ("competency",)
 
 
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ("name", "artifact_count", "competency_count")
+    search_fields = ("name",)
+    ordering = ("-artifact_count", "name")
+    readonly_fields = ("name", "key", "artifact_count", "competency_count")
+
+    def has_add_permission(self, request):
+        # Rows are created by the write hooks, not by hand
+        return False
+
+
 @admin.register(Artifact)
-class ArtifactAdmin(admin.ModelAdmin):
+class ArtifactAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    form = ArtifactAdminForm
     list_display = (
         "title",
         "status",
@@ -156,6 +208,7 @@ class ArtifactAdmin(admin.ModelAdmin):
     search_fields = ("title", "description")
     date_hierarchy = "date_created"
     readonly_fields = ("date_created", "last_updated")
+    list_defer = ("description", "description_html")
     inlines = [ArtifactCompetencyInline]
 
     fieldsets = (
@@ -198,7 +251,9 @@ class ArtifactAdmin(admin.ModelAdmin):
         return qs.prefetch_related(
             Prefetch(
                 "artifactcompetency_set",
-                queryset=ArtifactCompetency.objects.select_related("competency"),
+                queryset=ArtifactCompetency.objects.select_related("competency").only(
+                    "artifact", "role", "competency__name"
+                ),
             )
         )
 
@@ -216,3 +271,170 @@ class ArtifactAdmin(admin.ModelAdmin):
         return ", ".join(primaries[:3])
 
     primary_competencies_list.short_description = "Primary Tech"
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    """Captures from profiling.py: read-only, with flamegraph downloads."""
+
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "status_code",
+        "duration",
+        "sample_count",
+        "trigger",
+        "username",
+        "downloads",
+    )
+    list_filter = ("trigger", "method", "status_code")
+    search_fields = ("path", "query_string")
+    list_defer = ("stacks",)
+    readonly_fields = ("downloads",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/speedscope/",
+                self.admin_site.admin_view(self.download_speedscope),
+                name="core_requestprofile_speedscope",
+            ),
+            path(
+                "<int:pk>/collapsed/",
+                self.admin_site.admin_view(self.download_collapsed),
+                name="core_requestprofile_collapsed",
+            ),
+            *super().get_urls(),
+        ]
+
+    def get_profile(self, request, pk):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        return get_object_or_404(RequestProfile, pk=pk)
+
+    def download_speedscope(self, request, pk):
+        profile = self.get_profile(request, pk)
+        response = JsonResponse(profiling.speedscope(profile))
+        response["Content-Disposition"] = (
+            f'attachment; filename="profile-{pk}.speedscope.json"'
+        )
+        return response
+
+    def download_collapsed(self, request, pk):
+        profile = self.get_profile(request, pk)
+        response = HttpResponse(profile.stacks, content_type="text/plain")
+        response["Content-Disposition"] = f'attachment; filename="profile-{pk}.txt"'
+        return response
+
+    def duration(self, obj):
+        return f"{obj.duration_ms:.1f} ms"
+
+    duration.short_description = "Duration"
+    duration.admin_order_field = "duration_ms"
+
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">speedscope</a> · <a href="{}">collapsed</a>',
+            reverse("admin:core_requestprofile_speedscope", args=[obj.pk]),
+            reverse("admin:core_requestprofile_collapsed", args=[obj.pk]),
+        )
+
+    downloads.short_description = "Flamegraph"
+
+
+class SeqScanFilter(admin.SimpleListFilter):
+    title = "Sequential scans"
+    parameter_name = "seq_scan"
+
+    def lookups(self, request, model_admin):
+        return [("yes", "On large tables"), ("no", "None")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.exclude(seq_scan_tables=[])
+        if self.value() == "no":
+            return queryset.filter(seq_scan_tables=[])
+        return queryset
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    """Top offenders from slow_queries.py, worst total time first."""
+
+    list_display = (
+        "statement",
+        "calls",
+        "mean",
+        "max",
+        "total",
+        "seq_scans",
+        "last_seen",
+    )
+    list_filter = (SeqScanFilter,)
+    search_fields = ("sql", "seq_scan_tables")
+    ordering = ("-total_ms",)
+    list_defer = ("plan",)
+    fields = (
+        "fingerprint",
+        "sql",
+        "calls",
+        "mean",
+        "max",
+        "total",
+        "first_seen",
+        "last_seen",
+        "seq_scan_tables",
+        "plan_captured_at",
+        "formatted_plan",
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def statement(self, obj):
+        return obj.sql if len(obj.sql) <= 120 else obj.sql[:119] + "…"
+
+    def mean(self, obj):
+        return f"{obj.mean_ms:.1f} ms"
+
+    mean.short_description = "Mean"
+
+    def max(self, obj):
+        return f"{obj.max_ms:.1f} ms"
+
+    max.short_description = "Max"
+    max.admin_order_field = "max_ms"
+
+    def total(self, obj):
+        return f"{obj.total_ms / 1000:.1f} s"
+
+    total.short_description = "Total"
+    total.admin_order_field = "total_ms"
+
+    def seq_scans(self, obj):
+        if not obj.seq_scan_tables:
+            return "—"
+        return format_html(
+            '<strong style="color: #ba2121">{}</strong>',
+            ", ".join(obj.seq_scan_tables),
+        )
+
+    seq_scans.short_description = "Seq scans"
+
+    def formatted_plan(self, obj):
+        if obj.plan is None:
+            return "—"
+        return format_html("<pre>{}</pre>", json.dumps(obj.plan, indent=2))
+
+    formatted_plan.short_description = "EXPLAIN (ANALYZE, BUFFERS)"
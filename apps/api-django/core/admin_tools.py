@@ -0,0 +1,151 @@
+"""
+Building blocks that keep admin changelists fast on large tables:
+estimated counts, autocomplete-backed filters and lean list querysets.
+"""
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model):
+    """
+    Planner statistics from pg_class (kept fresh by autovacuum/ANALYZE).
+    Returns None if the table has never been analyzed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Skips COUNT(*) for unfiltered changelists on big tables and uses the
+    planner's row estimate instead. Filtered/searched lists are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        queryset = self.object_list
+        if threshold and not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Relation filter rendered as an autocomplete <select> backed by the admin's
+    autocomplete view, instead of one link per related row.
+
+    Usage: list_filter = (("parent", AutocompleteFilter),)
+    The related model's admin must define search_fields.
+    """
+
+    template = "admin/core/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+        remote_model = field.remote_field.model
+        self.form_field = forms.ModelChoiceField(
+            queryset=remote_model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    @property
+    def lookup_value(self):
+        value = self.used_parameters.get(self.lookup_kwarg)
+        if isinstance(value, list):
+            value = value[-1] if value else None
+        return value
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        return {}
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(
+            name=self.lookup_kwarg,
+            value=self.lookup_value,
+            attrs={"id": f"filter_{self.lookup_kwarg}"},
+        )
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.lookup_value is None,
+            "query_string": changelist.get_query_string(remove=[self.lookup_kwarg]),
+            "display": "All",
+            # The filter script swaps the placeholder for the chosen id
+            "filter_url": changelist.get_query_string(
+                {self.lookup_kwarg: "__value__"}, remove=["p"]
+            ),
+        }
+
+
+class PerformanceAdminMixin:
+    """
+    ModelAdmin defaults for big tables:
+    - estimated counts for unfiltered lists (no "N total" COUNT(*) either)
+    - `list_defer`: large columns skipped on changelist/autocomplete queries
+    - widget media for AutocompleteFilter list filters
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_defer = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match else ""
+        if self.list_defer and (
+            url_name.endswith("_changelist") or url_name == "autocomplete"
+        ):
+            queryset = queryset.defer(*self.list_defer)
+        return queryset
+
+    @property
+    def media(self):
+        media = super().media
+        if any(
+            isinstance(spec, tuple) and issubclass(spec[1], AutocompleteFilter)
+            for spec in self.list_filter
+        ):
+            media += AutocompleteSelect(None, self.admin_site).media
+            media += forms.Media(
+                js=["admin/js/jquery.init.js", "core/admin/autocomplete_filter.js"]
+            )
+        return media
+
+
+class CodeSearchFilter(admin.SimpleListFilter):
+    """
+    Opt-in switch for searching inside cached code snippets.
+    The search itself happens in the admin's get_search_fields().
+    """
+
+    title = "Search scope"
+    parameter_name = "search_code"
+
+    def lookups(self, request, model_admin):
+        return [("1", "Include code snippets")]
+
+    def queryset(self, request, queryset):
+        return queryset
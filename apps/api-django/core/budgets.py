@@ -0,0 +1,157 @@
+"""
+Per-endpoint database budgets, so one pathological request (say, a search
+that can't use an index) fails fast instead of holding a connection, and a
+pgbouncer slot, for seconds.
+
+Views declare them with QueryBudgetMixin, per action or as a default:
+
+    query_budget = QueryBudget(max_queries=20, statement_timeout_ms=3000)
+    query_budgets = {"list": QueryBudget(max_queries=12, db_time_ms=3000)}
+
+- max_queries: the next statement is refused (503).
+- statement_timeout_ms: the request runs in a transaction with
+  SET LOCAL statement_timeout; Postgres cancels the statement (504).
+- db_time_ms: total time in the database; checked after each statement (504).
+
+Both statuses carry Retry-After (QUERY_BUDGET_RETRY_AFTER) and are counted in
+/api/metrics/ as "budget:<reason>" per view and action.
+"""
+
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import metrics
+
+# SQLSTATE for a statement cancelled by statement_timeout (or a cancel request)
+QUERY_CANCELED = "57014"
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: int | None = None
+    statement_timeout_ms: int | None = None
+    db_time_ms: float | None = None
+
+
+class QueryBudgetExceeded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "This request needs more database work than it is allowed."
+    default_code = "query_budget_exceeded"
+
+    def __init__(self, reason):
+        super().__init__()
+        self.reason = reason
+        # DRF's exception handler turns `wait` into Retry-After
+        self.wait = settings.QUERY_BUDGET_RETRY_AFTER
+
+
+class QueryTimeout(QueryBudgetExceeded):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = "The database took too long to answer this request."
+    default_code = "query_timeout"
+
+
+class BudgetGuard:
+    """Execute wrapper enforcing one QueryBudget on a connection."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.queries = 0
+        self.db_time_ms = 0.0
+        self.previous_timeout = None
+        self.cancelled = False
+
+    def __call__(self, execute, sql, params, many, context):
+        budget = self.budget
+        if budget.max_queries is not None and self.queries >= budget.max_queries:
+            raise QueryBudgetExceeded("queries")
+        if budget.statement_timeout_ms and self.previous_timeout is None:
+            self.set_timeout(context["cursor"])
+        self.queries += 1
+
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        except OperationalError as exc:
+            if getattr(exc.__cause__, "sqlstate", None) == QUERY_CANCELED:
+                self.cancelled = True  # The transaction is aborted
+                raise QueryTimeout("statement_timeout") from exc
+            raise
+        finally:
+            self.db_time_ms += (time.perf_counter() - started) * 1000
+        if budget.db_time_ms is not None and self.db_time_ms > budget.db_time_ms:
+            raise QueryTimeout("db_time")
+        return result
+
+    def set_timeout(self, cursor):
+        # Issued with the first statement, so requests served from the cache
+        # don't pay for it. On the raw cursor: not a query of the request.
+        cursor.cursor.execute(
+            "SELECT current_setting('statement_timeout'),"
+            " set_config('statement_timeout', %s, true)",
+            [f"{self.budget.statement_timeout_ms}ms"],
+        )
+        self.previous_timeout = cursor.cursor.fetchone()[0]
+
+    def restore_timeout(self, connection):
+        if self.previous_timeout is not None and not self.cancelled:
+            with connection.cursor() as cursor:
+                cursor.cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    [self.previous_timeout],
+                )
+
+
+class QueryBudgetMixin:
+    """
+    Enforces `query_budgets[action]` (else `query_budget`) on each request.
+    With a statement timeout, the request runs in a transaction that is
+    rolled back if the view fails, as with ATOMIC_REQUESTS. Inside an
+    enclosing transaction (ATOMIC_REQUESTS, tests) it joins that one instead,
+    and puts the previous timeout back afterwards.
+    """
+
+    query_budget = None
+    query_budgets = {}
+
+    def get_query_budget(self, request):
+        if not settings.QUERY_BUDGETS_ENABLED:
+            return None
+        # dispatch() hasn't set self.action yet
+        action_map = getattr(self, "action_map", {})
+        action = action_map.get(request.method.lower())
+        return self.query_budgets.get(action, self.query_budget)
+
+    def dispatch(self, request, *args, **kwargs):
+        budget = self.get_query_budget(request)
+        if budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        guard = BudgetGuard(budget)
+        connection = transaction.get_connection()
+        nested = connection.in_atomic_block
+        atomic = (
+            transaction.atomic(savepoint=False)
+            if budget.statement_timeout_ms
+            else nullcontext()
+        )
+        with atomic, connection.execute_wrapper(guard):
+            response = super().dispatch(request, *args, **kwargs)
+            failed = getattr(response, "exception", False)
+            if nested:
+                guard.restore_timeout(connection)
+            elif budget.statement_timeout_ms and failed:
+                transaction.set_rollback(True)
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, QueryBudgetExceeded):
+            action = getattr(self, "action", None) or self.request.method.lower()
+            metrics.increment(f"budget:{exc.reason}", f"{type(self).__name__}.{action}")
+        return super().handle_exception(exc)
@@ -0,0 +1,232 @@
+"""
+Batch write paths that avoid per-row save() overhead.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.text import slugify
+
+from . import rollups
+from .embeddings import schedule_embedding_refresh
+from .events import queue_event
+from .models import Artifact, ArtifactCompetency, Competency, Technology
+from .similarity import schedule_refresh
+from .slugs import allocate_slugs, lock_slug_allocation
+from .sync import record_changes
+
+# Fields accepted from batch payloads / seed JSON. Anything else is ignored.
+ARTIFACT_FIELDS = (
+    "id",
+    "title",
+    "status",
+    "complexity",
+    "demo_type",
+    "description",
+    "tech_stack",
+    "repo_url",
+    "live_url",
+)
+
+# Columns overwritten when an existing artifact is upserted (date_created is kept)
+ARTIFACT_UPDATE_FIELDS = (
+    "title",
+    "status",
+    "complexity",
+    "demo_type",
+    "description",
+    "description_html",
+    "markdown_digest",
+    "tech_stack",
+    "repo_url",
+    "live_url",
+    "last_updated",
+)
+
+ROLES = {role for role, _ in ArtifactCompetency.ROLE_CHOICES}
+
+
+class BatchValidationError(Exception):
+    """
+    Raised with every problem in the batch, keyed by item index:
+    {3: {"live_url": ["..."]}, 7: {"competencies": ["..."]}}
+    """
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid item(s) in batch")
+        self.errors = errors
+
+
+def create_artifacts(items, update_existing=False, batch_size=500):
+    """
+    Validate and insert a batch of artifacts in a fixed number of queries.
+
+    Each item is a dict of Artifact fields, plus an optional "competencies"
+    list of {"id", "role"} links. Items without an "id" get a slug from their
+    title. With `update_existing`, items whose id already exists are updated
+    in place (and their competency links replaced) instead of rejected.
+
+    Nothing is written unless the whole batch is valid.
+    """
+    artifacts = [
+        Artifact(**{field: item[field] for field in ARTIFACT_FIELDS if field in item})
+        for item in items
+    ]
+    errors = _check_types(artifacts)
+
+    with transaction.atomic():
+        lock_slug_allocation(Artifact)
+
+        explicit_ids = [obj.id for obj in artifacts if obj.id]
+        existing_stacks, existing_keys = {}, {}
+        for pk, stack, created, *key in (
+            Artifact.objects.filter(id__in=explicit_ids)
+            .order_by()
+            .values_list("id", "tech_stack", "date_created", "status", "complexity")
+        ):
+            existing_stacks[pk] = stack
+            existing_keys[pk] = (rollups.month_of(created), *key)
+
+        pending = [obj for obj in artifacts if not obj.id]
+        slugs = allocate_slugs(
+            Artifact, [slugify(obj.title) for obj in pending], reserved=explicit_ids
+        )
+        for obj, slug in zip(pending, slugs):
+            obj.id = slug
+
+        canonical = Technology.objects.canonical_names(
+            name for obj in artifacts for name in obj.tech_stack
+        )
+        seen = set()
+        for index, obj in enumerate(artifacts):
+            obj.tech_stack = list(
+                dict.fromkeys(canonical.get(name, name) for name in obj.tech_stack)
+            )
+            obj.render_markdown()
+            try:
+                # Same rules as save(), minus the per-row uniqueness queries
+                obj.full_clean(validate_unique=False, validate_constraints=False)
+            except ValidationError as exc:
+                errors.setdefault(index, {}).update(exc.message_dict)
+
+            if obj.id in seen or (obj.id in existing_stacks and not update_existing):
+                errors.setdefault(index, {})["id"] = [
+                    f"Artifact with id '{obj.id}' already exists."
+                ]
+            seen.add(obj.id)
+
+        links = _build_links(items, artifacts, errors)
+        if errors:
+            raise BatchValidationError(errors)
+
+        if update_existing:
+            Artifact.objects.bulk_create(
+                artifacts,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=ARTIFACT_UPDATE_FIELDS,
+            )
+            relinked = [
+                obj.id for obj, item in zip(artifacts, items) if "competencies" in item
+            ]
+            ArtifactCompetency.objects.filter(artifact_id__in=relinked).delete()
+        else:
+            Artifact.objects.bulk_create(artifacts, batch_size=batch_size)
+
+        ArtifactCompetency.objects.bulk_create(links, batch_size=batch_size)
+
+        # bulk_create() skips the save() hooks in signals.py
+        Technology.objects.record_usage(
+            "artifact_count",
+            [existing_stacks.get(obj.id, []) for obj in artifacts],
+            [obj.tech_stack for obj in artifacts],
+        )
+        # Upserts keep their date_created
+        keys = [
+            rollups.artifact_key(obj, created=existing_keys.get(obj.id, (None,))[0])
+            for obj in artifacts
+        ]
+        rollups.record_artifacts([existing_keys.get(obj.id) for obj in artifacts], keys)
+        rollups.record_links(
+            added=rollups.link_tuples(links),
+            months={obj.id: key[0] for obj, key in zip(artifacts, keys)},
+        )
+        schedule_refresh([obj.id for obj in artifacts])
+        schedule_embedding_refresh(Artifact, [obj.id for obj in artifacts])
+        for obj in artifacts:
+            queue_event(
+                "artifact", obj.id, "update" if obj.id in existing_stacks else "create"
+            )
+        record_changes(
+            "artifacts",
+            [obj.id for obj in artifacts if obj.id not in existing_stacks],
+            "create",
+        )
+        record_changes(
+            "artifacts", [obj.id for obj in artifacts if obj.id in existing_stacks]
+        )
+
+    return artifacts
+
+
+def _check_types(artifacts):
+    """
+    Reject JSON shapes the model fields would choke on rather than validate.
+
+    Offending values are blanked so the rest of the batch can still be
+    checked; the returned errors keep the whole batch from being written.
+    """
+    errors = {}
+    for index, obj in enumerate(artifacts):
+        if obj.id is not None and not isinstance(obj.id, str):
+            errors.setdefault(index, {})["id"] = ["Expected a string."]
+            obj.id = ""
+        stack = obj.tech_stack
+        if not isinstance(stack, list) or not all(isinstance(n, str) for n in stack):
+            errors.setdefault(index, {})["tech_stack"] = ["Expected a list of strings."]
+            obj.tech_stack = []
+    return errors
+
+
+def _build_links(items, artifacts, errors):
+    competency_ids = {
+        link.get("id")
+        for item in items
+        for link in item.get("competencies", [])
+        if isinstance(link, dict) and isinstance(link.get("id"), str)
+    }
+    known = set(
+        Competency.objects.filter(id__in=competency_ids)
+        .order_by()
+        .values_list("id", flat=True)
+    )
+
+    links = []
+    for index, (item, obj) in enumerate(zip(items, artifacts)):
+        problems = []
+        linked = set()
+        item_links = item.get("competencies", [])
+        if not isinstance(item_links, list):
+            errors.setdefault(index, {})["competencies"] = ["Expected a list."]
+            continue
+        for link in item_links:
+            if not isinstance(link, dict):
+                problems.append("Each competency must be an object with id and role.")
+            elif not isinstance(link.get("id"), str):
+                problems.append("Each competency id must be a string.")
+            elif link["id"] not in known:
+                problems.append(f"Competency '{link['id']}' does not exist.")
+            elif not isinstance(link.get("role"), str) or link["role"] not in ROLES:
+                problems.append(f"Invalid role '{link.get('role')}'.")
+            elif link["id"] in linked:
+                problems.append(f"Competency '{link['id']}' is linked twice.")
+            else:
+                linked.add(link["id"])
+                links.append(
+                    ArtifactCompetency(
+                        artifact=obj, competency_id=link["id"], role=link["role"]
+                    )
+                )
+        if problems:
+            errors.setdefault(index, {})["competencies"] = problems
+    return links
@@ -0,0 +1,64 @@
+"""
+The whole atlas (categories, competencies, artifacts) loaded in a fixed
+number of queries, for /api/bundle/.
+
+Each row is fetched once and shared between sections: competencies point at
+the category objects of the categories section, and artifact links at the
+competency objects of the competencies section, instead of prefetching their
+own copies. Relation caches are filled the way prefetch_related() fills them,
+so the regular serializers work unchanged.
+"""
+
+from collections import defaultdict
+
+from .models import (
+    Artifact,
+    ArtifactCompetency,
+    Category,
+    Competency,
+    SubCompetency,
+)
+
+
+def _set_prefetched(instance, name, objs):
+    # What prefetch_related() leaves behind: an evaluated manager queryset
+    queryset = getattr(instance, name).all()
+    queryset._result_cache = objs
+    queryset._prefetch_done = True
+    instance.__dict__.setdefault("_prefetched_objects_cache", {})[name] = queryset
+
+
+def load_bundle():
+    """Returns (categories, competencies, artifacts) in API order (7 queries)."""
+    categories = list(Category.objects.order_by("display_order"))
+    category_map = {category.pk: category for category in categories}
+
+    competencies = list(Competency.objects.all())  # Default ordering
+    competency_map = {competency.pk: competency for competency in competencies}
+
+    sub_competencies = defaultdict(list)
+    for sub in SubCompetency.objects.prefetch_related("code_references"):
+        sub_competencies[sub.parent_id].append(sub)
+
+    # In Competency order, as prefetching them would return them
+    position = {pk: index for index, pk in enumerate(competency_map)}
+    related = defaultdict(list)
+    through = Competency.related_competencies.through
+    pairs = through.objects.values_list("from_competency_id", "to_competency_id")
+    for from_id, to_id in sorted(pairs, key=lambda pair: position[pair[1]]):
+        related[from_id].append(competency_map[to_id])
+
+    for competency in competencies:
+        competency.category = category_map[competency.category_id]
+        _set_prefetched(competency, "sub_competencies", sub_competencies[competency.pk])
+        _set_prefetched(competency, "related_competencies", related[competency.pk])
+
+    artifacts = list(Artifact.objects.order_by("-date_created"))
+    links = defaultdict(list)
+    for link in ArtifactCompetency.objects.order_by("pk"):
+        link.competency = competency_map[link.competency_id]
+        links[link.artifact_id].append(link)
+    for artifact in artifacts:
+        _set_prefetched(artifact, "artifactcompetency_set", links[artifact.pk])
+
+    return categories, competencies, artifacts
@@ -0,0 +1,226 @@
+"""
+Versioned caching for derived API payloads.
+
+Each namespace has a version number stored in the cache and every key embeds
+it. Writes bump the version (on commit), so entries computed from older data
+are never read again and simply age out; nothing has to be deleted.
+
+`coalesced` adds single-flight recomputation and stale-while-revalidate for
+expensive responses (see its docstring).
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from . import metrics
+from .transactions import on_commit_batch
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(namespace):
+    return f"atlas:version:{namespace}"
+
+
+def content_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock, not 1: if the version was evicted, restarting
+        # at 1 could resurrect entries cached under an old "1"
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        # Not set (or evicted): any fresh clock-based version is newer
+        cache.set(_version_key(namespace), time.time_ns(), timeout=None)
+
+
+def _bump_versions(namespaces):
+    for namespace in set(namespaces):
+        bump_version(namespace)
+
+
+def bump_version_on_commit(namespace):
+    # After commit, so a concurrent reader can't cache pre-commit data
+    # under the new version. One bump per namespace per transaction.
+    on_commit_batch("versions", _bump_versions, [namespace])
+
+
+def cached(namespace, name, compute, timeout=None):
+    """
+    Return `compute()`, cached until the namespace's next write. The default
+    timeout of None keeps entries until they're superseded or evicted.
+    """
+    key = f"atlas:{namespace}:{content_version(namespace)}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+# Recomputations of stale entries run here, off the request thread
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+_refreshing = set()  # Futures, so tests can wait for them
+
+# Set by warming(): recompute and store even when the entry is fresh
+_warming = ContextVar("cache_warming", default=False)
+
+# Keys this process is computing right now -> set when done
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def coalesced(namespace, name, compute):
+    """
+    Return `compute()` for `name`, computed by at most one request at a time.
+    `namespace` may be a tuple of namespaces the value depends on.
+
+    - Fresh entry (same namespace version, younger than CACHE_SOFT_TTL):
+      served as is.
+    - Stale entry (older, or the namespace was written since): served as is
+      while ONE caller recomputes it in the background.
+    - No entry: one caller computes; concurrent callers wait for its result
+      (up to CACHE_WAIT_TIMEOUT) instead of running the same work.
+
+    Entries are dropped CACHE_HARD_TTL seconds after they were computed, so a
+    stale response is never older than that. Counters land in metrics.py.
+    """
+    if isinstance(namespace, tuple):
+        # Depends on several namespaces: stale when any of them is written
+        version = tuple(content_version(part) for part in namespace)
+        namespace = "+".join(namespace)
+    else:
+        version = content_version(namespace)
+    key = f"atlas:swr:{namespace}:{name}"
+    if _warming.get():
+        metrics.increment("warmed", key)
+        return _compute(key, version, compute, time.time())
+    entry = cache.get(key)
+
+    if entry is not None:
+        value, computed_at, entry_version = entry
+        age = time.time() - computed_at
+        if entry_version == version and age < settings.CACHE_SOFT_TTL:
+            metrics.increment("hit", key)
+            return value
+
+        metrics.increment("stale", key)
+        token = _acquire(key)
+        if token:
+            future = _refresher.submit(
+                _refresh, key, version, compute, token, time.time()
+            )
+            _refreshing.add(future)
+            future.add_done_callback(_refreshing.discard)
+        return value
+
+    metrics.increment("miss", key)
+    missed_at = time.time()
+    token = _acquire(key)
+    if token:
+        try:
+            # Whoever held the lock may have stored it since our get()
+            entry = cache.get(key)
+            if entry is not None:
+                metrics.increment("waited", key)
+                return entry[0]
+            return _compute(key, version, compute, missed_at)
+        finally:
+            _release(key, token)
+
+    entry = _wait(key)
+    if entry is not None:
+        metrics.increment("waited", key)
+        return entry[0]
+    # The computing request failed or is too slow: do it ourselves
+    metrics.increment("fallback", key)
+    return _compute(key, version, compute, missed_at)
+
+
+@contextmanager
+def warming():
+    """Within this block, coalesced() recomputes and stores every entry."""
+    token = _warming.set(True)
+    try:
+        yield
+    finally:
+        _warming.reset(token)
+
+
+def _acquire(key):
+    """Become the one caller (across processes) computing `key`."""
+    token = uuid.uuid4().hex
+    timeout = settings.CACHE_LOCK_TIMEOUT
+    if not cache.add(f"{key}:lock", token, timeout=timeout):
+        return None
+    with _flights_lock:
+        _flights[key] = threading.Event()
+    return token
+
+
+def _release(key, token):
+    if cache.get(f"{key}:lock") == token:
+        cache.delete(f"{key}:lock")
+    with _flights_lock:
+        done = _flights.pop(key, None)
+    if done is not None:
+        done.set()
+
+
+def _wait(key):
+    """The entry computed by whoever holds the lock, or None on timeout."""
+    deadline = time.monotonic() + settings.CACHE_WAIT_TIMEOUT
+    with _flights_lock:
+        local = _flights.get(key)
+    if local is not None:
+        # Computed by another thread in this process: no polling needed
+        local.wait(settings.CACHE_WAIT_TIMEOUT)
+        return cache.get(key)
+
+    while time.monotonic() < deadline:
+        time.sleep(0.02)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(f"{key}:lock") is None:
+            return cache.get(key)  # Released without storing: failed
+    return None
+
+
+def _compute(key, version, compute, since):
+    value = compute()
+    metrics.increment("computed", key)
+
+    previous = cache.get(key)
+    if previous is not None and previous[1] >= since:
+        # Someone else did the same work since we found the entry missing
+        # or stale
+        metrics.increment("duplicate", key)
+    cache.set(key, (value, time.time(), version), settings.CACHE_HARD_TTL)
+    return value
+
+
+def _refresh(key, version, compute, token, since):
+    try:
+        _compute(key, version, compute, since)
+    except Exception:
+        logger.exception("Background refresh of %s failed", key)
+    finally:
+        _release(key, token)
+        connections.close_all()  # This thread's connections
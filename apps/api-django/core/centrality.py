@@ -0,0 +1,252 @@
+"""
+Graph ranking of competencies: which skills are central, as a data-driven
+complement to the hand-set showcase_priority / portfolio_highlight.
+
+The graph has one node per competency and one per linked artifact. Edges
+are related_competencies (directed) and ArtifactCompetency links (both
+ways, weighted by role as in similarity.py). Each competency gets:
+
+- pagerank: stationary probability of a random walk with restarts.
+- degree_centrality: distinct neighbours / (nodes - 1).
+- betweenness_centrality: share of shortest paths through the node,
+  estimated from BETWEENNESS_SAMPLES BFS sources (exact on small graphs).
+
+All three are vectorized sparse-matrix iterations. `manage.py
+rank_competencies` stores them, but only when the edges changed since the
+last run (see edge_digest), and /api/competencies/?ordering=centrality
+reads them through an index.
+"""
+
+import time
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_version_on_commit
+from .models import ArtifactCompetency, Competency, GraphRanking
+from .similarity import ROLE_WEIGHTS
+
+GRAPH = "competencies"
+
+RELATED_WEIGHT = 1.0
+DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITERATIONS = 100
+
+# BFS sources for the betweenness estimate, and how many run side by side
+# (memory is nodes x batch for each of a handful of dense arrays)
+BETWEENNESS_SAMPLES = 256
+BETWEENNESS_BATCH = 32
+
+# Order-independent digest of the ranked graph: nodes, edges and roles.
+# Sums row hashes rather than sorting every edge.
+EDGE_DIGEST_SQL = """
+SELECT count(*), coalesce(sum(hashtextextended(edge, 0)::numeric), 0)
+FROM (
+    SELECT 'c:' || id AS edge FROM core_competency
+    UNION ALL
+    SELECT 'r:' || from_competency_id || '>' || to_competency_id
+    FROM core_competency_related_competencies
+    UNION ALL
+    SELECT 'a:' || artifact_id || '>' || competency_id || ':' || role
+    FROM core_artifactcompetency
+) edges
+"""
+
+
+def load_graph():
+    """
+    Returns (competency ids, weighted adjacency matrix). Rows/columns start
+    with the competencies, in id order; linked artifacts follow.
+    """
+    # Imported here: scipy adds ~150 ms to every worker's startup otherwise
+    from scipy import sparse
+
+    ids = list(Competency.objects.order_by("pk").values_list("pk", flat=True))
+    index = {pk: row for row, pk in enumerate(ids)}
+    rows, cols, weights = [], [], []
+
+    related = Competency.related_competencies.through.objects.order_by()
+    for source, target in related.values_list("from_competency_id", "to_competency_id"):
+        rows.append(index[source])
+        cols.append(index[target])
+        weights.append(RELATED_WEIGHT)
+
+    artifacts = {}
+    links = ArtifactCompetency.objects.order_by().values_list(
+        "artifact_id", "competency_id", "role"
+    )
+    for artifact_id, competency_id, role in links:
+        node = artifacts.setdefault(artifact_id, len(ids) + len(artifacts))
+        weight = ROLE_WEIGHTS.get(role, 1.0)
+        rows += [node, index[competency_id]]
+        cols += [index[competency_id], node]
+        weights += [weight, weight]
+
+    size = len(ids) + len(artifacts)
+    adjacency = sparse.csr_matrix(
+        (np.array(weights, dtype=np.float64), (rows, cols)), shape=(size, size)
+    )
+    return ids, adjacency
+
+
+def pagerank(adjacency, damping=DAMPING, tolerance=PAGERANK_TOLERANCE):
+    """
+    (scores summing to 1, iterations) by power iteration on the weighted,
+    directed `adjacency`. Dangling nodes spread their rank uniformly.
+    """
+    from scipy import sparse
+
+    size = adjacency.shape[0]
+    out = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out == 0
+    out[dangling] = 1
+    # Column-stochastic transition matrix: one sparse product per iteration
+    transition = (sparse.diags(1 / out) @ adjacency).T.tocsr()
+
+    scores = np.full(size, 1 / size)
+    for iteration in range(1, PAGERANK_MAX_ITERATIONS + 1):
+        spread = transition @ scores + scores[dangling].sum() / size
+        updated = damping * spread + (1 - damping) / size
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < size * tolerance:
+            break
+    return scores, iteration
+
+
+def undirected(adjacency):
+    """Unweighted, symmetric, loop-free copy of `adjacency` (CSR)."""
+    from scipy import sparse
+
+    pairs = (adjacency + adjacency.T).tocoo()
+    keep = pairs.row != pairs.col
+    return sparse.csr_matrix(
+        (np.ones(keep.sum()), (pairs.row[keep], pairs.col[keep])),
+        shape=adjacency.shape,
+    )
+
+
+def degree_centrality(structure):
+    size = structure.shape[0]
+    degree = np.diff(structure.indptr).astype(np.float64)
+    return degree / (size - 1) if size > 1 else degree
+
+
+def betweenness_centrality(
+    structure, samples=BETWEENNESS_SAMPLES, batch=BETWEENNESS_BATCH, seed=0
+):
+    """
+    Normalized betweenness (Brandes) on the undirected `structure`. Runs
+    BFS from `batch` sources at once: each level is one sparse x dense
+    product counting shortest paths, and the dependency accumulation walks
+    the levels back the same way. Exact when samples >= nodes; otherwise an
+    unbiased estimate from `samples` random sources.
+    """
+    size = structure.shape[0]
+    if size < 3:
+        return np.zeros(size)
+    if samples >= size:
+        sources, scale = np.arange(size), 1.0
+    else:
+        sources = np.random.default_rng(seed).choice(size, samples, replace=False)
+        scale = size / samples
+
+    # float32: half the memory traffic of the products, which dominate;
+    # relative error ~1e-6, far below the sampling error
+    structure = structure.astype(np.float32)
+    totals = np.zeros(size)
+    for start in range(0, len(sources), batch):
+        chunk = sources[start : start + batch]
+        columns = np.arange(len(chunk))
+
+        paths = np.zeros((size, len(chunk)), dtype=np.float32)
+        paths[chunk, columns] = 1
+        depth = np.full((size, len(chunk)), -1, dtype=np.int32)
+        depth[chunk, columns] = 0
+        frontier, level = paths.copy(), 0
+        while True:
+            reached = structure @ frontier
+            reached[depth >= 0] = 0
+            if not reached.any():
+                break
+            level += 1
+            depth[reached > 0] = level
+            paths += reached
+            frontier = reached
+
+        dependency = np.zeros_like(paths)
+        inverse = np.divide(1, paths, out=np.zeros_like(paths), where=paths > 0)
+        for current in range(level, 0, -1):
+            share = (1 + dependency) * inverse
+            share[depth != current] = 0
+            back = structure @ share
+            back *= paths
+            back[depth != current - 1] = 0
+            dependency += back
+        dependency[chunk, columns] = 0
+        totals += dependency.sum(axis=1)
+
+    # Each unordered pair is counted from both ends: / 2, then the
+    # undirected normalization 2 / ((n - 1)(n - 2))
+    return totals * scale / ((size - 1) * (size - 2))
+
+
+def edge_digest():
+    with connection.cursor() as cursor:
+        cursor.execute(EDGE_DIGEST_SQL)
+        count, total = cursor.fetchone()
+    return f"{count}:{total}"
+
+
+def rank_competencies(force=False, samples=BETWEENNESS_SAMPLES):
+    """
+    Recompute and store the scores if the graph changed since the last run
+    (or with `force`). Returns the GraphRanking row, or None when skipped.
+    """
+    digest = edge_digest()
+    if not force and GraphRanking.objects.filter(pk=GRAPH, digest=digest).exists():
+        return None
+
+    started = time.perf_counter()
+    ids, adjacency = load_graph()
+    ranks, iterations = pagerank(adjacency)
+    structure = undirected(adjacency)
+    degree = degree_centrality(structure)
+    betweenness = betweenness_centrality(structure, samples=samples)
+    count = len(ids)
+
+    with transaction.atomic():
+        store_scores(ids, ranks[:count], degree[:count], betweenness[:count])
+        ranking, _ = GraphRanking.objects.update_or_create(
+            pk=GRAPH,
+            defaults={
+                "digest": digest,
+                "node_count": adjacency.shape[0],
+                "edge_count": structure.nnz // 2,
+                "iterations": iterations,
+                "duration_ms": (time.perf_counter() - started) * 1000,
+                "computed_at": timezone.now(),
+            },
+        )
+    return ranking
+
+
+def store_scores(ids, ranks, degree, betweenness):
+    # One UPDATE for every competency; rows whose scores didn't move are
+    # left alone (no dead tuples, no index churn)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE core_competency AS c"
+            " SET pagerank = s.pagerank, degree_centrality = s.degree,"
+            " betweenness_centrality = s.betweenness"
+            " FROM unnest(%s::varchar[], %s::float8[], %s::float8[], %s::float8[])"
+            " AS s(id, pagerank, degree, betweenness)"
+            " WHERE c.id = s.id AND (c.pagerank, c.degree_centrality,"
+            " c.betweenness_centrality) IS DISTINCT FROM"
+            " (s.pagerank, s.degree, s.betweenness)",
+            [ids, ranks.tolist(), degree.tolist(), betweenness.tolist()],
+        )
+    # ?ordering=centrality responses are cached
+    bump_version_on_commit("competencies")
@@ -0,0 +1,148 @@
+"""
+Cached responses stored pre-rendered and pre-compressed.
+
+Views cached through coalesced() (see views.py) store a representation: the
+response data, plus for each format in CACHE_COMPRESSED_FORMATS the rendered
+body and its brotli/zstd/gzip compressions, all made once when the entry is
+computed. Serving a hit only picks a body by Accept and Accept-Encoding:
+nothing is rendered, compressed or even unpickled per request. Other
+formats (e.g. the browsable API) render the data as usual, uncompressed.
+"""
+
+import gzip
+import pickle
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# In order of preference. Levels are the slowest and smallest ones: each
+# body is compressed once per cache write, then sent many times.
+ENCODERS = {}
+if brotli:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=11)
+if zstandard:
+    # Compressor objects aren't thread-safe: one per call
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=19).compress(body)
+ENCODERS["gzip"] = lambda body: gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def compress(body):
+    """{encoding: body} with "identity" and every encoding that saves bytes."""
+    encoded = {"identity": body}
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        for encoding, encode in ENCODERS.items():
+            compressed = encode(body)
+            if len(compressed) < len(body):
+                encoded[encoding] = compressed
+    return encoded
+
+
+def accepted_encoding(header, available):
+    """
+    The best of `available` encodings for an Accept-Encoding header, or None
+    if none is acceptable. Honours q-values, "*" and "identity;q=0".
+    """
+    weights = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        param, _, value = params.strip().partition("=")
+        if param.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    def weight(encoding):
+        if encoding in weights:
+            return weights[encoding]
+        if "*" in weights:
+            return weights["*"]
+        # Unlisted identity is acceptable, but only as a last resort
+        return 0.001 if encoding == "identity" else 0.0
+
+    ranked = [encoding for encoding in ENCODERS if encoding in available]
+    ranked.append("identity")
+    best = max(ranked, key=weight)
+    return best if weight(best) > 0 else None
+
+
+def represent(data, renderers):
+    """The cache entry for `data`, rendered and compressed ahead of time."""
+    bodies = {}
+    for renderer in renderers:
+        if renderer.format in settings.CACHE_COMPRESSED_FORMATS:
+            body = renderer.render(data, renderer.media_type, {})
+            bodies[renderer.format] = compress(body)
+    # Kept pickled: most hits send a body and never look at the data
+    return {"data": pickle.dumps(data, pickle.HIGHEST_PROTOCOL), "bodies": bodies}
+
+
+class PrecompressedResponse(Response):
+    """
+    A Response whose body was rendered (and encoded) ahead of time. `data`
+    is unpickled only if something reads it.
+    """
+
+    def __init__(self, pickled_data, body, encoding):
+        self.pickled_data = pickled_data
+        super().__init__()
+        self.body = body
+        if encoding != "identity":
+            self["Content-Encoding"] = encoding
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = pickle.loads(self.pickled_data)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = self.accepted_renderer
+        if renderer.charset:
+            self["Content-Type"] = f"{renderer.media_type}; charset={renderer.charset}"
+        else:
+            self["Content-Type"] = renderer.media_type
+        return self.body
+
+
+def precompressed_response(request, representation):
+    """Response for a represent() entry, negotiated for `request`."""
+    renderer = request.accepted_renderer
+    bodies = representation["bodies"].get(renderer.format)
+    # Media type parameters (e.g. "; indent=4") change the rendering
+    if bodies is None or request.accepted_media_type != renderer.media_type:
+        return Response(pickle.loads(representation["data"]))
+
+    encoding = accepted_encoding(
+        request.META.get("HTTP_ACCEPT_ENCODING", ""), bodies.keys()
+    )
+    if encoding is None:
+        return Response(
+            {"detail": "None of the accepted encodings are available."},
+            status=status.HTTP_406_NOT_ACCEPTABLE,
+        )
+    response = PrecompressedResponse(representation["data"], bodies[encoding], encoding)
+    if len(bodies) > 1:
+        patch_vary_headers(response, ["Accept-Encoding"])
+    return response
@@ -0,0 +1,135 @@
+"""
+Text embeddings for similarity lookups and semantic search (pgvector).
+
+The embedder is pluggable via settings.EMBEDDER. The default HashingEmbedder
+is deterministic and fully offline, so no model download or network is needed.
+Vectors are stored on `models.EmbeddedModel` rows and refreshed in batches by
+`update_embeddings`, only for rows whose source text (or embedder) changed:
+after each committed write (signals.py, bulk.py), and in full by
+`manage.py update_embeddings` (e.g. after switching embedders).
+"""
+
+import hashlib
+import math
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .transactions import on_commit_batch
+
+# Column width of every `embedding` field. Changing it needs a migration.
+EMBEDDING_DIMENSIONS = 256
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of words, word bigrams and character trigrams with
+    sublinear term frequency, L2-normalized (so cosine == dot product).
+    """
+
+    name = "hashing-v1"
+    dimensions = EMBEDDING_DIMENSIONS
+
+    # Relative weight of each feature family
+    weights = {"w": 1.0, "b": 0.5, "c": 0.25}
+
+    def features(self, text):
+        words = [word.rstrip(".") for word in TOKEN_RE.findall(text.lower())]
+        features = Counter(f"w:{word}" for word in words)
+        features.update(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f" {word} "
+            features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text or "").items():
+                hashed = zlib.crc32(feature.encode())
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                weight = self.weights[feature[0]] * (1.0 + math.log(count))
+                vectors[row, hashed % self.dimensions] += sign * weight
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+_embedder = None
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        _embedder = import_string(settings.EMBEDDER)()
+        if _embedder.dimensions != EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"{settings.EMBEDDER} produces {_embedder.dimensions}-d vectors; "
+                f"the embedding columns hold {EMBEDDING_DIMENSIONS}"
+            )
+    return _embedder
+
+
+def embed_query(text):
+    return get_embedder().embed([text])[0]
+
+
+def embedding_digest(text, embedder=None):
+    embedder = embedder or get_embedder()
+    return hashlib.sha256(f"{embedder.name}\x00{text}".encode()).hexdigest()
+
+
+def update_embeddings(model, batch_size=500, force=False, pks=None):
+    """
+    Re-embed rows of `model` (or just `pks`) whose text changed since their
+    vector was computed. Returns the number of rows updated.
+    """
+    embedder = get_embedder()
+    sources = model.embedding_source_fields
+    rows = model.objects.only("pk", "embedding_digest", *sources).order_by("pk")
+    if pks is not None:
+        rows = rows.filter(pk__in=pks)
+
+    updated = 0
+    stale = []
+
+    def flush():
+        vectors = embedder.embed([text for _, text in stale])
+        objs = []
+        for (obj, _), vector in zip(stale, vectors):
+            obj.embedding = vector
+            objs.append(obj)
+        model.objects.bulk_update(objs, ["embedding", "embedding_digest"])
+        return len(objs)
+
+    for obj in rows.iterator(chunk_size=batch_size):
+        text = obj.embedding_text()
+        digest = embedding_digest(text, embedder)
+        if digest != obj.embedding_digest or force:
+            obj.embedding_digest = digest
+            stale.append((obj, text))
+        if len(stale) >= batch_size:
+            updated += flush()
+            stale = []
+
+    if stale:
+        updated += flush()
+    return updated
+
+
+def schedule_embedding_refresh(model, pks):
+    """
+    Re-embed `pks` once the current transaction commits, coalescing every
+    write to `model` in the transaction into one batch.
+    """
+    on_commit_batch(
+        f"embeddings_{model._meta.model_name}",
+        lambda items: update_embeddings(model, pks=set(items)),
+        pks,
+    )
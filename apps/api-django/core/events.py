@@ -0,0 +1,274 @@
+"""
+Change events: compact {"model", "id", "op", "version"} notifications of atlas
+writes, published to Redis pub/sub and fanned out to Server-Sent Events clients.
+
+- Writes queue events (signals.py) that are published once, after commit.
+- Each event gets the next global content version, which doubles as its SSE id.
+- Redis keeps the last EVENTS_REPLAY_SIZE events so reconnecting clients can
+  resume from Last-Event-ID.
+- A "reset" event (the data was replaced wholesale, see snapshots.py) tells
+  clients to refetch everything instead of applying changes.
+- Each server process holds ONE pub/sub connection (Broadcaster) and fans
+  events out to its subscribers in memory; clients never touch the database.
+
+Disabled (no-op) when REDIS_URL is unset.
+"""
+
+import asyncio
+import json
+import logging
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.db import transaction
+
+from .transactions import on_commit_batch
+
+# Events are simply disabled without the redis package. It's imported on
+# first use, not at startup (it adds ~70 ms to every worker's cold start).
+REDIS_INSTALLED = find_spec("redis") is not None
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "atlas:events"
+VERSION_KEY = "atlas:events:version"
+REPLAY_KEY = "atlas:events:replay"
+
+RESET = "reset"
+
+# Assign versions, append to the replay buffer and publish atomically, so the
+# buffer order always matches the version order
+PUBLISH_SCRIPT = """
+local events = cjson.decode(ARGV[1])
+local limit = tonumber(ARGV[2])
+local version = 0
+for _, event in ipairs(events) do
+    version = redis.call('INCR', KEYS[1])
+    event['version'] = version
+    local payload = cjson.encode(event)
+    redis.call('RPUSH', KEYS[2], payload)
+    redis.call('PUBLISH', KEYS[3], payload)
+end
+redis.call('LTRIM', KEYS[2], -limit, -1)
+return version
+"""
+
+
+def events_enabled():
+    return bool(settings.REDIS_URL) and REDIS_INSTALLED
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def async_client():
+    import redis.asyncio
+
+    return redis.asyncio.Redis.from_url(settings.REDIS_URL)
+
+
+def publish_events(events):
+    """
+    Publish (model, id, op) tuples, deduplicated in order (the last op for a
+    row wins). Returns the newest content version, or None if nothing was sent.
+    """
+    if not events or not events_enabled():
+        return None
+
+    latest = {}
+    for model, pk, op in events:
+        key = (model, str(pk))
+        if latest.get(key) == "create" and op == "update":
+            continue  # Still a create from the client's point of view
+        latest.pop(key, None)
+        latest[key] = op
+    payload = [
+        {"model": model, "id": pk, "op": op} for (model, pk), op in latest.items()
+    ]
+    return _publish(payload)
+
+
+def publish_reset():
+    """
+    Tell every client to refetch. Buffered like any event, so clients
+    resuming from before it refetch too. Returns its version (None if
+    events are disabled).
+    """
+    if not events_enabled():
+        return None
+    return _publish([{"op": RESET}])
+
+
+def _publish(payload):
+    return get_client().eval(
+        PUBLISH_SCRIPT,
+        3,
+        VERSION_KEY,
+        REPLAY_KEY,
+        CHANNEL,
+        json.dumps(payload),
+        settings.EVENTS_REPLAY_SIZE,
+    )
+
+
+def queue_event(model, pk, op):
+    """Publish a change event once the current transaction commits."""
+    if events_enabled():
+        on_commit_batch("events", publish_events, [(model, pk, op)])
+
+
+def queue_reset():
+    """Publish a reset event once the current transaction commits."""
+    if events_enabled():
+        transaction.on_commit(publish_reset, robust=True)
+
+
+def format_event(payload):
+    """Raw pub/sub payload -> (version, SSE frame bytes)."""
+    event = json.loads(payload)
+    version = event["version"]
+    if event.get("op") == RESET:
+        return version, b"id: %d\nevent: reset\ndata: {}\n\n" % version
+    frame = b"id: %d\nevent: change\ndata: %s\n\n" % (version, payload)
+    return version, frame
+
+
+class Broadcaster:
+    """
+    Per-process fan-out: one Redis subscription and one heartbeat timer,
+    shared by every SSE client, each of which has a bounded in-memory queue.
+    Slow clients that fill their queue are disconnected and resume via
+    Last-Event-ID instead of buffering without limit.
+    """
+
+    queue_size = 256
+    reconnect_delay = 1.0
+    heartbeat = (None, b": ping\n\n")
+
+    def __init__(self):
+        self.subscribers = set()
+        self.tasks = []
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if not self.tasks or any(task.done() for task in self.tasks):
+            loop = asyncio.get_running_loop()
+            for task in self.tasks:
+                task.cancel()
+            self.tasks = [
+                loop.create_task(self.listen()),
+                loop.create_task(self.beat()),
+            ]
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def broadcast(self, item):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.subscribers.discard(queue)
+                queue.get_nowait()  # Make room for the disconnect marker
+                queue.put_nowait(None)
+
+    async def beat(self):
+        # Comment frames keep idle connections open through proxies
+        while self.subscribers:
+            await asyncio.sleep(settings.EVENTS_HEARTBEAT_SECONDS)
+            self.broadcast(self.heartbeat)
+
+    async def listen(self):
+        from redis import RedisError
+
+        while self.subscribers:
+            client = async_client()
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.broadcast(format_event(message["data"]))
+                        if not self.subscribers:
+                            return
+            except (RedisError, OSError):
+                logger.warning("Change event subscription lost; reconnecting")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                await client.aclose()
+
+
+broadcaster = Broadcaster()
+
+
+async def replay_since(last_version):
+    """
+    Buffered events newer than `last_version`, or None if the buffer no longer
+    reaches back that far (the client must refetch).
+    """
+    client = async_client()
+    try:
+        buffered = await client.lrange(REPLAY_KEY, 0, -1)
+        current = int(await client.get(VERSION_KEY) or 0)
+    finally:
+        await client.aclose()
+
+    events = [format_event(payload) for payload in buffered]
+    if last_version == current:
+        return []
+    if last_version > current or not events or events[0][0] > last_version + 1:
+        # Ahead of the server (Redis was reset) or older than the buffer
+        return None
+    return [event for event in events if event[0] > last_version]
+
+
+def event_stream(last_version=None):
+    """
+    SSE frames for one client: a replay from `last_version` (if given), then
+    live events and heartbeats from the broadcaster.
+
+    Subscribes immediately (not on first iteration), so no event published
+    while the response headers are being sent can be missed.
+    """
+    return _stream(broadcaster.subscribe(), last_version)
+
+
+async def _stream(queue, last_version):
+    try:
+        yield b"retry: %d\n\n" % settings.EVENTS_RETRY_MS
+
+        sent = last_version
+        if last_version is not None:
+            replay = await replay_since(last_version)
+            if replay is None:
+                # Too far behind (or Redis was reset): the client refetches
+                # and takes every live event from here on
+                yield b"event: reset\ndata: {}\n\n"
+                sent, replay = None, []
+            for version, frame in replay:
+                sent = version
+                yield frame
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return  # Dropped as too slow; the client reconnects and resumes
+            version, frame = item
+            if version is not None:
+                if sent is not None and version <= sent:
+                    continue  # Already sent in the replay
+                sent = version
+            yield frame
+    finally:
+        broadcaster.unsubscribe(queue)
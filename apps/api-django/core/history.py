@@ -0,0 +1,85 @@
+"""
+Normalized view of Competency.history (CompetencyExperience rows).
+
+history entries look like {"role", "company", "year": "2021-2023"}; the year
+range is parsed into integers so it can be filtered and aggregated in SQL.
+"""
+
+import re
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import CompetencyExperience
+
+YEAR_RANGE_RE = re.compile(r"^\s*(\d{4})\s*(?:[-–]\s*(\d{4}|present|current|now)\s*)?$")
+
+
+def parse_year_range(text):
+    """
+    "2021-2023" -> (2021, 2023), "2023-Present" -> (2023, None),
+    "2019" -> (2019, 2019). Anything else -> (None, None).
+    """
+    match = YEAR_RANGE_RE.match(str(text or "").lower())
+    if not match:
+        return None, None
+    start, end = match.groups()
+    if end is None:
+        return int(start), int(start)
+    if not end.isdigit():
+        return int(start), None
+    return int(start), int(end)
+
+
+def experience_rows(competency_id, history):
+    rows = []
+    for position, entry in enumerate(history if isinstance(history, list) else []):
+        if not isinstance(entry, dict):
+            continue
+        year_start, year_end = parse_year_range(entry.get("year"))
+        rows.append(
+            CompetencyExperience(
+                competency_id=competency_id,
+                position=position,
+                role=str(entry.get("role") or "")[:200],
+                company=str(entry.get("company") or "")[:200],
+                year_start=year_start,
+                year_end=year_end,
+            )
+        )
+    return rows
+
+
+def sync_experience(competencies):
+    """Replace the experience rows of `competencies` from their history."""
+    rows = [
+        row
+        for competency in competencies
+        for row in experience_rows(competency.pk, competency.history)
+    ]
+    with transaction.atomic():
+        CompetencyExperience.objects.filter(
+            competency__in=[competency.pk for competency in competencies]
+        ).delete()
+        CompetencyExperience.objects.bulk_create(rows)
+
+
+def experience_timeline():
+    """
+    Experience per company and period across all competencies, newest first
+    (one grouped query over CompetencyExperience).
+    """
+    return list(
+        CompetencyExperience.objects.values("company", "year_start", "year_end")
+        .annotate(
+            competency_count=Count("competency", distinct=True),
+            roles=ArrayAgg("role", distinct=True),
+            competencies=ArrayAgg("competency_id", distinct=True),
+        )
+        .order_by(
+            F("year_end").desc(nulls_first=True),
+            F("year_start").desc(nulls_last=True),
+            "company",
+        )
+    )
@@ -0,0 +1,161 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core import centrality
+from core.models import Artifact, ArtifactCompetency, Category, Competency
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the graph ranking job (PageRank, degree and betweenness "
+        "centrality) on a synthetic competency/artifact graph. With "
+        "--database, the whole job runs against synthetic rows (loading, "
+        "digest and score writes included), then everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--competencies", type=int, default=20_000)
+        parser.add_argument("--artifacts", type=int, default=80_000)
+        parser.add_argument("--links", type=int, default=4, help="Per artifact")
+        parser.add_argument("--related", type=int, default=3, help="Per competency")
+        parser.add_argument(
+            "--samples", type=int, default=centrality.BETWEENNESS_SAMPLES
+        )
+        parser.add_argument("--database", action="store_true")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        competencies, artifacts = options["competencies"], options["artifacts"]
+        related = self.edges(rng, competencies, competencies, options["related"])
+        links = self.edges(rng, artifacts, competencies, options["links"])
+        self.stdout.write(
+            f"{competencies + artifacts} nodes: {competencies} competencies, "
+            f"{artifacts} artifacts, {len(related)} related + {len(links)} links"
+        )
+        if options["database"]:
+            self.bench_job(related, links, competencies, artifacts, options)
+        else:
+            self.bench_compute(related, links, competencies, artifacts, options)
+
+    def edges(self, rng, sources, targets, per_source):
+        # Preferential targets (Zipf-like), as in a real skills graph
+        weights = 1 / np.arange(1, targets + 1) ** 0.8
+        pairs = np.column_stack(
+            [
+                np.repeat(np.arange(sources), per_source),
+                rng.choice(targets, sources * per_source, p=weights / weights.sum()),
+            ]
+        )
+        return np.unique(pairs, axis=0)
+
+    def bench_compute(self, related, links, competencies, artifacts, options):
+        from scipy import sparse
+
+        size = competencies + artifacts
+        rows = np.concatenate([related[:, 0], links[:, 0] + competencies, links[:, 1]])
+        cols = np.concatenate([related[:, 1], links[:, 1], links[:, 0] + competencies])
+        adjacency = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(size, size)
+        )
+
+        ranks, iterations = self.timed("pagerank", centrality.pagerank, adjacency)
+        self.stdout.write(f"  ({iterations} iterations, sum {ranks.sum():.6f})")
+        structure = self.timed("undirected", centrality.undirected, adjacency)
+        self.timed("degree", centrality.degree_centrality, structure)
+        for samples in (options["samples"] // 4, options["samples"]):
+            self.timed(
+                f"betweenness ({samples} sources)",
+                centrality.betweenness_centrality,
+                structure,
+                samples=samples,
+            )
+
+    def timed(self, label, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.report(label, started)
+        return result
+
+    def bench_job(self, related, links, competencies, artifacts, options):
+        try:
+            with transaction.atomic():
+                self.load(related, links, competencies, artifacts)
+                started = time.perf_counter()
+                centrality.edge_digest()
+                self.report("edge digest", started)
+                started = time.perf_counter()
+                ranking = centrality.rank_competencies(
+                    force=True, samples=options["samples"]
+                )
+                self.report("rank_competencies (full job)", started)
+                started = time.perf_counter()
+                skipped = centrality.rank_competencies()
+                self.report("rank_competencies (unchanged)", started)
+                self.stdout.write(
+                    f"  {ranking.iterations} PageRank iterations; "
+                    f"unchanged run skipped: {skipped is None}"
+                )
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, label, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"{label:<32} {elapsed:>9.1f} ms")
+
+    def load(self, related, links, competencies, artifacts):
+        category = Category.objects.create(id="bench", name="Bench")
+        Competency.objects.bulk_create(
+            [
+                Competency(
+                    id=f"bench-{n}",
+                    name=f"Competency {n}",
+                    category=category,
+                    proficiency="Expert",
+                    summary="Synthetic.",
+                )
+                for n in range(competencies)
+            ],
+            batch_size=5000,
+        )
+        Competency.related_competencies.through.objects.bulk_create(
+            [
+                Competency.related_competencies.through(
+                    from_competency_id=f"bench-{a}", to_competency_id=f"bench-{b}"
+                )
+                for a, b in related
+                if a != b
+            ],
+            batch_size=5000,
+        )
+        Artifact.objects.bulk_create(
+            [
+                Artifact(
+                    id=f"bench-{n}",
+                    title="Bench",
+                    complexity="beginner",
+                    demo_type="case-study",
+                    description="Synthetic.",
+                )
+                for n in range(artifacts)
+            ],
+            batch_size=5000,
+        )
+        ArtifactCompetency.objects.bulk_create(
+            [
+                ArtifactCompetency(
+                    artifact_id=f"bench-{a}", competency_id=f"bench-{c}", role="primary"
+                )
+                for a, c in links
+            ],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_competency")
@@ -0,0 +1,121 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Category, Competency
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the old default competency ordering (a join on category) "
+        "with the denormalized one on synthetic rows: query plans (sort "
+        "nodes, buffers) and latency, for one page and for the whole list. "
+        "Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20_000)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--page", type=int, default=100)
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.load(options["rows"], options["categories"])
+                self.compare(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def load(self, rows, category_count):
+        categories = Category.objects.bulk_create(
+            [
+                Category(id=f"bench-{n}", name=f"Bench {n}", display_order=1000 + n)
+                for n in range(category_count)
+            ]
+        )
+        Competency.objects.bulk_create(
+            [
+                Competency(
+                    id=f"bench-{n}",
+                    name=f"Competency {n * 7919 % rows:06d}",
+                    category=categories[n % category_count],
+                    category_display_order=categories[n % category_count].display_order,
+                    proficiency="Expert",
+                    summary="Synthetic.",
+                )
+                for n in range(rows)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_category")
+            cursor.execute("ANALYZE core_competency")
+        self.stdout.write(f"{rows} competencies in {category_count} categories")
+
+    def compare(self, options):
+        orderings = [
+            ("join", ("category__display_order", "name", "id")),
+            ("denormalized", ("category_display_order", "name", "id")),
+        ]
+        self.stdout.write(
+            f"{'ordering':<13} {'rows':>6} {'plan':<36} {'sort':<22} "
+            f"{'buffers':>8} {'median':>10}"
+        )
+        for limit in (options["page"], None):
+            for label, ordering in orderings:
+                queryset = Competency.objects.order_by(*ordering).only("id", "name")
+                if limit:
+                    queryset = queryset[:limit]
+                plan = self.explain(queryset)
+                latency = self.median_ms(
+                    lambda: list(queryset.all()), options["rounds"]
+                )
+                self.stdout.write(
+                    f"{label:<13} {limit or 'all':>6} {self.shape(plan):<36} "
+                    f"{self.sort(plan):<22} {self.buffers(plan):>8} "
+                    f"{latency:>7.2f} ms"
+                )
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+            return cursor.fetchone()[0][0]["Plan"]
+
+    def nodes(self, node):
+        yield node
+        for child in node.get("Plans", ()):
+            yield from self.nodes(child)
+
+    def shape(self, plan):
+        # e.g. "Limit > Sort > Hash Join"
+        types, node = [], plan
+        while node is not None and len(types) < 3:
+            types.append(node["Node Type"])
+            node = node.get("Plans", [None])[0]
+        return " > ".join(types)
+
+    def sort(self, plan):
+        for node in self.nodes(plan):
+            if "Sort Method" in node:
+                return f"{node['Sort Method']} {node.get('Sort Space Used', 0)}kB"
+        return "none"
+
+    def buffers(self, plan):
+        return plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+
+    def median_ms(self, func, rounds):
+        times = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return np.median(times) * 1000
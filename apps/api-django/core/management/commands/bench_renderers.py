@@ -0,0 +1,61 @@
+import gzip
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.serializers import CompetencySerializer
+from core.views import CompetencyViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the JSON, MessagePack and CBOR renderers on the full "
+        "competency list: encode and decode time, size and gzipped size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=200)
+
+    def handle(self, *args, **options):
+        rows = list(CompetencyViewSet.queryset)
+        if not rows:
+            raise CommandError("No competencies; run seed_data first.")
+        data = CompetencySerializer(rows, many=True).data
+
+        formats = [("json", JSONRenderer(), json.loads)]
+        if renderers.msgpack:
+            formats.append(
+                ("msgpack", renderers.MessagePackRenderer(), renderers.msgpack.unpackb)
+            )
+        if renderers.cbor2:
+            formats.append(("cbor", renderers.CBORRenderer(), renderers.cbor2.loads))
+
+        expected = json.loads(JSONRenderer().render(data))
+        self.stdout.write(
+            f"{len(rows)} competencies, {options['rounds']} rounds (median times)"
+        )
+        self.stdout.write(
+            f"{'format':<8} {'encode':>10} {'decode':>10} {'bytes':>8} {'gzip':>8}"
+        )
+        for name, renderer, decode in formats:
+            body = renderer.render(data)
+            if decode(body) != expected:
+                raise CommandError(f"{name} doesn't round-trip to the JSON structure")
+            encode_ms = self.median_ms(lambda: renderer.render(data), options["rounds"])
+            decode_ms = self.median_ms(lambda: decode(body), options["rounds"])
+            self.stdout.write(
+                f"{name:<8} {encode_ms:>7.3f} ms {decode_ms:>7.3f} ms "
+                f"{len(body):>8} {len(gzip.compress(body)):>8}"
+            )
+
+    def median_ms(self, func, rounds):
+        times = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        return np.median(times) * 1000
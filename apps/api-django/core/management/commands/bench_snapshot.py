@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import snapshots
+from core.management.commands.seed_data import Command as SeedCommand
+from core.models import Artifact
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares seeding a synthetic dataset through seed_data with exporting "
+        "it to a snapshot and restoring that (--replace). Everything runs in "
+        "one transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--competencies", type=int, default=2_000)
+        parser.add_argument("--artifacts", type=int, default=25_000)
+        parser.add_argument("--links", type=int, default=3, help="Per artifact")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            competencies = os.path.join(directory, "competencies.json")
+            artifacts = os.path.join(directory, "artifacts.json")
+            archive = os.path.join(directory, "atlas.snapshot.zip")
+            self.write_seeds(competencies, artifacts, options)
+            try:
+                with transaction.atomic():
+                    self.run(competencies, artifacts, archive)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, competencies, artifacts, archive):
+        seed = SeedCommand(stdout=self.stdout)
+        started = time.perf_counter()
+        seed.seed_competencies(competencies)
+        seed.seed_artifacts(artifacts)
+        self.report("seed_data (without embeddings)", started)
+
+        started = time.perf_counter()
+        manifest = snapshots.export_snapshot(archive)
+        self.report("snapshot", started)
+        rows = sum(entry["rows"] for entry in manifest["tables"])
+        size = os.path.getsize(archive) / 1e6
+        self.stdout.write(
+            f"  {rows} rows in {len(manifest['tables'])} tables, {size:.1f} MB"
+        )
+
+        started = time.perf_counter()
+        snapshots.restore_snapshot(archive, replace=True)
+        self.report("restore_snapshot --replace", started)
+        self.stdout.write(f"  {Artifact.objects.count()} artifacts after restore")
+
+    def report(self, label, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"{label:<32} {elapsed:>9.1f} ms")
+
+    def write_seeds(self, competencies_path, artifacts_path, options):
+        count = options["competencies"]
+        competencies = [
+            {
+                "id": f"bench-{n}",
+                "name": f"Competency {n}",
+                "category": f"Bench {n % 12}",
+                "proficiency": "Expert",
+                "summary": "Synthetic.",
+                "tags": ["bench"],
+                "related_ids": [f"bench-{(n * 7 + k) % count}" for k in (1, 2, 3)],
+                "sub_competencies": [
+                    {"id": f"bench-{n}-{k}", "name": f"Sub {k}", "desc": "Synthetic."}
+                    for k in range(3)
+                ],
+            }
+            for n in range(count)
+        ]
+        artifacts = [
+            {
+                "id": f"bench-{n}",
+                "title": f"Artifact {n}",
+                "status": ("complete", "in-progress")[n % 2],
+                "complexity": ("beginner", "intermediate", "advanced")[n % 3],
+                "date_created": f"20{20 + n % 6}-{1 + n % 12:02d}-01",
+                "demo_type": "case-study",
+                "description": "Synthetic.",
+                "competencies": [
+                    {
+                        "id": f"bench-{(n * 31 + k * 17) % count}",
+                        "role": ("primary", "secondary", "supporting")[k % 3],
+                    }
+                    for k in range(options["links"])
+                ],
+                "tech_stack": [f"Tech {n % 50}", f"Tech {n % 7}"],
+            }
+            for n in range(options["artifacts"])
+        ]
+        with open(competencies_path, "w") as f:
+            json.dump(competencies, f)
+        with open(artifacts_path, "w") as f:
+            json.dump(artifacts, f)
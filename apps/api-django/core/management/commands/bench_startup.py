@@ -0,0 +1,171 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: import the ASGI application (as uvicorn does),
+# then serve one request through it. Prints wall-clock timestamps, and which
+# of the given modules were imported by then.
+CHILD = """
+import asyncio, json, sys, time
+
+path, host, *watched = sys.argv[1:]
+import config.asgi
+imported = time.time()
+
+async def first_request():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", host.encode())], "server": (host, 80),
+        "client": ("127.0.0.1", 0),
+    }
+    sent, done = [], asyncio.Event()
+    pending = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await config.asgi.application(scope, receive, send)
+    return sent[0]["status"]
+
+status = asyncio.run(first_request())
+print(json.dumps({
+    "imported": imported, "responded": time.time(), "status": status,
+    "loaded": [name for name in watched if name in sys.modules],
+}))
+"""
+
+# Left out of API_ONLY workers (see settings.py): importing them anyway
+# undoes the point of the mode
+ADMIN_ONLY_MODULES = ("drf_spectacular",)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures cold start in fresh interpreters: time to import the ASGI "
+        "application and time to its first response (medians over --runs). "
+        "Fails when a median exceeds its budget. Set API_ONLY=1 to measure "
+        "API workers (which also fail if they import admin-only modules)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/api/categories/")
+        parser.add_argument(
+            "--host",
+            default=next(
+                (
+                    host.lstrip(".")
+                    for host in settings.ALLOWED_HOSTS
+                    if "*" not in host
+                ),
+                "localhost",
+            ),
+        )
+        parser.add_argument(
+            "--import-budget-ms",
+            type=float,
+            default=settings.STARTUP_IMPORT_BUDGET_MS,
+            help="Interpreter start to application imported",
+        )
+        parser.add_argument(
+            "--first-response-budget-ms",
+            type=float,
+            default=settings.STARTUP_FIRST_RESPONSE_BUDGET_MS,
+            help="Interpreter start to first response",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Also profile one start and list the slowest top-level imports",
+        )
+
+    def handle(self, *args, **options):
+        imports, responses = [], []
+        for _ in range(options["runs"]):
+            started = time.time()
+            result = json.loads(self.run_child(options).stdout)
+            if result["status"] != 200:
+                raise CommandError(
+                    f"{options['path']} answered {result['status']} "
+                    "(is --host in ALLOWED_HOSTS, and the database up?)"
+                )
+            if settings.API_ONLY and result["loaded"]:
+                raise CommandError(
+                    f"API_ONLY workers imported {', '.join(result['loaded'])} "
+                    "(see API_ONLY in settings.py)"
+                )
+            imports.append((result["imported"] - started) * 1000)
+            responses.append((result["responded"] - started) * 1000)
+
+        import_ms, response_ms = np.median(imports), np.median(responses)
+        mode = "API_ONLY" if settings.API_ONLY else "full"
+        self.stdout.write(
+            f"Cold start ({mode}, median of {options['runs']}): "
+            f"imported in {import_ms:.0f} ms, first response at {response_ms:.0f} ms"
+        )
+        if options["top"]:
+            self.report_imports(options)
+
+        over = []
+        if import_ms > options["import_budget_ms"]:
+            over.append(f"import {import_ms:.0f} > {options['import_budget_ms']:.0f}")
+        if response_ms > options["first_response_budget_ms"]:
+            over.append(
+                f"first response {response_ms:.0f} > "
+                f"{options['first_response_budget_ms']:.0f}"
+            )
+        if over:
+            raise CommandError("Startup budget exceeded: " + ", ".join(over) + " ms")
+        self.stdout.write(self.style.SUCCESS("Within the startup budget"))
+
+    def run_child(self, options, *flags):
+        child = subprocess.run(
+            [
+                sys.executable,
+                *flags,
+                "-c",
+                CHILD,
+                options["path"],
+                options["host"],
+                *ADMIN_ONLY_MODULES,
+            ],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env=os.environ,
+        )
+        if child.returncode:
+            raise CommandError(f"The application failed to start:\n{child.stderr}")
+        return child
+
+    def report_imports(self, options):
+        # -X importtime lines: "import time: self [us] | cumulative | name"
+        stderr = self.run_child(options, "-X", "importtime").stderr
+        totals = Counter()
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:") :].split("|")
+            totals[name.strip().split(".")[0]] += int(self_us)
+
+        self.stdout.write("Slowest top-level imports (self time, one start):")
+        for package, us in totals.most_common(options["top"]):
+            self.stdout.write(f"{us / 1000:9.1f} ms  {package}")
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.embeddings import EMBEDDING_DIMENSIONS
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks HNSW query latency and recall on synthetic vectors in a "
+        "temporary table (nothing is written to the core tables)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--ef-search", type=int, default=40)
+        parser.add_argument(
+            "--intrinsic-dims",
+            type=int,
+            default=24,
+            help=(
+                "Latent dimensions of the synthetic data (text embeddings live "
+                "near a low-dimensional manifold, not uniformly in the space)"
+            ),
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        projection = rng.standard_normal(
+            (options["intrinsic_dims"], EMBEDDING_DIMENSIONS)
+        )
+        vectors = self.synthetic_vectors(rng, projection, options["rows"])
+        queries = self.synthetic_vectors(rng, projection, options["queries"])
+        k = options["k"]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE bench_vectors "
+                f"(id integer PRIMARY KEY, embedding vector({EMBEDDING_DIMENSIONS})) "
+                "ON COMMIT DROP"
+            )
+
+            started = time.perf_counter()
+            with cursor.cursor.copy("COPY bench_vectors FROM STDIN") as copy:
+                for row_id, vector in enumerate(vectors):
+                    copy.write_row((row_id, self.literal(vector)))
+            self.report("Loaded", options["rows"], time.perf_counter() - started)
+
+            started = time.perf_counter()
+            # The build is far faster when the graph fits in memory
+            cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+            cursor.execute(
+                "CREATE INDEX ON bench_vectors USING hnsw "
+                "(embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+            )
+            cursor.execute("ANALYZE bench_vectors")
+            self.report(
+                "Built HNSW index over", options["rows"], time.perf_counter() - started
+            )
+
+            sql = (
+                "SELECT id FROM bench_vectors "
+                "ORDER BY embedding <=> %s::vector LIMIT %s"
+            )
+            literals = [self.literal(query) for query in queries]
+
+            cursor.execute("SET LOCAL hnsw.ef_search = %s", [options["ef_search"]])
+            approximate, latencies = self.run_queries(cursor, sql, literals, k)
+
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            exact, exact_latencies = self.run_queries(cursor, sql, literals, k)
+
+        recall = np.mean(
+            [len(set(a) & set(e)) / len(e) for a, e in zip(approximate, exact)]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"HNSW   k={k} ef_search={options['ef_search']}: "
+                f"p50 {np.percentile(latencies, 50):.2f} ms, "
+                f"p95 {np.percentile(latencies, 95):.2f} ms, "
+                f"recall@{k} {recall:.3f}"
+            )
+        )
+        self.stdout.write(
+            f"Exact  k={k}: p50 {np.percentile(exact_latencies, 50):.2f} ms, "
+            f"p95 {np.percentile(exact_latencies, 95):.2f} ms"
+        )
+
+    def synthetic_vectors(self, rng, projection, count):
+        vectors = rng.standard_normal((count, projection.shape[0])) @ projection
+        vectors += 0.1 * rng.standard_normal(vectors.shape)
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(
+            np.float32
+        )
+
+    def literal(self, vector):
+        return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+    def run_queries(self, cursor, sql, literals, k):
+        results, latencies = [], []
+        for literal in literals:
+            started = time.perf_counter()
+            cursor.execute(sql, [literal, k])
+            results.append([row[0] for row in cursor.fetchall()])
+            latencies.append((time.perf_counter() - started) * 1000)
+        return results, latencies
+
+    def report(self, label, rows, seconds):
+        self.stdout.write(f"{label} {rows} vectors in {seconds:.1f}s")
@@ -0,0 +1,33 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seed_export import CHUNK_SIZE, export_seeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes competencies.json and artifacts.json from the database, in the "
+        "shape seed_data reads (see core/seed_export.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=os.path.join(settings.BASE_DIR, "../../packages/db/seeds"),
+            help="Directory to write to (default: the seeds seed_data loads)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        directory = options["output"]
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+        counts = export_seeds(directory, chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Exported {counts['competencies']} competencies and "
+                f"{counts['artifacts']} artifacts to {directory}"
+            )
+        )
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import resource
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from core.events import events_enabled, publish_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Holds N idle SSE connections to /api/events/ on a running ASGI server, "
+        "publishes synthetic events and reports delivery and fan-out latency. "
+        "Events use model 'loadtest'; run it against a development Redis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/events/")
+        parser.add_argument("--connections", type=int, default=5000)
+        parser.add_argument(
+            "--ramp", type=int, default=500, help="New connections per second"
+        )
+        parser.add_argument("--events", type=int, default=10)
+        parser.add_argument(
+            "--interval", type=float, default=1.0, help="Seconds between events"
+        )
+        parser.add_argument(
+            "--hold",
+            type=float,
+            default=5.0,
+            help="Seconds to stay connected after the last event",
+        )
+
+    def handle(self, *args, **options):
+        if not events_enabled():
+            raise CommandError("REDIS_URL is not set; change events are disabled.")
+        self.raise_fd_limit(options["connections"])
+        asyncio.run(self.run(options))
+
+    def raise_fd_limit(self, connections):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = connections + 256
+        if soft < wanted:
+            if hard != resource.RLIM_INFINITY and hard < wanted:
+                raise CommandError(
+                    f"Open file limit is {hard}; {wanted} needed (raise `ulimit -n`)."
+                )
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    async def run(self, options):
+        url = urlsplit(options["url"])
+        self.host, self.port = url.hostname, url.port or 80
+        self.path = url.path + (f"?{url.query}" if url.query else "")
+
+        self.connected = 0
+        self.failed = 0
+        self.heartbeats = 0
+        self.latencies = []
+        self.received = 0
+        stop = asyncio.Event()
+
+        count = options["connections"]
+        started = time.perf_counter()
+        clients = []
+        for i in range(count):
+            clients.append(asyncio.create_task(self.client(stop)))
+            if (i + 1) % options["ramp"] == 0:
+                await asyncio.sleep(1)
+        while self.connected + self.failed < count:
+            await asyncio.sleep(0.1)
+        self.stdout.write(
+            f"Connected {self.connected}/{count} "
+            f"({self.failed} failed) in {time.perf_counter() - started:.1f}s"
+        )
+
+        for _ in range(options["events"]):
+            await asyncio.to_thread(
+                publish_events, [("loadtest", f"{time.time():.6f}", "update")]
+            )
+            await asyncio.sleep(options["interval"])
+        await asyncio.sleep(options["hold"])
+
+        stop.set()
+        await asyncio.gather(*clients, return_exceptions=True)
+        self.report(options)
+
+    async def client(self, stop):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            writer.write(
+                f"GET {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                "Accept: text/event-stream\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if b" 200 " not in status_line:
+                raise ConnectionError(status_line.decode(errors="replace").strip())
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass  # Headers
+        except (OSError, ConnectionError) as exc:
+            self.failed += 1
+            if self.failed == 1:
+                self.stderr.write(f"First failure: {exc!r}")
+            return
+        self.connected += 1
+
+        reading = asyncio.create_task(self.read_events(reader))
+        await stop.wait()
+        reading.cancel()
+        writer.close()
+
+    async def read_events(self, reader):
+        # Chunked transfer framing is skipped: only "data:" / ": ping" lines matter
+        while line := await reader.readline():
+            if line.startswith(b": ping"):
+                self.heartbeats += 1
+            elif line.startswith(b"data: "):
+                event = json.loads(line[6:])
+                if event.get("model") == "loadtest":
+                    self.received += 1
+                    self.latencies.append(time.time() - float(event["id"]))
+
+    def report(self, options):
+        expected = self.connected * options["events"]
+        self.stdout.write(
+            f"Delivered {self.received}/{expected} events, "
+            f"{self.heartbeats} heartbeats"
+        )
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1000
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Fan-out latency: p50 {np.percentile(latencies, 50):.1f} ms, "
+                    f"p95 {np.percentile(latencies, 95):.1f} ms, "
+                    f"max {latencies.max():.1f} ms"
+                )
+            )
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints a signed X-Profile header value: requests carrying it are "
+        "profiled (with PROFILING_ENABLED) for PROFILING_TOKEN_MAX_AGE seconds."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{HEADER}: {make_token()}")
+        self.stderr.write(
+            f"Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds, e.g.\n"
+            f"  curl -H '{HEADER}: ...' -D - <url>  (see X-Profile-Id)"
+        )
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.sync import prune_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes delta sync log entries older than --days. Clients whose "
+        "cursor predates the pruned entries get 410 and sync from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} change log entries older than {options['days']} days"
+            )
+        )
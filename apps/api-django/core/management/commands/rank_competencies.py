@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.centrality import BETWEENNESS_SAMPLES, rank_competencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes PageRank, degree and betweenness centrality over the "
+        "competency graph and stores them on Competency. Does nothing when "
+        "the graph hasn't changed since the last run (safe to run from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Rank even if the graph is unchanged"
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=BETWEENNESS_SAMPLES,
+            help="BFS sources for the betweenness estimate",
+        )
+
+    def handle(self, *args, **options):
+        ranking = rank_competencies(force=options["force"], samples=options["samples"])
+        if ranking is None:
+            self.stdout.write("  Graph unchanged since the last run; nothing to do")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"  Ranked {ranking.node_count} nodes / {ranking.edge_count} edges "
+                f"in {ranking.duration_ms:.0f} ms "
+                f"({ranking.iterations} PageRank iterations)"
+            )
+        )
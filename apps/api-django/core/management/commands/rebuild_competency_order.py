@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Competency
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies each category's display_order onto its competencies (the "
+        "default competency ordering). Only needed after writes that bypass "
+        "the ORM hooks, such as queryset update() or bulk_update() of "
+        "categories."
+    )
+
+    def handle(self, *args, **options):
+        fixed = Competency.objects.rebuild_category_order()
+        self.stdout.write(self.style.SUCCESS(f"  Reordered {fixed} competencies"))
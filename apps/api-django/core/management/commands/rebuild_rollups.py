@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core import rollups
+from core.models import ArtifactCategory, ArtifactMonth, CompetencyUsage
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the /api/stats/ rollups from artifacts and their competency "
+        "links. Only needed after writes that bypass the ORM hooks."
+    )
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        for model in (CompetencyUsage, ArtifactMonth, ArtifactCategory):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  Rebuilt {model.objects.count()} {model.__name__} rows"
+                )
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.similarity import TOP_K, rebuild_similarities
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the precomputed 'similar projects' table from scratch. "
+        "Writes keep it current incrementally; run this after bulk SQL edits "
+        "or changing the feature weights."
+    )
+
+    def handle(self, *args, **options):
+        written = rebuild_similarities()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {written} neighbours (top {TOP_K} per artifact)"
+            )
+        )
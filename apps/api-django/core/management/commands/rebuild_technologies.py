@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Technology
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the technology dictionary from Artifact.tech_stack and "
+        "Competency.tags. Only needed after writes that bypass the ORM hooks."
+    )
+
+    def handle(self, *args, **options):
+        Technology.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"  Rebuilt {Technology.objects.count()} technologies")
+        )
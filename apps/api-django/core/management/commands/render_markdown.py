@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.models import Competency, SubCompetency, Artifact
+from core.rendering import RENDERER_VERSION, markdown_digest, render_markdown
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-renders stored Markdown HTML whose source text or renderer version "
+        "changed. Run after bumping RENDERER_VERSION or the Markdown extensions."
+    )
+
+    models = (Competency, SubCompetency, Artifact)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every row, even if its digest is current",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Process pool size (defaults to the CPU count, 1 disables the pool)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Renderer version: {RENDERER_VERSION}")
+
+        workers = options["workers"]
+        if workers == 1:
+            self.render_all(map, options)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                self.render_all(pool.map, options)
+
+    def render_all(self, map_fn, options):
+        for model in self.models:
+            rendered = self.render_model(
+                model, map_fn, options["batch_size"], options["force"]
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"  {model.__name__}: re-rendered {rendered}")
+            )
+
+    def render_model(self, model, map_fn, batch_size, force):
+        sources = list(model.markdown_fields)
+        targets = [model.markdown_fields[source] for source in sources]
+
+        rows = model.objects.only("pk", "markdown_digest", *sources).order_by("pk")
+        stale = []
+        rendered = 0
+
+        for obj in rows.iterator(chunk_size=batch_size):
+            texts = [getattr(obj, source) for source in sources]
+            digest = markdown_digest(*texts)
+            if digest != obj.markdown_digest or force:
+                obj.markdown_digest = digest
+                stale.append((obj, texts))
+
+            if len(stale) >= batch_size:
+                rendered += self.flush(model, stale, targets, map_fn, batch_size)
+                stale = []
+
+        if stale:
+            rendered += self.flush(model, stale, targets, map_fn, batch_size)
+        return rendered
+
+    def flush(self, model, stale, targets, map_fn, batch_size):
+        # Flatten so the pool sees one task per text, regardless of field count
+        texts = [text for _, obj_texts in stale for text in obj_texts]
+        html = iter(list(map_fn(render_markdown, texts)))
+
+        objs = []
+        for obj, obj_texts in stale:
+            for target in targets:
+                setattr(obj, target, next(html))
+            objs.append(obj)
+
+        # bulk_update() skips save(), so the digests set above are written as-is
+        model.objects.bulk_update(
+            objs, [*targets, "markdown_digest"], batch_size=batch_size
+        )
+        return len(objs)
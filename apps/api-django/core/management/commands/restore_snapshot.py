@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.snapshots import SnapshotError, restore_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads a snapshot written by `manage.py snapshot` into this database, "
+        "in one transaction. The database must be migrated to the snapshot's "
+        "migration first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Overwrite tables that already have rows",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            manifest = restore_snapshot(
+                options["path"],
+                replace=options["replace"],
+                progress=lambda message: self.stdout.write(f"  {message}"),
+            )
+        except SnapshotError as exc:
+            raise CommandError(str(exc))
+        rows = sum(entry["rows"] for entry in manifest["tables"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Restored {rows} rows in {len(manifest['tables'])} tables"
+                f" (snapshot of {manifest['created_at']})"
+            )
+        )
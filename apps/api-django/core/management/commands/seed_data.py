@@ -1,14 +1,15 @@
 import json
 import os
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 from core.models import (
     Category,
     Competency,
     SubCompetency,
     Artifact,
-    ArtifactCompetency,
 )
+from core.bulk import BatchValidationError, create_artifacts
+from core.embeddings import update_embeddings
 
 
 class Command(BaseCommand):
@@ -26,6 +27,11 @@ class Command(BaseCommand):
         # 2. Seed Artifacts
         self.seed_artifacts(os.path.join(seeds_dir, "artifacts.json"))
 
+        # 3. Embed new/changed rows for similarity and semantic search
+        for model in (Competency, SubCompetency, Artifact):
+            updated = update_embeddings(model)
+            self.stdout.write(f"Embedded {updated} {model._meta.verbose_name_plural}")
+
     def seed_competencies(self, file_path):
         self.stdout.write("Seeding Competencies...")
         with open(file_path, "r") as f:
@@ -49,6 +55,7 @@ class Command(BaseCommand):
                 "proficiency": item["proficiency"],
                 "summary": item.get("summary", ""),
                 "tags": item.get("tags", []),
+                "history": item.get("history", []),
                 "showcase_priority": item.get(
                     "showcasePriority", "medium"
                 ),  # Handles camelCase if present
@@ -107,46 +114,41 @@ class Command(BaseCommand):
         with open(file_path, "r") as f:
             data = json.load(f)
 
-        for item in data:
-            # Prepare defaults using Snake Case (matching the JSON I gave you)
-            # We use .get() to be safe, but the keys should match models.py fields
-            defaults = {
-                "title": item["title"],
-                "status": item["status"],
-                "complexity": item["complexity"],
-                "demo_type": item.get("demo_type", "code-snippet"),
-                "description": item["description"],
-                "tech_stack": item.get("tech_stack", []),
-                "repo_url": item.get(
-                    "repo_url", ""
-                ),  # Critical: Matches snake_case JSON
-                "live_url": item.get("live_url", ""),
-                # Handle dates if present, else ignore (auto_now_add handles creation)
-            }
-
-            # Create the Artifact
-            art_obj, created = Artifact.objects.update_or_create(
-                id=item["id"], defaults=defaults
-            )
+        # One lookup for every referenced skill, instead of a get() per link
+        referenced = {
+            comp_data["id"]
+            for item in data
+            for comp_data in item.get("competencies", [])
+        }
+        known = set(
+            Competency.objects.filter(id__in=referenced).values_list("id", flat=True)
+        )
 
-            # Link Competencies
+        for item in data:
+            # Defaults mirror what the JSON usually omits
+            item.setdefault("demo_type", "code-snippet")
             if "competencies" in item:
-                # Clear existing to prevent duplicates/stale links
-                ArtifactCompetency.objects.filter(artifact=art_obj).delete()
-
                 for comp_data in item["competencies"]:
-                    try:
-                        comp_obj = Competency.objects.get(id=comp_data["id"])
-                        ArtifactCompetency.objects.create(
-                            artifact=art_obj,
-                            competency=comp_obj,
-                            role=comp_data["role"],
-                        )
-                    except Competency.DoesNotExist:
+                    if comp_data["id"] not in known:
                         self.stdout.write(
                             self.style.WARNING(
                                 f"  Skill '{comp_data['id']}' not found for artifact '{item['id']}'"
                             )
                         )
+                item["competencies"] = [
+                    comp_data
+                    for comp_data in item["competencies"]
+                    if comp_data["id"] in known
+                ]
+
+        # Upsert everything (and replace competency links) in one batch
+        try:
+            create_artifacts(data, update_existing=True)
+        except BatchValidationError as exc:
+            for index, errors in exc.errors.items():
+                self.stdout.write(
+                    self.style.ERROR(f"  Artifact '{data[index].get('id')}': {errors}")
+                )
+            raise CommandError("Artifact seeds failed validation; nothing was written")
 
         self.stdout.write(self.style.SUCCESS(f"  Processed {len(data)} artifacts"))
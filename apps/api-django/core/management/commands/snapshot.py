@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.snapshots import export_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports every core table to a compressed binary snapshot (see "
+        "core/snapshots.py). Load it elsewhere with `manage.py restore_snapshot`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archive to write, e.g. atlas.snapshot.zip")
+        parser.add_argument(
+            "--level",
+            type=int,
+            default=6,
+            choices=range(0, 10),
+            metavar="0-9",
+            help="Deflate level (default 6)",
+        )
+
+    def handle(self, *args, **options):
+        manifest = export_snapshot(options["path"], compresslevel=options["level"])
+        for entry in manifest["tables"]:
+            self.stdout.write(f"  {entry['table']}: {entry['rows']} rows")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['path']} at migration {manifest['migration']}"
+            )
+        )
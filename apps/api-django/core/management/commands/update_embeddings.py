@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.embeddings import get_embedder, update_embeddings
+from core.models import Competency, SubCompetency, Artifact
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes embeddings for rows whose text changed since they were last "
+        "embedded. Switching settings.EMBEDDER re-embeds everything."
+    )
+
+    models = (Competency, SubCompetency, Artifact)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-embed every row, even if its digest is current",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Embedder: {settings.EMBEDDER} ({get_embedder().name})")
+        for model in self.models:
+            updated = update_embeddings(
+                model, batch_size=options["batch_size"], force=options["force"]
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"  {model.__name__}: re-embedded {updated}")
+            )
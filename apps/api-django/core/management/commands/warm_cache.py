@@ -0,0 +1,200 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import DisallowedHost
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.cache import warming
+from core.sync import read_changes, stable_txid
+from core.urls import router
+
+# Cursor (see sync.py) as of the last warm, for --changed
+CURSOR_KEY = "atlas:warm:cursor"
+
+# Per worker process (see _start_worker)
+_factory = _host = None
+
+
+def _start_worker(host):
+    global _factory, _host
+    _factory, _host = RequestFactory(), host
+
+
+def render(route):
+    """Render one route into the cache. Returns (label, status, ms)."""
+    viewset, action, path, params = route
+    request = _factory.get(path, params, HTTP_HOST=_host)
+    # Every route comes from this one address: a throttle would turn most
+    # of a run into 429s (and the cursor would never advance)
+    view = viewset.as_view({"get": action}, throttle_classes=())
+    kwargs = {}
+    if action == "retrieve":
+        kwargs[viewset.lookup_field] = path.rstrip("/").rsplit("/", 1)[-1]
+
+    started = time.perf_counter()
+    with warming():
+        status_code = view(request, **kwargs).status_code
+    label = f"{path}?{request.META['QUERY_STRING']}" if params else path
+    return label, status_code, (time.perf_counter() - started) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-renders every cached route registered on the API router (lists, "
+        "each filter value and every detail page) into the response cache. "
+        "Run after deploys and seed_data. Rendering is CPU-bound, so routes "
+        "are split across worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--host",
+            default=next(
+                (
+                    host.lstrip(".")
+                    for host in settings.ALLOWED_HOSTS
+                    if "*" not in host
+                ),
+                "localhost",
+            ),
+            help="Host the responses are rendered for (pagination links use it)",
+        )
+        parser.add_argument(
+            "--changed",
+            action="store_true",
+            help="Only routes whose content changed since the last warm",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches["default"], LocMemCache):
+            raise CommandError(
+                "The cache is per-process (locmem); warming it from here has no "
+                "effect on the servers. Set CACHE_URL to a shared cache."
+            )
+        host = options["host"]
+        try:
+            RequestFactory().get("/", HTTP_HOST=host).get_host()
+        except DisallowedHost:
+            raise CommandError(f"Host '{host}' is not in ALLOWED_HOSTS; pass --host.")
+
+        # Taken first: changes made while warming are picked up next time
+        cursor = stable_txid()
+        previous = cache.get(CURSOR_KEY)
+        routes = None
+        if options["changed"] and previous is not None:
+            # None if the log no longer reaches back (pruned, or restored)
+            routes = self.changed_routes(previous)
+        if routes is None:
+            routes = self.all_routes()
+
+        # Workers open their own database connections after the fork
+        connections.close_all()
+        started = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_start_worker,
+            initargs=(host,),
+        ) as pool:
+            results = list(pool.map(render, routes, chunksize=8))
+        elapsed = time.perf_counter() - started
+        failed = [(label, code) for label, code, _ in results if code != 200]
+        # Failed routes are retried by the next --changed run
+        if not failed:
+            cache.set(CURSOR_KEY, cursor, timeout=None)
+        self.report(results, failed, elapsed, options)
+
+    def cached_viewsets(self):
+        for prefix, viewset, basename in router.registry:
+            if getattr(viewset, "cache_namespace", None):
+                yield viewset, basename
+
+    def list_routes(self, viewset, basename):
+        path = reverse(f"{basename}-list")
+        yield viewset, "list", path, {}
+        # One route per filter value that has data (menus and tag links)
+        queryset = viewset.queryset.model.objects.order_by()
+        for field in getattr(viewset, "filterset_fields", []):
+            values = queryset.values_list(field, flat=True).distinct()
+            for value in values:
+                if value is None or value == "":
+                    continue
+                if isinstance(value, bool):
+                    value = str(value).lower()
+                yield viewset, "list", path, {field: value}
+
+    def detail_routes(self, viewset, basename, ids):
+        for pk in ids:
+            yield viewset, "retrieve", reverse(f"{basename}-detail", args=[pk]), {}
+
+    def all_routes(self):
+        routes = []
+        for viewset, basename in self.cached_viewsets():
+            routes.extend(self.list_routes(viewset, basename))
+            ids = viewset.queryset.model.objects.values_list("pk", flat=True)
+            routes.extend(self.detail_routes(viewset, basename, ids))
+        return routes
+
+    def changed_routes(self, since):
+        changed = {}
+        has_more = True
+        while has_more:
+            changes = read_changes(since)
+            if changes is None:
+                return None
+            since, has_more, page = changes
+            for resource, ids in page.items():
+                changed.setdefault(resource, set()).update(ids)
+
+        routes = []
+        for viewset, basename in self.cached_viewsets():
+            ids = changed.get(viewset.cache_namespace)
+            if not ids:
+                continue
+            routes.extend(self.list_routes(viewset, basename))
+            existing = viewset.queryset.model.objects.filter(pk__in=ids)
+            routes.extend(
+                self.detail_routes(
+                    viewset, basename, existing.values_list("pk", flat=True)
+                )
+            )
+        return routes
+
+    def report(self, results, failed, elapsed, options):
+        if not results:
+            self.stdout.write(self.style.SUCCESS("Nothing to warm"))
+            return
+
+        if options["verbosity"] > 1:
+            for label, status_code, ms in results:
+                self.stdout.write(f"{ms:9.1f} ms  {status_code}  {label}")
+
+        for label, status_code in failed:
+            self.stderr.write(f"{status_code} {label}")
+        if failed:
+            self.stderr.write("Cursor not advanced: --changed will retry these")
+
+        times = np.array([ms for _, _, ms in results])
+        slowest = sorted(results, key=lambda result: -result[2])[:5]
+        self.stdout.write(
+            "Slowest: " + ", ".join(f"{l} {ms:.0f} ms" for l, _, ms in slowest)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {len(results) - len(failed)}/{len(results)} routes in "
+                f"{elapsed:.1f}s with {options['workers']} workers "
+                f"(render p50 {np.percentile(times, 50):.1f} ms, "
+                f"p95 {np.percentile(times, 95):.1f} ms, "
+                f"total {times.sum() / 1000:.1f}s)"
+            )
+        )
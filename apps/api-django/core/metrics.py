@@ -0,0 +1,44 @@
+"""
+In-process counters for cache behaviour (hits, stale serves, recomputes,
+duplicate recomputes...), exposed to staff at /api/metrics/.
+
+Counters are per process: with several workers, each reports its own.
+"""
+
+import os
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def increment(name, key=None, amount=1):
+    """Count `name`, overall and (if given) for one cache key."""
+    with _lock:
+        _counters[(name, None)] += amount
+        if key is not None:
+            _counters[(name, key)] += amount
+
+
+def value(name, key=None):
+    with _lock:
+        return _counters[(name, key)]
+
+
+def snapshot():
+    """{"pid": ..., "totals": {name: n}, "keys": {key: {name: n}}}"""
+    totals, keys = {}, {}
+    with _lock:
+        items = list(_counters.items())
+    for (name, key), count in sorted(items, key=lambda item: str(item[0])):
+        if key is None:
+            totals[name] = count
+        else:
+            keys.setdefault(key, {})[name] = count
+    return {"pid": os.getpid(), "totals": totals, "keys": keys}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
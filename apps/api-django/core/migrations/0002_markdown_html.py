@@ -0,0 +1,210 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:08
+
+import hashlib
+from html import escape
+from html.parser import HTMLParser
+
+import markdown
+from django.db import migrations, models
+
+# Frozen copy of core.rendering at this migration: the backfill must keep
+# producing renderer version 1 output, whatever the live module becomes.
+# Bumping RENDERER_VERSION later makes these rows stale for
+# `manage.py render_markdown` like any others.
+RENDERER_VERSION = "1"
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+
+ALLOWED_TAGS = {
+    "a",
+    "abbr",
+    "blockquote",
+    "br",
+    "code",
+    "dd",
+    "del",
+    "dl",
+    "dt",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "img",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "strong",
+    "sub",
+    "sup",
+    "table",
+    "tbody",
+    "td",
+    "th",
+    "thead",
+    "tr",
+    "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "code": {"class"},
+    "img": {"src", "alt", "title"},
+    "td": {"align"},
+    "th": {"align"},
+}
+
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"http", "https", "mailto"}
+
+VOID_TAGS = {"br", "hr", "img"}
+
+# Content inside these tags is dropped entirely, not just the tags
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template"}
+
+
+def _is_safe_url(value):
+    # Browsers ignore whitespace/control chars inside schemes ("java\tscript:")
+    cleaned = "".join(ch for ch in value if ch > " ").lower()
+    scheme, sep, _ = cleaned.partition(":")
+    if not sep or "/" in scheme or "?" in scheme or "#" in scheme:
+        return True  # Relative URL or fragment
+    return scheme in ALLOWED_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    """
+    Allow-list HTML filter. Anything not explicitly allowed is escaped or dropped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth += 1
+            return
+        if self.drop_depth or tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _is_safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value, quote=True)}"')
+
+        if tag == "a":
+            rendered.append(' rel="nofollow noopener"')
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(self.drop_depth - 1, 0)
+            return
+        if self.drop_depth or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+        self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.drop_depth:
+            self.parts.append(escape(data, quote=False))
+
+
+def sanitize_html(html):
+    parser = _Sanitizer()
+    parser.feed(html)
+    parser.close()
+    return "".join(parser.parts)
+
+
+def render_markdown(text):
+    if not text:
+        return ""
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    return sanitize_html(html)
+
+
+def markdown_digest(*sources):
+    digest = hashlib.sha256(RENDERER_VERSION.encode())
+    for source in sources:
+        digest.update(b"\x00")
+        digest.update((source or "").encode())
+    return digest.hexdigest()
+
+
+RENDERED_FIELDS = {
+    "Competency": {"summary": "summary_html"},
+    "SubCompetency": {"desc": "desc_html"},
+    "Artifact": {"description": "description_html"},
+}
+
+
+def render_existing(apps, schema_editor):
+    for model_name, fields in RENDERED_FIELDS.items():
+        model = apps.get_model("core", model_name)
+        objs = list(model.objects.all())
+        for obj in objs:
+            for source, target in fields.items():
+                setattr(obj, target, render_markdown(getattr(obj, source)))
+            obj.markdown_digest = markdown_digest(
+                *(getattr(obj, source) for source in fields)
+            )
+        model.objects.bulk_update(
+            objs, [*fields.values(), "markdown_digest"], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artifact",
+            name="description_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="artifact",
+            name="markdown_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="markdown_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="summary_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="subcompetency",
+            name="desc_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="subcompetency",
+            name="markdown_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
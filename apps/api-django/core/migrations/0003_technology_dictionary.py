@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+# Frozen copy of models.REBUILD_TECHNOLOGIES_SQL at this migration: the
+# backfill must keep matching this schema, whatever the model becomes
+BACKFILL_SQL = """
+INSERT INTO core_technology (name, key, artifact_count, competency_count)
+SELECT name, lower(name), sum(artifacts), sum(competencies)
+FROM (
+    SELECT t.name, count(DISTINCT a.id) AS artifacts, 0 AS competencies
+    FROM core_artifact a CROSS JOIN LATERAL unnest(a.tech_stack) AS t(name)
+    GROUP BY t.name
+    UNION ALL
+    SELECT t.name, 0, count(DISTINCT c.id)
+    FROM core_competency c CROSS JOIN LATERAL unnest(c.tags) AS t(name)
+    GROUP BY t.name
+) usage
+GROUP BY name
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_markdown_html"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Technology",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Lowercased name for lookups",
+                        max_length=50,
+                    ),
+                ),
+                ("artifact_count", models.PositiveIntegerField(default=0)),
+                ("competency_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "Technologies",
+                "ordering": ["name"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("artifact_count__gt", 0)),
+                        fields=["name"],
+                        name="core_tech_used_by_artifacts",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
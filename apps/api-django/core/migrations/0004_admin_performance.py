@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:15
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations
+
+# Django renders OpClass(Upper(...)) as "(UPPER(col) gin_trgm_ops)", which
+# Postgres rejects; the operator class must follow the parenthesized expression.
+CREATE_SNIPPET_INDEX = """
+CREATE INDEX "core_ccr_snippet_trgm" ON "core_commitcodereference"
+USING gin ((UPPER("cached_snippet")) gin_trgm_ops)
+"""
+
+DROP_SNIPPET_INDEX = 'DROP INDEX IF EXISTS "core_ccr_snippet_trgm"'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_technology_dictionary"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_SNIPPET_INDEX, DROP_SNIPPET_INDEX),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="commitcodereference",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        django.contrib.postgres.indexes.OpClass(
+                            django.db.models.functions.text.Upper("cached_snippet"),
+                            name="gin_trgm_ops",
+                        ),
+                        name="core_ccr_snippet_trgm",
+                    ),
+                ),
+            ],
+        ),
+    ]
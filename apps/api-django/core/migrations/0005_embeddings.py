@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:22
+
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+from pgvector.django import VectorExtension
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_admin_performance"),
+    ]
+
+    operations = [
+        VectorExtension(),
+        migrations.AddField(
+            model_name="artifact",
+            name="embedding",
+            field=pgvector.django.vector.VectorField(
+                blank=True, dimensions=256, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="artifact",
+            name="embedding_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="embedding",
+            field=pgvector.django.vector.VectorField(
+                blank=True, dimensions=256, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="embedding_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="subcompetency",
+            name="embedding",
+            field=pgvector.django.vector.VectorField(
+                blank=True, dimensions=256, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="subcompetency",
+            name="embedding_digest",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="artifact",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="core_artifact_embedding",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="competency",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="core_competency_embedding",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subcompetency",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="core_subcomp_embedding",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
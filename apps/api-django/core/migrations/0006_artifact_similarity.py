@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_embeddings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArtifactSimilarity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "artifact",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similarities",
+                        to="core.artifact",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_to",
+                        to="core.artifact",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Artifact similarities",
+                "ordering": ["artifact", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("artifact", "rank"), name="core_artsim_artifact_rank"
+                    )
+                ],
+            },
+        ),
+    ]
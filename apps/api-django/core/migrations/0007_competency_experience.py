@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:37
+
+import re
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of core.history.parse_year_range at this migration: the
+# backfill must keep parsing the way it did, whatever the live module becomes
+YEAR_RANGE_RE = re.compile(r"^\s*(\d{4})\s*(?:[-–]\s*(\d{4}|present|current|now)\s*)?$")
+
+
+def parse_year_range(text):
+    match = YEAR_RANGE_RE.match(str(text or "").lower())
+    if not match:
+        return None, None
+    start, end = match.groups()
+    if end is None:
+        return int(start), int(start)
+    if not end.isdigit():
+        return int(start), None
+    return int(start), int(end)
+
+
+def backfill_experience(apps, schema_editor):
+    Competency = apps.get_model("core", "Competency")
+    CompetencyExperience = apps.get_model("core", "CompetencyExperience")
+    rows = []
+    for competency_id, history in Competency.objects.values_list("id", "history"):
+        for position, entry in enumerate(history or []):
+            if not isinstance(entry, dict):
+                continue
+            year_start, year_end = parse_year_range(entry.get("year"))
+            rows.append(
+                CompetencyExperience(
+                    competency_id=competency_id,
+                    position=position,
+                    role=str(entry.get("role") or "")[:200],
+                    company=str(entry.get("company") or "")[:200],
+                    year_start=year_start,
+                    year_end=year_end,
+                )
+            )
+    CompetencyExperience.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_artifact_similarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompetencyExperience",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField()),
+                ("role", models.CharField(blank=True, max_length=200)),
+                ("company", models.CharField(blank=True, max_length=200)),
+                ("year_start", models.PositiveSmallIntegerField(blank=True, null=True)),
+                (
+                    "year_end",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        help_text="Empty while current ('Present')",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Competency experience",
+                "ordering": ["competency", "position"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="competency",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["history"],
+                name="core_competency_history",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        migrations.AddField(
+            model_name="competencyexperience",
+            name="competency",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="experience",
+                to="core.competency",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="competencyexperience",
+            index=models.Index(
+                fields=["company", "year_start", "year_end"],
+                name="core_compet_company_96b196_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="competencyexperience",
+            index=models.Index(
+                fields=["year_start", "year_end"], name="core_compet_year_st_e88c89_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_experience, migrations.RunPython.noop),
+    ]
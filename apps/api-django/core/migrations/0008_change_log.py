@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:55
+
+import core.models
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_competency_experience"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "txid",
+                    models.BigIntegerField(
+                        db_default=core.models.CurrentTransactionId(), editable=False
+                    ),
+                ),
+                (
+                    "resource",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("categories", "Category"),
+                            ("competencies", "Competency"),
+                            ("artifacts", "Artifact"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.CharField(blank=True, max_length=100)),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                            ("prune", "Prune"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_default=django.db.models.functions.datetime.Now(),
+                        editable=False,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Change log",
+                "ordering": ["txid", "id"],
+                "indexes": [
+                    models.Index(fields=["txid", "id"], name="core_changelog_txid")
+                ],
+            },
+        ),
+    ]
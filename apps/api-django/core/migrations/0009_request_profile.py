@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_change_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.TextField()),
+                ("query_string", models.TextField(blank=True)),
+                ("status_code", models.PositiveSmallIntegerField()),
+                ("duration_ms", models.FloatField()),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("header", "Signed header"),
+                            ("staff", "Staff ?profile=1"),
+                            ("sample", "Random sample"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("username", models.CharField(blank=True, max_length=150)),
+                ("sample_count", models.PositiveIntegerField()),
+                ("stacks", models.TextField()),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:42
+
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+UPDATE core_competency c
+SET category_display_order = cat.display_order
+FROM core_category cat
+WHERE cat.id = c.category_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_slow_query"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="competency",
+            options={"ordering": ["category_display_order", "name", "id"]},
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="category_display_order",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="competency",
+            index=models.Index(
+                fields=["category_display_order", "name", "id"],
+                name="core_competency_order",
+            ),
+        ),
+    ]
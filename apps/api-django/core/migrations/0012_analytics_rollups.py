@@ -0,0 +1,169 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_SQL = [
+    """
+    INSERT INTO core_competencyusage (competency_id, role, artifact_count)
+    SELECT competency_id, role, count(*)
+    FROM core_artifactcompetency
+    GROUP BY competency_id, role
+    """,
+    """
+    INSERT INTO core_artifactmonth (month, status, complexity, artifact_count)
+    SELECT date_trunc('month', date_created)::date, status, complexity, count(*)
+    FROM core_artifact
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO core_artifactcategory (artifact_id, category_id, month, link_count)
+    SELECT a.id, c.category_id, date_trunc('month', a.date_created)::date, count(*)
+    FROM core_artifactcompetency ac
+    JOIN core_artifact a ON a.id = ac.artifact_id
+    JOIN core_competency c ON c.id = ac.competency_id
+    GROUP BY 1, 2, 3
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_competency_display_order"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArtifactMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("planned", "Planned"),
+                            ("in-progress", "In Progress"),
+                            ("complete", "Complete"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "complexity",
+                    models.CharField(
+                        choices=[
+                            ("beginner", "Beginner"),
+                            ("intermediate", "Intermediate"),
+                            ("advanced", "Advanced"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("artifact_count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["month", "status", "complexity"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("month", "status", "complexity"),
+                        name="core_artmonth_key",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArtifactCategory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("link_count", models.PositiveIntegerField(default=0)),
+                (
+                    "artifact",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.artifact",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Artifact categories",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("artifact", "category"), name="core_artcategory_key"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="CompetencyUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("primary", "Primary Tech"),
+                            ("secondary", "Secondary Tech"),
+                            ("supporting", "Supporting Tech"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("artifact_count", models.PositiveIntegerField(default=0)),
+                (
+                    "competency",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage",
+                        to="core.competency",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Competency usage",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("competency", "role"), name="core_compusage_key"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
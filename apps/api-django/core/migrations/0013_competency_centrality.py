@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_analytics_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GraphRanking",
+            fields=[
+                (
+                    "graph",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("digest", models.CharField(max_length=100)),
+                ("node_count", models.PositiveIntegerField()),
+                ("edge_count", models.PositiveIntegerField()),
+                (
+                    "iterations",
+                    models.PositiveIntegerField(help_text="PageRank iterations"),
+                ),
+                ("duration_ms", models.FloatField()),
+                ("computed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="betweenness_centrality",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="degree_centrality",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="competency",
+            name="pagerank",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="competency",
+            index=models.Index(fields=["-pagerank", "id"], name="core_competency_rank"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:34
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_competency_centrality"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="artifact",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["tech_stack"], name="core_artifact_tech_stack"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_artifact_tech_stack_gin"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="competency",
+            options={
+                "ordering": ["category_display_order", "name", "id"],
+                "verbose_name_plural": "Competencies",
+            },
+        ),
+    ]
@@ -1,8 +1,130 @@
-from django.db import models
+import copy
+from collections import Counter
+
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Now, Upper
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 
+from pgvector.django import HnswIndex, VectorField
+
+from . import rendering
+from .embeddings import EMBEDDING_DIMENSIONS
+from .slugs import allocate_slugs, lock_slug_allocation
+
+
+class LoadedValuesMixin:
+    """
+    Remembers the DB value of `tracked_fields` so write hooks can diff
+    old vs new without re-reading the row.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self, fields=None):
+        """Record the current values (of `fields` only, if given) as stored."""
+        loaded = getattr(self, "_loaded_values", {}) if fields is not None else {}
+        # Deferred fields aren't in __dict__; skip them rather than fetch
+        self._loaded_values = {
+            **loaded,
+            **{
+                field: copy.deepcopy(self.__dict__[field])
+                for field in self.tracked_fields
+                if field in self.__dict__ and (fields is None or field in fields)
+            },
+        }
+
+    def get_loaded_value(self, field, default=None):
+        return getattr(self, "_loaded_values", {}).get(field, default)
+
+
+class MarkdownRenderedModel(models.Model):
+    """
+    Stores sanitized HTML next to Markdown source fields.
+    Subclasses map each source field to its rendered column in `markdown_fields`.
+    """
+
+    markdown_fields = {}
+
+    markdown_digest = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def render_markdown(self, force=False):
+        """
+        Re-render the HTML columns if the source text (or renderer) changed.
+        Returns True when anything was re-rendered.
+        """
+        digest = rendering.markdown_digest(
+            *(getattr(self, source) for source in self.markdown_fields)
+        )
+        if digest == self.markdown_digest and not force:
+            return False
+
+        for source, target in self.markdown_fields.items():
+            setattr(self, target, rendering.render_markdown(getattr(self, source)))
+        self.markdown_digest = digest
+        return True
+
+    def save(self, *args, **kwargs):
+        if self.render_markdown():
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    *self.markdown_fields.values(),
+                    "markdown_digest",
+                }
+        super().save(*args, **kwargs)
+
+
+class EmbeddedManager(models.Manager):
+    def get_queryset(self):
+        # Vectors are only needed DB-side (ORDER BY distance); don't ship
+        # 256 floats per row to Python on every query
+        return super().get_queryset().defer("embedding")
+
+
+class EmbeddedModel(models.Model):
+    """
+    Vector embedding of the row's text (see embeddings.py). Re-embedded after
+    each committed write that changes the text (signals.py), and in batches
+    by `manage.py update_embeddings`.
+    """
+
+    embedding_source_fields = ()
+
+    embedding = VectorField(
+        dimensions=EMBEDDING_DIMENSIONS, null=True, blank=True, editable=False
+    )
+    embedding_digest = models.CharField(max_length=64, blank=True, editable=False)
+
+    objects = EmbeddedManager()
+
+    class Meta:
+        abstract = True
+
+    def embedding_text(self):
+        parts = []
+        for field in self.embedding_source_fields:
+            value = getattr(self, field)
+            parts.append(", ".join(value) if isinstance(value, list) else value or "")
+        return "\n".join(parts)
+
+    def clean_fields(self, exclude=None):
+        # Machine-generated, and validating it would load it when deferred
+        super().clean_fields(exclude={*(exclude or ()), "embedding"})
+
 
 class Category(models.Model):
     """
@@ -31,7 +153,134 @@ class Category(models.Model):
         return self.name
 
 
-class Competency(models.Model):
+class TechnologyManager(models.Manager):
+    def record_usage(self, field, before, after):
+        """
+        Apply count deltas for a batch of writes. `before`/`after` are parallel
+        lists of tag lists (use [] for created/deleted rows); `field` is the
+        counter column, e.g. "artifact_count".
+        """
+        deltas = Counter()
+        for old, new in zip(before, after):
+            old, new = set(old or ()), set(new or ())
+            deltas.update(new - old)
+            deltas.subtract(old - new)
+
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        added = sorted(name for name, delta in deltas.items() if delta > 0)
+        self.bulk_create(
+            [Technology(name=name, key=name.lower()) for name in added],
+            ignore_conflicts=True,
+        )
+
+        # One UPDATE per distinct delta (usually just +1 and -1)
+        by_delta = {}
+        for name, delta in deltas.items():
+            by_delta.setdefault(delta, []).append(name)
+        for delta, names in sorted(by_delta.items()):
+            self.filter(name__in=sorted(names)).update(
+                **{field: Greatest(F(field) + delta, 0)}
+            )
+
+    def canonical_names(self, names):
+        """
+        Map each name onto the spelling already in the dictionary ("python" ->
+        "Python"), preferring the most used one. Unknown names map to themselves.
+        """
+        names = set(names)
+        canonical = {}
+        for name, key in (
+            self.filter(key__in={name.lower() for name in names})
+            .order_by("key", "-artifact_count", "-competency_count", "name")
+            .values_list("name", "key")
+        ):
+            canonical.setdefault(key, name)
+        return {name: canonical.get(name.lower(), name) for name in names}
+
+    def canonicalize(self, names):
+        """
+        Canonical spelling of `names`, de-duplicated, order preserved.
+        """
+        mapping = self.canonical_names(names)
+        return list(dict.fromkeys(mapping[name] for name in names))
+
+    def rebuild(self):
+        """
+        Recount everything from scratch (repairs drift from raw SQL edits).
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.model._meta.db_table}")
+            cursor.execute(REBUILD_TECHNOLOGIES_SQL)
+
+
+# Migration 0003 backfills with a frozen copy of this statement (as of that
+# migration); edit this one, not that one
+REBUILD_TECHNOLOGIES_SQL = """
+INSERT INTO core_technology (name, key, artifact_count, competency_count)
+SELECT name, lower(name), sum(artifacts), sum(competencies)
+FROM (
+    SELECT t.name, count(DISTINCT a.id) AS artifacts, 0 AS competencies
+    FROM core_artifact a CROSS JOIN LATERAL unnest(a.tech_stack) AS t(name)
+    GROUP BY t.name
+    UNION ALL
+    SELECT t.name, 0, count(DISTINCT c.id)
+    FROM core_competency c CROSS JOIN LATERAL unnest(c.tags) AS t(name)
+    GROUP BY t.name
+) usage
+GROUP BY name
+"""
+
+
+class Technology(models.Model):
+    """
+    Dictionary of every name used in Artifact.tech_stack / Competency.tags.
+    Counts are maintained incrementally by the write hooks in signals.py.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    key = models.CharField(
+        max_length=50, db_index=True, help_text="Lowercased name for lookups"
+    )
+    artifact_count = models.PositiveIntegerField(default=0)
+    competency_count = models.PositiveIntegerField(default=0)
+
+    objects = TechnologyManager()
+
+    class Meta:
+        verbose_name_plural = "Technologies"
+        ordering = ["name"]
+        indexes = [
+            # Serves the admin's tech stack filter in one index scan
+            models.Index(
+                fields=["name"],
+                condition=models.Q(artifact_count__gt=0),
+                name="core_tech_used_by_artifacts",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class CompetencyManager(EmbeddedManager):
+    def rebuild_category_order(self):
+        """
+        Re-copy each category's display_order onto its competencies (repairs
+        drift from queryset updates of categories). Returns the rows fixed.
+        """
+        return self.exclude(category_display_order=F("category__display_order")).update(
+            category_display_order=models.Subquery(
+                Category.objects.filter(pk=models.OuterRef("category_id")).values(
+                    "display_order"
+                )
+            )
+        )
+
+
+class Competency(LoadedValuesMixin, MarkdownRenderedModel, EmbeddedModel):
     PROFICIENCY_CHOICES = [
         ("Learning", "Learning"),
         ("Proficient", "Proficient"),
@@ -64,11 +313,16 @@ class Competency(models.Model):
     category = models.ForeignKey(
         Category, on_delete=models.PROTECT, related_name="competencies"
     )
+    # Copy of category.display_order (kept by save() and signals.py, repaired
+    # by `manage.py rebuild_competency_order`), so the default ordering is
+    # an index scan instead of a join and a sort
+    category_display_order = models.IntegerField(default=0, editable=False)
     competency_type = models.CharField(
         max_length=50, choices=TYPE_CHOICES, default="concept"
     )
     proficiency = models.CharField(max_length=50, choices=PROFICIENCY_CHOICES)
     summary = models.TextField()
+    summary_html = models.TextField(blank=True, editable=False)
 
     tags = ArrayField(models.CharField(max_length=50), blank=True, default=list)
     related_competencies = models.ManyToManyField("self", blank=True, symmetrical=False)
@@ -77,14 +331,45 @@ class Competency(models.Model):
         max_length=20, choices=PRIORITY_CHOICES, default="medium"
     )
     portfolio_highlight = models.BooleanField(default=False)
+    # Graph ranking scores, stored by `manage.py rank_competencies`
+    pagerank = models.FloatField(default=0, editable=False)
+    degree_centrality = models.FloatField(default=0, editable=False)
+    betweenness_centrality = models.FloatField(default=0, editable=False)
+
+    markdown_fields = {"summary": "summary_html"}
+    # name/type/category are embedded in other documents (see sync.py)
+    tracked_fields = ("tags", "history", "name", "competency_type", "category_id")
+    embedding_source_fields = ("name", "summary", "tags")
+
+    objects = CompetencyManager()
 
     class Meta:
+        verbose_name_plural = "Competencies"
         indexes = [
             models.Index(fields=["category", "showcase_priority"]),
+            models.Index(
+                fields=["category_display_order", "name", "id"],
+                name="core_competency_order",
+            ),
             models.Index(fields=["competency_type", "proficiency"]),
             models.Index(fields=["portfolio_highlight"]),
+            # ?ordering=centrality
+            models.Index(fields=["-pagerank", "id"], name="core_competency_rank"),
+            # Containment filters like history @> '[{"company": "Mechdyne"}]'
+            GinIndex(
+                fields=["history"],
+                opclasses=["jsonb_path_ops"],
+                name="core_competency_history",
+            ),
+            HnswIndex(
+                name="core_competency_embedding",
+                fields=["embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
         ]
-        ordering = ["category__display_order", "name"]
+        ordering = ["category_display_order", "name", "id"]
 
     def clean(self):
         if self.id and not self.id.strip():
@@ -104,6 +389,12 @@ class Competency(models.Model):
                 clean_name = clean_name.replace(old, new)
             self.id = slugify(clean_name)
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"category", "category_id"} & set(update_fields):
+            self.category_display_order = self.category.display_order
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "category_display_order"}
+
         # Validation runs AFTER slug is set
         self.full_clean()
         super().save(*args, **kwargs)
@@ -115,6 +406,56 @@ class Competency(models.Model):
         return self.name
 
 
+class GraphRanking(models.Model):
+    """
+    State of the last graph ranking run (see centrality.py): the digest of
+    the graph it ranked, so unchanged graphs aren't ranked again.
+    """
+
+    graph = models.CharField(max_length=50, primary_key=True)
+    digest = models.CharField(max_length=100)
+    node_count = models.PositiveIntegerField()
+    edge_count = models.PositiveIntegerField()
+    iterations = models.PositiveIntegerField(help_text="PageRank iterations")
+    duration_ms = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return (
+            f"{self.graph} ({self.node_count} nodes, {self.computed_at:%Y-%m-%d %H:%M})"
+        )
+
+
+class CompetencyExperience(models.Model):
+    """
+    One row per Competency.history entry, with its "2021-2023" /
+    "2023-Present" year range parsed for range filters and the timeline.
+    Derived data: kept in sync by signals.py (see history.py).
+    """
+
+    competency = models.ForeignKey(
+        Competency, on_delete=models.CASCADE, related_name="experience"
+    )
+    position = models.PositiveSmallIntegerField()  # Index in Competency.history
+    role = models.CharField(max_length=200, blank=True)
+    company = models.CharField(max_length=200, blank=True)
+    year_start = models.PositiveSmallIntegerField(null=True, blank=True)
+    year_end = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Empty while current ('Present')"
+    )
+
+    class Meta:
+        verbose_name_plural = "Competency experience"
+        ordering = ["competency", "position"]
+        indexes = [
+            models.Index(fields=["company", "year_start", "year_end"]),
+            models.Index(fields=["year_start", "year_end"]),
+        ]
+
+    def __str__(self):
+        return f"{self.competency_id}: {self.role} @ {self.company}"
+
+
 class CommitCodeReference(models.Model):
     owner = models.CharField(max_length=100, default="batgoose")
     repository = models.CharField(max_length=100, default="engineering-atlas")
@@ -127,6 +468,16 @@ class CommitCodeReference(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Trigram index for the admin's opt-in snippet search, which
+            # compiles to UPPER(cached_snippet) LIKE UPPER('%term%')
+            GinIndex(
+                OpClass(Upper("cached_snippet"), name="gin_trgm_ops"),
+                name="core_ccr_snippet_trgm",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.file_path} ({self.start_line}-{self.end_line})"
 
@@ -157,19 +508,32 @@ class CommitCodeReference(models.Model):
         super().save(*args, **kwargs)
 
 
-class SubCompetency(models.Model):
+class SubCompetency(MarkdownRenderedModel, EmbeddedModel):
     id = models.SlugField(max_length=100, primary_key=True)
     parent = models.ForeignKey(
         Competency, related_name="sub_competencies", on_delete=models.CASCADE
     )
     name = models.CharField(max_length=200)
     desc = models.TextField()
+    desc_html = models.TextField(blank=True, editable=False)
     display_order = models.IntegerField(default=0)
     code_references = models.ManyToManyField(CommitCodeReference, blank=True)
 
+    markdown_fields = {"desc": "desc_html"}
+    embedding_source_fields = ("name", "desc")
+
     class Meta:
         verbose_name_plural = "Sub Competencies"
         ordering = ["parent", "display_order", "name"]
+        indexes = [
+            HnswIndex(
+                name="core_subcomp_embedding",
+                fields=["embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.id:
@@ -181,7 +545,7 @@ class SubCompetency(models.Model):
         super().save(*args, **kwargs)
 
 
-class Artifact(models.Model):
+class Artifact(LoadedValuesMixin, MarkdownRenderedModel, EmbeddedModel):
     STATUS_CHOICES = [
         ("planned", "Planned"),
         ("in-progress", "In Progress"),
@@ -212,6 +576,7 @@ class Artifact(models.Model):
     demo_type = models.CharField(max_length=50, choices=DEMO_TYPE_CHOICES)
 
     description = models.TextField()
+    description_html = models.TextField(blank=True, editable=False)
     repo_url = models.CharField(max_length=255, blank=True, default="")
     live_url = models.CharField(max_length=255, blank=True, default="")
 
@@ -224,11 +589,24 @@ class Artifact(models.Model):
         Competency, through="ArtifactCompetency", related_name="artifacts"
     )
 
+    markdown_fields = {"description": "description_html"}
+    tracked_fields = ("tech_stack", "status", "complexity", "date_created")
+    embedding_source_fields = ("title", "description", "tech_stack")
+
     class Meta:
         indexes = [
             models.Index(fields=["status", "complexity"]),
             models.Index(fields=["demo_type"]),
             models.Index(fields=["-date_created"]),
+            # ?tech_stack= and the similarity refresh (tech_stack && names)
+            GinIndex(fields=["tech_stack"], name="core_artifact_tech_stack"),
+            HnswIndex(
+                name="core_artifact_embedding",
+                fields=["embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["vector_cosine_ops"],
+            ),
         ]
         ordering = ["-date_created"]
 
@@ -257,14 +635,14 @@ class Artifact(models.Model):
     def save(self, *args, **kwargs):
         # 1. Auto-generate Slug from Title if missing
         if not self.id:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            # Handle collisions (e.g. two projects named "Portfolio")
-            while Artifact.objects.filter(id=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.id = slug
+            # Lock + insert share a transaction so concurrent saves can't
+            # allocate the same slug (e.g. two projects named "Portfolio")
+            with transaction.atomic():
+                lock_slug_allocation(Artifact)
+                self.id = allocate_slugs(Artifact, [slugify(self.title)])[0]
+                self.full_clean()
+                super().save(*args, **kwargs)
+            return
 
         # 2. Run Validation (calls clean() above)
         self.full_clean()
@@ -289,3 +667,288 @@ class ArtifactCompetency(models.Model):
 
     class Meta:
         unique_together = ("artifact", "competency")
+
+
+class ArtifactSimilarity(models.Model):
+    """
+    Precomputed top-k "similar projects" for each artifact (see similarity.py).
+    Derived data: kept current on writes, rebuilt with
+    `manage.py rebuild_similarities`.
+    """
+
+    # The (artifact, rank) constraint below doubles as the lookup index
+    artifact = models.ForeignKey(
+        Artifact, on_delete=models.CASCADE, related_name="similarities", db_index=False
+    )
+    similar = models.ForeignKey(
+        Artifact, on_delete=models.CASCADE, related_name="similar_to"
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = "Artifact similarities"
+        ordering = ["artifact", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["artifact", "rank"], name="core_artsim_artifact_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.artifact_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+class RollupManager(models.Manager):
+    def apply(self, deltas):
+        """
+        Add a batch of count deltas, {key tuple: delta}, where keys follow the
+        model's `rollup_key` fields. Missing rows are created for positive
+        deltas; counts never go below zero.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        fields, counter = self.model.rollup_key, self.model.rollup_counter
+        added = sorted(key for key, delta in deltas.items() if delta > 0)
+        self.bulk_create(
+            [self.model(**dict(zip(fields, key))) for key in added],
+            ignore_conflicts=True,
+        )
+
+        # One UPDATE joined to the deltas as arrays: an OR per key doesn't
+        # scale to bulk writes
+        opts = self.model._meta
+        columns = [opts.get_field(name).column for name in fields]
+        types = [opts.get_field(name).db_type(connection) for name in fields]
+        keys = sorted(deltas)
+        arrays = [[key[i] for key in keys] for i in range(len(fields))]
+        counter_column = opts.get_field(counter).column
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {opts.db_table} AS t"
+                f" SET {counter_column} = GREATEST(t.{counter_column} + d.delta, 0)"
+                f" FROM unnest({', '.join(f'%s::{type}[]' for type in types)},"
+                f" %s::integer[]) AS d({', '.join(columns)}, delta)"
+                f" WHERE {' AND '.join(f't.{c} = d.{c}' for c in columns)}",
+                [*arrays, [deltas[key] for key in keys]],
+            )
+
+
+class CompetencyUsage(models.Model):
+    """
+    Artifacts linked to each competency, per role. Rollup for /api/stats/,
+    maintained by the write hooks in signals.py (see rollups.py).
+    """
+
+    competency = models.ForeignKey(
+        Competency, on_delete=models.CASCADE, related_name="usage", db_index=False
+    )
+    role = models.CharField(max_length=50, choices=ArtifactCompetency.ROLE_CHOICES)
+    artifact_count = models.PositiveIntegerField(default=0)
+
+    rollup_key = ("competency_id", "role")
+    rollup_counter = "artifact_count"
+    objects = RollupManager()
+
+    class Meta:
+        verbose_name_plural = "Competency usage"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["competency", "role"], name="core_compusage_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.competency_id} ({self.role}): {self.artifact_count}"
+
+
+class ArtifactMonth(models.Model):
+    """
+    Artifacts created per month, by status and complexity. Rollup for
+    /api/stats/ (see rollups.py).
+    """
+
+    month = models.DateField(help_text="First day of the month")
+    status = models.CharField(max_length=50, choices=Artifact.STATUS_CHOICES)
+    complexity = models.CharField(max_length=50, choices=Artifact.COMPLEXITY_CHOICES)
+    artifact_count = models.PositiveIntegerField(default=0)
+
+    rollup_key = ("month", "status", "complexity")
+    rollup_counter = "artifact_count"
+    objects = RollupManager()
+
+    class Meta:
+        ordering = ["month", "status", "complexity"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "status", "complexity"], name="core_artmonth_key"
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.month:%Y-%m} {self.status}/{self.complexity}: {self.artifact_count}"
+        )
+
+
+class ArtifactCategory(models.Model):
+    """
+    How many of an artifact's competencies are in each category, with the
+    artifact's month. Counting the rows with links is "artifacts per category
+    and month" without joining artifacts, links and competencies (see
+    rollups.py).
+    """
+
+    # The (artifact, category) constraint below doubles as the lookup index
+    artifact = models.ForeignKey(
+        Artifact, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField()
+    link_count = models.PositiveIntegerField(default=0)
+
+    rollup_key = ("artifact_id", "category_id", "month")
+    rollup_counter = "link_count"
+    objects = RollupManager()
+
+    class Meta:
+        verbose_name_plural = "Artifact categories"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["artifact", "category"], name="core_artcategory_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.artifact_id} in {self.category_id}: {self.link_count}"
+
+
+class CurrentTransactionId(models.Func):
+    """The writing transaction's id (xid8, as bigint)."""
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One row per API document (category, competency, artifact) changed by a
+    transaction, written in that transaction by signals.py. Read back in
+    transaction order by /api/sync/ (see sync.py).
+    """
+
+    RESOURCE_CHOICES = [
+        ("categories", "Category"),
+        ("competencies", "Competency"),
+        ("artifacts", "Artifact"),
+    ]
+    OP_CHOICES = [
+        ("create", "Create"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+        # Marker left by `manage.py prune_changelog` and snapshot restores:
+        # entries at or below its txid are gone, so older cursors must
+        # resync from scratch
+        ("prune", "Prune"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    txid = models.BigIntegerField(db_default=CurrentTransactionId(), editable=False)
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES, blank=True)
+    object_id = models.CharField(max_length=100, blank=True)
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
+
+    class Meta:
+        verbose_name_plural = "Change log"
+        ordering = ["txid", "id"]
+        indexes = [models.Index(fields=["txid", "id"], name="core_changelog_txid")]
+
+    def __str__(self):
+        return f"{self.txid}: {self.op} {self.resource}/{self.object_id}"
+
+
+class RequestProfile(models.Model):
+    """
+    A sampled profile of one request (see profiling.py): its metadata and
+    the collapsed stacks, "frame;frame;frame <microseconds>" per line.
+    """
+
+    TRIGGER_CHOICES = [
+        ("header", "Signed header"),
+        ("staff", "Staff ?profile=1"),
+        ("sample", "Random sample"),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    query_string = models.TextField(blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    username = models.CharField(max_length=150, blank=True)
+    sample_count = models.PositiveIntegerField()
+    stacks = models.TextField()
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class SlowQueryManager(models.Manager):
+    def record(self, fingerprint, sql, duration_ms, plan=None, seq_scans=None):
+        """
+        Add one execution to a fingerprint's aggregates (and its fresh plan,
+        if one was captured). Safe against concurrent recorders.
+        """
+        self.bulk_create(
+            [SlowQuery(fingerprint=fingerprint, sql=sql)], ignore_conflicts=True
+        )
+        changes = {
+            "calls": F("calls") + 1,
+            "total_ms": F("total_ms") + duration_ms,
+            "max_ms": Greatest(F("max_ms"), duration_ms),
+            "last_seen": Now(),
+        }
+        if plan is not None:
+            changes.update(plan=plan, plan_captured_at=Now(), seq_scan_tables=seq_scans)
+        self.filter(fingerprint=fingerprint).update(**changes)
+
+
+class SlowQuery(models.Model):
+    """
+    Aggregates for one statement fingerprint slower than SLOW_QUERY_MS, with
+    its latest sampled EXPLAIN (ANALYZE, BUFFERS) plan (see slow_queries.py).
+    """
+
+    fingerprint = models.CharField(max_length=16, unique=True)
+    sql = models.TextField()
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(db_default=Now(), editable=False)
+    last_seen = models.DateTimeField(db_default=Now(), editable=False)
+    plan = models.JSONField(null=True, blank=True)
+    plan_captured_at = models.DateTimeField(null=True, blank=True)
+    # Large tables the plan reads with a sequential scan
+    seq_scan_tables = ArrayField(
+        models.CharField(max_length=63), default=list, blank=True
+    )
+
+    objects = SlowQueryManager()
+
+    class Meta:
+        verbose_name_plural = "Slow queries"
+        ordering = ["-total_ms"]
+
+    def __str__(self):
+        return f"{self.fingerprint}: {self.calls} × {self.mean_ms:.0f} ms"
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else 0.0
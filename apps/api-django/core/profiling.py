@@ -0,0 +1,209 @@
+"""
+On-demand profiles of single requests, for finding where a slow route's time
+goes in production.
+
+A request is profiled when it carries a valid signed X-Profile header (see
+`manage.py profile_token`), when a staff user adds ?profile=1, or at random
+with probability PROFILING_SAMPLE_RATE. A sampling thread records the
+request thread's stack every PROFILING_INTERVAL_MS from the middleware down:
+filtering, queries, serialization and rendering included. Each capture is
+stored as collapsed stacks (flamegraph.pl / speedscope input) with the
+request's metadata, listed in the admin and downloadable as a speedscope file.
+
+With PROFILING_ENABLED off the middleware removes itself at startup.
+"""
+
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile"
+QUERY_PARAM = "profile"
+TOKEN_SALT = "core.profiling"
+
+
+def make_token():
+    """A value for the X-Profile header, valid for PROFILING_TOKEN_MAX_AGE."""
+    return signing.dumps("profile", salt=TOKEN_SALT)
+
+
+def trigger(request):
+    """Why `request` should be profiled ("header", "staff", "sample"), or None."""
+    token = request.headers.get(HEADER)
+    if token:
+        try:
+            signing.loads(
+                token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE
+            )
+            return "header"
+        except signing.BadSignature:
+            pass
+    if QUERY_PARAM in request.GET and request.user.is_staff:
+        return "staff"
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+def frame_label(code):
+    filename = code.co_filename
+    # Paths relative to the project or site-packages keep stacks readable
+    for root in (f"{settings.BASE_DIR}/", "site-packages/"):
+        if root in filename:
+            filename = filename.split(root, 1)[1]
+            break
+    # ";" separates frames in collapsed stacks
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Sampler(threading.Thread):
+    """
+    Samples one thread's stack until stopped. Each stack is weighted by the
+    microseconds since the previous sample, so GIL contention and long
+    C calls don't skew the totals.
+    """
+
+    def __init__(self, thread_id, root_frame, interval):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self.stacks[self.stack(frame)] += round((now - last) * 1_000_000)
+                self.samples += 1
+            last = now
+
+    def stack(self, frame):
+        labels = []
+        while frame is not None and frame is not self.root_frame:
+            labels.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def collapsed(stacks):
+    """Counter of stacks -> collapsed-stack text, heaviest first."""
+    return "".join(
+        f"{stack} {weight}\n" for stack, weight in stacks.most_common() if stack
+    )
+
+
+def speedscope(profile):
+    """A RequestProfile as a speedscope file (https://www.speedscope.app)."""
+    frames, index, samples, weights = [], {}, [], []
+    for line in profile.stacks.splitlines():
+        stack, _, weight = line.rpartition(" ")
+        sample = []
+        for label in stack.split(";"):
+            if label not in index:
+                name, _, location = label.rpartition(" (")
+                file, _, line_number = location.rstrip(")").rpartition(":")
+                index[label] = len(frames)
+                frames.append({"name": name, "file": file, "line": int(line_number)})
+            sample.append(index[label])
+        samples.append(sample)
+        weights.append(int(weight))
+
+    name = f"{profile.method} {profile.path}"
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "engineering-atlas",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "microseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests picked by trigger(); the capture's id is returned
+    in the X-Profile-Id response header. Place it after
+    AuthenticationMiddleware (?profile=1 checks request.user).
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reason = trigger(request)
+        if reason is None:
+            return self.get_response(request)
+
+        sampler = Sampler(
+            threading.get_ident(),
+            sys._getframe(),
+            settings.PROFILING_INTERVAL_MS / 1000,
+        )
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            profile = self.save(request, response, reason, sampler, duration_ms)
+        except Exception:
+            # A lost capture must not fail the request it profiled
+            logger.exception("Couldn't store the profile of %s", request.path)
+        else:
+            response["X-Profile-Id"] = str(profile.pk)
+        return response
+
+    def save(self, request, response, reason, sampler, duration_ms):
+        user = getattr(request, "user", None)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.path,
+            query_string=request.META.get("QUERY_STRING", ""),
+            status_code=response.status_code,
+            duration_ms=duration_ms,
+            trigger=reason,
+            username=user.get_username() if user and user.is_authenticated else "",
+            sample_count=sampler.samples,
+            stacks=collapsed(sampler.stacks),
+        )
+        # Keep the newest PROFILING_KEEP captures
+        stale = RequestProfile.objects.values_list("pk", flat=True)[
+            settings.PROFILING_KEEP :
+        ]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        return profile
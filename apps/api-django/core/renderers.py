@@ -0,0 +1,55 @@
+"""
+Binary alternatives to JSON, picked by the Accept header
+(application/msgpack, application/cbor) or ?format=msgpack / ?format=cbor.
+
+They encode the same data as the JSON renderer: values JSON can't hold
+natively (dates, decimals, lazy strings...) go through DRF's JSON encoder
+first, so a decoded response equals the decoded JSON one. Enabled in
+settings.py when msgpack / cbor2 are installed.
+"""
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+_json_encoder = JSONEncoder()
+
+
+def as_json_value(value):
+    """What the JSON renderer would have written for `value`."""
+    return _json_encoder.default(value)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=as_json_value)
+
+
+class CBORRenderer(BaseRenderer):
+    media_type = "application/cbor"
+    format = "cbor"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return cbor2.dumps(
+            data, default=lambda encoder, value: encoder.encode(as_json_value(value))
+        )
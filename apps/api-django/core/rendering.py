@@ -0,0 +1,156 @@
+"""
+Server-side Markdown rendering for authored text fields.
+
+Rendered HTML is stored next to its source column (see
+`models.MarkdownRenderedModel`) and only regenerated when the digest of the
+source text + renderer version changes.
+"""
+
+import hashlib
+from html import escape
+from html.parser import HTMLParser
+
+import markdown
+
+# Bump this whenever MARKDOWN_EXTENSIONS or the sanitizer rules change.
+# Every stored digest then goes stale and `render_markdown` re-renders it.
+RENDERER_VERSION = "1"
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+
+ALLOWED_TAGS = {
+    "a",
+    "abbr",
+    "blockquote",
+    "br",
+    "code",
+    "dd",
+    "del",
+    "dl",
+    "dt",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "img",
+    "li",
+    "ol",
+    "p",
+    "pre",
+    "strong",
+    "sub",
+    "sup",
+    "table",
+    "tbody",
+    "td",
+    "th",
+    "thead",
+    "tr",
+    "ul",
+}
+
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "abbr": {"title"},
+    "code": {"class"},
+    "img": {"src", "alt", "title"},
+    "td": {"align"},
+    "th": {"align"},
+}
+
+URL_ATTRIBUTES = {"href", "src"}
+ALLOWED_SCHEMES = {"http", "https", "mailto"}
+
+VOID_TAGS = {"br", "hr", "img"}
+
+# Content inside these tags is dropped entirely, not just the tags
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template"}
+
+
+def _is_safe_url(value):
+    # Browsers ignore whitespace/control chars inside schemes ("java\tscript:")
+    cleaned = "".join(ch for ch in value if ch > " ").lower()
+    scheme, sep, _ = cleaned.partition(":")
+    if not sep or "/" in scheme or "?" in scheme or "#" in scheme:
+        return True  # Relative URL or fragment
+    return scheme in ALLOWED_SCHEMES
+
+
+class _Sanitizer(HTMLParser):
+    """
+    Allow-list HTML filter. Anything not explicitly allowed is escaped or dropped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth += 1
+            return
+        if self.drop_depth or tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _is_safe_url(value):
+                continue
+            rendered.append(f' {name}="{escape(value, quote=True)}"')
+
+        if tag == "a":
+            rendered.append(' rel="nofollow noopener"')
+        self.parts.append(f"<{tag}{''.join(rendered)}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(self.drop_depth - 1, 0)
+            return
+        if self.drop_depth or tag not in ALLOWED_TAGS or tag in VOID_TAGS:
+            return
+        self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.drop_depth:
+            self.parts.append(escape(data, quote=False))
+
+
+def sanitize_html(html):
+    parser = _Sanitizer()
+    parser.feed(html)
+    parser.close()
+    return "".join(parser.parts)
+
+
+def render_markdown(text):
+    """
+    Markdown -> sanitized HTML. Module-level so it can be shipped to a process pool.
+    """
+    if not text:
+        return ""
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    return sanitize_html(html)
+
+
+def markdown_digest(*sources):
+    """
+    Fingerprint of the source texts and the renderer that produced their HTML.
+    """
+    digest = hashlib.sha256(RENDERER_VERSION.encode())
+    for source in sources:
+        digest.update(b"\x00")
+        digest.update((source or "").encode())
+    return digest.hexdigest()
@@ -0,0 +1,188 @@
+"""
+Analytics rollups behind /api/stats/, so the dashboard never runs
+date_trunc() and joins over artifacts and their competency links:
+
+- CompetencyUsage: links per (competency, role), i.e. artifacts using it.
+- ArtifactMonth: artifacts per (month created, status, complexity).
+- ArtifactCategory: links per (artifact, category), with the artifact's
+  month; its non-zero rows, counted, are artifacts per category and month.
+
+The write hooks in signals.py apply deltas in the writing transaction, so
+the rollups commit (or roll back) with the rows they count; bulk.py calls
+the same helpers. `manage.py rebuild_rollups` recounts everything.
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import (
+    Artifact,
+    ArtifactCategory,
+    ArtifactCompetency,
+    ArtifactMonth,
+    Competency,
+    CompetencyUsage,
+)
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def artifact_key(artifact, created=None):
+    """An artifact's ArtifactMonth key; `created` overrides date_created."""
+    day = created or artifact.date_created
+    return (month_of(day), artifact.status, artifact.complexity)
+
+
+def record_artifacts(before, after):
+    """
+    ArtifactMonth deltas for a batch of artifact writes. `before`/`after` are
+    parallel lists of artifact_key()s (None for created/deleted rows).
+    """
+    deltas = Counter()
+    for old, new in zip(before, after):
+        if old != new:
+            if old is not None:
+                deltas[old] -= 1
+            if new is not None:
+                deltas[new] += 1
+    ArtifactMonth.objects.apply(deltas)
+
+
+def move_artifact_month(artifact_id, month):
+    """Keeps ArtifactCategory in step when an artifact's date_created moves."""
+    ArtifactCategory.objects.filter(artifact_id=artifact_id).exclude(
+        month=month
+    ).update(month=month)
+
+
+def record_links(added=(), removed=(), months=None):
+    """
+    CompetencyUsage and ArtifactCategory deltas for competency links, given as
+    (artifact_id, competency_id, role) tuples. `months` maps artifact ids to
+    their month when the caller already knows it.
+    """
+    changes = [(link, 1) for link in added] + [(link, -1) for link in removed]
+    if not changes:
+        return
+
+    competency_ids = {competency_id for (_, competency_id, _), _ in changes}
+    categories = dict(
+        Competency.objects.filter(pk__in=competency_ids)
+        .order_by()
+        .values_list("pk", "category_id")
+    )
+    if months is None:
+        artifact_ids = {artifact_id for (artifact_id, _, _), _ in changes}
+        months = {
+            pk: month_of(day)
+            for pk, day in Artifact.objects.filter(pk__in=artifact_ids)
+            .order_by()
+            .values_list("pk", "date_created")
+        }
+
+    usage, spread = Counter(), Counter()
+    for (artifact_id, competency_id, role), delta in changes:
+        usage[(competency_id, role)] += delta
+        # Rows already gone (a cascade in progress) take their rollups along
+        if artifact_id in months and competency_id in categories:
+            spread[
+                (artifact_id, categories[competency_id], months[artifact_id])
+            ] += delta
+    CompetencyUsage.objects.apply(usage)
+    ArtifactCategory.objects.apply(spread)
+
+
+def link_tuples(links):
+    return [(link.artifact_id, link.competency_id, link.role) for link in links]
+
+
+def record_recategorized(competency_id, old_category_id, new_category_id):
+    """Moves a competency's links between categories in ArtifactCategory."""
+    deltas = Counter()
+    for artifact_id, day in (
+        ArtifactCompetency.objects.filter(competency_id=competency_id)
+        .order_by()
+        .values_list("artifact_id", "artifact__date_created")
+    ):
+        deltas[(artifact_id, old_category_id, month_of(day))] -= 1
+        deltas[(artifact_id, new_category_id, month_of(day))] += 1
+    ArtifactCategory.objects.apply(deltas)
+
+
+REBUILD_ROLLUPS_SQL = [
+    "DELETE FROM core_competencyusage",
+    """
+    INSERT INTO core_competencyusage (competency_id, role, artifact_count)
+    SELECT competency_id, role, count(*)
+    FROM core_artifactcompetency
+    GROUP BY competency_id, role
+    """,
+    "DELETE FROM core_artifactmonth",
+    """
+    INSERT INTO core_artifactmonth (month, status, complexity, artifact_count)
+    SELECT date_trunc('month', date_created)::date, status, complexity, count(*)
+    FROM core_artifact
+    GROUP BY 1, 2, 3
+    """,
+    "DELETE FROM core_artifactcategory",
+    """
+    INSERT INTO core_artifactcategory (artifact_id, category_id, month, link_count)
+    SELECT a.id, c.category_id, date_trunc('month', a.date_created)::date, count(*)
+    FROM core_artifactcompetency ac
+    JOIN core_artifact a ON a.id = ac.artifact_id
+    JOIN core_competency c ON c.id = ac.competency_id
+    GROUP BY 1, 2, 3
+    """,
+]
+
+
+def rebuild():
+    """
+    Recount every rollup from scratch (repairs drift from raw SQL edits).
+    Writes that commit while it runs can be missed: run it when quiet.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for statement in REBUILD_ROLLUPS_SQL:
+            cursor.execute(statement)
+
+
+def stats():
+    """The /api/stats/ document, read from the rollups alone."""
+    usage = {}
+    for competency_id, role, count in (
+        CompetencyUsage.objects.filter(artifact_count__gt=0)
+        .order_by("competency_id", "role")
+        .values_list("competency_id", "role", "artifact_count")
+    ):
+        usage.setdefault(competency_id, {})[role] = count
+
+    months = [
+        {
+            "month": f"{month:%Y-%m}",
+            "status": status,
+            "complexity": complexity,
+            "artifacts": count,
+        }
+        for month, status, complexity, count in ArtifactMonth.objects.filter(
+            artifact_count__gt=0
+        ).values_list("month", "status", "complexity", "artifact_count")
+    ]
+
+    categories = [
+        {"category": category_id, "month": f"{month:%Y-%m}", "artifacts": count}
+        for category_id, month, count in ArtifactCategory.objects.filter(
+            link_count__gt=0
+        )
+        .values_list("category_id", "month")
+        .annotate(count=Count("*"))
+        .order_by("category_id", "month")
+    ]
+    return {
+        "competency_usage": usage,
+        "artifacts_by_month": months,
+        "artifacts_by_category": categories,
+    }
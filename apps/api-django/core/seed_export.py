@@ -0,0 +1,210 @@
+"""
+The inverse of `manage.py seed_data`: curated admin edits written back to
+packages/db/seeds/*.json (`manage.py export_seeds`), in the shape
+seed_competencies() and seed_artifacts() read.
+
+Rows are read through server-side cursors in chunks of CHUNK_SIZE, with one
+query per chunk for each nested list (sub-competencies, related ids,
+competency links), and every item is written out as soon as it is built, so
+memory doesn't grow with the tables. Output is deterministic: top-level items
+by id, nested lists in their stored order, for diffs that show only real
+edits. Only seeded fields are exported (no rendered HTML, embeddings or
+derived scores).
+
+Seed files also hold keys no model stores (a competency's atlas_demo and
+artifacts, a sub-competency's code_anchor), or that seed_data doesn't load
+(an artifact's curated date_created: the column is auto_now_add, so it holds
+the seeding date). They are carried over from the file being replaced,
+matched by id, so an export doesn't drop or rewrite them.
+"""
+
+import json
+import os
+from collections import defaultdict
+from itertools import islice
+
+from .models import Artifact, ArtifactCompetency, Competency, SubCompetency
+
+CHUNK_SIZE = 2000
+
+COMPETENCY_FIELDS = (
+    "id",
+    "name",
+    "category__name",
+    "competency_type",
+    "proficiency",
+    "tags",
+    "summary",
+    "history",
+    "showcase_priority",
+    "portfolio_highlight",
+)
+
+ARTIFACT_FIELDS = (
+    "id",
+    "title",
+    "status",
+    "complexity",
+    "demo_type",
+    "repo_url",
+    "live_url",
+    "description",
+    "tech_stack",
+)
+
+
+def chunks(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def grouped(pairs):
+    groups = defaultdict(list)
+    for key, value in pairs:
+        groups[key].append(value)
+    return groups
+
+
+def competency_seeds(chunk_size=CHUNK_SIZE):
+    """Items of competencies.json, by id."""
+    rows = (
+        Competency.objects.order_by("id")
+        .values(*COMPETENCY_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    related = Competency.related_competencies.through.objects
+    for chunk in chunks(rows, chunk_size):
+        ids = [row["id"] for row in chunk]
+        # Through rows in insertion order: the order seed_data linked them in
+        related_ids = grouped(
+            related.filter(from_competency_id__in=ids)
+            .order_by("id")
+            .values_list("from_competency_id", "to_competency_id")
+        )
+        subs = grouped(
+            (sub["parent_id"], sub)
+            for sub in SubCompetency.objects.filter(parent_id__in=ids)
+            .order_by("parent_id", "display_order", "name", "id")
+            .values("parent_id", "id", "name", "desc", "display_order")
+        )
+        for row in chunk:
+            yield {
+                "id": row["id"],
+                "name": row["name"],
+                "category": row["category__name"],
+                "competency_type": row["competency_type"],
+                "proficiency": row["proficiency"],
+                "tags": row["tags"],
+                "summary": row["summary"],
+                "history": row["history"],
+                "related_ids": related_ids.get(row["id"], []),
+                "showcasePriority": row["showcase_priority"],
+                "portfolioHighlight": row["portfolio_highlight"],
+                "sub_competencies": [
+                    {
+                        "id": sub["id"],
+                        "name": sub["name"],
+                        "desc": sub["desc"],
+                        "display_order": sub["display_order"],
+                    }
+                    for sub in subs.get(row["id"], [])
+                ],
+            }
+
+
+def artifact_seeds(chunk_size=CHUNK_SIZE):
+    """Items of artifacts.json, by id."""
+    rows = (
+        Artifact.objects.order_by("id")
+        .values(*ARTIFACT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for chunk in chunks(rows, chunk_size):
+        links = grouped(
+            (artifact_id, {"id": competency_id, "role": role})
+            for artifact_id, competency_id, role in ArtifactCompetency.objects.filter(
+                artifact_id__in=[row["id"] for row in chunk]
+            )
+            .order_by("id")
+            .values_list("artifact_id", "competency_id", "role")
+        )
+        for row in chunk:
+            yield {
+                **{field: row[field] for field in ARTIFACT_FIELDS[:-1]},
+                "competencies": links.get(row["id"], []),
+                "tech_stack": row["tech_stack"],
+            }
+
+
+def existing_items(path):
+    """
+    Items of the seed file at `path` by id ({} if there is none). An id
+    listed twice gets the keys of both, the later one winning, as seed_data
+    applies them.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+    except FileNotFoundError:
+        return {}
+    by_id = {}
+    for item in items:
+        by_id.setdefault(item["id"], {}).update(item)
+    return by_id
+
+
+def carry_over(item, previous):
+    """
+    `item` plus the keys only `previous` (its old version) has, in their old
+    place. Sub-competencies are matched by id the same way.
+    """
+    merged = {**previous, **item}
+    if "sub_competencies" in item:
+        previous_subs = {sub["id"]: sub for sub in previous.get("sub_competencies", [])}
+        merged["sub_competencies"] = [
+            carry_over(sub, previous_subs.get(sub["id"], {}))
+            for sub in item["sub_competencies"]
+        ]
+    return merged
+
+
+def merged_with_existing(path, items):
+    previous = existing_items(path)
+    for item in items:
+        yield carry_over(item, previous.get(item["id"], {}))
+
+
+def write_json_array(path, items):
+    """
+    Writes `items` as a 2-space indented JSON array, one item at a time.
+    The file is replaced only once it is complete. Returns the item count.
+    """
+    count = 0
+    partial = f"{path}.partial"
+    try:
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write("[")
+            for item in items:
+                text = json.dumps(item, indent=2, ensure_ascii=False)
+                f.write(",\n  " if count else "\n  ")
+                f.write(text.replace("\n", "\n  "))
+                count += 1
+            f.write("\n]\n" if count else "]\n")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return count
+
+
+def export_seeds(directory, chunk_size=CHUNK_SIZE):
+    """Writes competencies.json and artifacts.json; returns their item counts."""
+    counts = {}
+    for name, items in [
+        ("competencies", competency_seeds(chunk_size)),
+        ("artifacts", artifact_seeds(chunk_size)),
+    ]:
+        path = os.path.join(directory, f"{name}.json")
+        counts[name] = write_json_array(path, merged_with_existing(path, items))
+    return counts
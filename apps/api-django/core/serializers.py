@@ -6,9 +6,28 @@ from .models import (
     Artifact,
     ArtifactCompetency,
     CommitCodeReference,
+    Technology,
 )
 
 
+class OptionalHtmlFieldsMixin:
+    """
+    Drops the pre-rendered `*_html` fields unless the client asks for them
+    with `?html=true`, keeping the default payload unchanged.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        wants_html = request is not None and request.query_params.get(
+            "html", ""
+        ).lower() in ("1", "true", "yes")
+        if not wants_html:
+            for name in [name for name in fields if name.endswith("_html")]:
+                del fields[name]
+        return fields
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -16,9 +35,15 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "display_order"]
 
 
+class TechnologySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Technology
+        fields = ["name", "artifact_count", "competency_count"]
+
+
 class CommitCodeReferenceSerializer(serializers.ModelSerializer):
-    github_url = serializers.ReadOnlyField()
-    raw_url = serializers.ReadOnlyField()
+    github_url = serializers.URLField(read_only=True)
+    raw_url = serializers.URLField(read_only=True)
 
     class Meta:
         model = CommitCodeReference
@@ -35,13 +60,20 @@ class CommitCodeReferenceSerializer(serializers.ModelSerializer):
         ]
 
 
-class SubCompetencySerializer(serializers.ModelSerializer):
+class SubCompetencySerializer(OptionalHtmlFieldsMixin, serializers.ModelSerializer):
     # Nesting code references directly so the frontend gets them in one fetch
     code_references = CommitCodeReferenceSerializer(many=True, read_only=True)
 
     class Meta:
         model = SubCompetency
-        fields = ["id", "name", "desc", "display_order", "code_references"]
+        fields = [
+            "id",
+            "name",
+            "desc",
+            "desc_html",
+            "display_order",
+            "code_references",
+        ]
 
 
 class CompetencyLinkSerializer(serializers.ModelSerializer):
@@ -55,7 +87,7 @@ class CompetencyLinkSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "competency_type"]
 
 
-class CompetencySerializer(serializers.ModelSerializer):
+class CompetencySerializer(OptionalHtmlFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     sub_competencies = SubCompetencySerializer(many=True, read_only=True)
 
@@ -71,6 +103,7 @@ class CompetencySerializer(serializers.ModelSerializer):
             "competency_type",
             "proficiency",
             "summary",
+            "summary_html",
             "tags",
             "sub_competencies",
             "related_competencies",
@@ -94,7 +127,7 @@ class ArtifactCompetencySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "category_name", "role"]
 
 
-class ArtifactSerializer(serializers.ModelSerializer):
+class ArtifactSerializer(OptionalHtmlFieldsMixin, serializers.ModelSerializer):
     # 'source' matches the custom Prefetch in views.py
     competencies = ArtifactCompetencySerializer(
         source="artifactcompetency_set", many=True, read_only=True
@@ -109,9 +142,131 @@ class ArtifactSerializer(serializers.ModelSerializer):
             "complexity",
             "demo_type",
             "description",
+            "description_html",
             "tech_stack",
             "repo_url",
             "live_url",
             "date_created",
             "competencies",
         ]
+
+
+# ?shape=normalized (see NormalizedResponseMixin in views.py): nested
+# categories and competencies become ids into the response's entity tables
+
+
+class CompetencyReferenceSerializer(serializers.ModelSerializer):
+    """Entry of the competencies entity table."""
+
+    class Meta:
+        model = Competency
+        fields = ["id", "name", "competency_type", "category"]
+
+
+class NormalizedCompetencySerializer(CompetencySerializer):
+    category = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_competencies = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+
+class NormalizedArtifactCompetencySerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source="competency_id")
+
+    class Meta:
+        model = ArtifactCompetency
+        fields = ["id", "role"]
+
+
+class NormalizedArtifactSerializer(ArtifactSerializer):
+    competencies = NormalizedArtifactCompetencySerializer(
+        source="artifactcompetency_set", many=True, read_only=True
+    )
+
+
+# Documents of the APIViews outside the router, for the OpenAPI schema only:
+# the views set them as `serializer_class` but build their data themselves
+
+
+class ScoredCompetencySerializer(CompetencySerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(CompetencySerializer.Meta):
+        fields = [*CompetencySerializer.Meta.fields, "similarity"]
+
+
+class ScoredSubCompetencySerializer(SubCompetencySerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(SubCompetencySerializer.Meta):
+        fields = [*SubCompetencySerializer.Meta.fields, "similarity"]
+
+
+class ScoredArtifactSerializer(ArtifactSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(ArtifactSerializer.Meta):
+        fields = [*ArtifactSerializer.Meta.fields, "similarity"]
+
+
+class SemanticSearchSerializer(serializers.Serializer):
+    """Nearest items first; only the ?type= list when it is given."""
+
+    competencies = ScoredCompetencySerializer(many=True, required=False)
+    sub_competencies = ScoredSubCompetencySerializer(many=True, required=False)
+    artifacts = ScoredArtifactSerializer(many=True, required=False)
+
+
+class BundleSerializer(serializers.Serializer):
+    """The default shape (?shape=normalized uses the normalized item shapes)."""
+
+    categories = CategorySerializer(many=True)
+    competencies = CompetencySerializer(many=True)
+    artifacts = ArtifactSerializer(many=True)
+
+
+class MonthCountSerializer(serializers.Serializer):
+    month = serializers.CharField(help_text="YYYY-MM")
+    status = serializers.CharField()
+    complexity = serializers.CharField()
+    artifacts = serializers.IntegerField()
+
+
+class CategoryMonthCountSerializer(serializers.Serializer):
+    category = serializers.CharField()
+    month = serializers.CharField(help_text="YYYY-MM")
+    artifacts = serializers.IntegerField()
+
+
+class StatsSerializer(serializers.Serializer):
+    competency_usage = serializers.DictField(
+        child=serializers.DictField(child=serializers.IntegerField()),
+        help_text="Artifact count by competency id, then role",
+    )
+    artifacts_by_month = MonthCountSerializer(many=True)
+    artifacts_by_category = CategoryMonthCountSerializer(many=True)
+
+
+class SyncUpdatedSerializer(serializers.Serializer):
+    categories = CategorySerializer(many=True)
+    competencies = CompetencySerializer(many=True)
+    artifacts = ArtifactSerializer(many=True)
+
+
+class SyncDeletedSerializer(serializers.Serializer):
+    categories = serializers.ListField(child=serializers.CharField())
+    competencies = serializers.ListField(child=serializers.CharField())
+    artifacts = serializers.ListField(child=serializers.CharField())
+
+
+class SyncSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(help_text="Pass as ?since= next time")
+    has_more = serializers.BooleanField()
+    updated = SyncUpdatedSerializer()
+    deleted = SyncDeletedSerializer()
+
+
+class MetricsSerializer(serializers.Serializer):
+    pid = serializers.IntegerField()
+    totals = serializers.DictField(child=serializers.IntegerField())
+    keys = serializers.DictField(
+        child=serializers.DictField(child=serializers.IntegerField())
+    )
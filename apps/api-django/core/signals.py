@@ -0,0 +1,446 @@
+"""
+Write hooks that keep derived data in sync with the core models.
+Connected in CoreConfig.ready().
+
+Batch paths that bypass save()/delete() (see bulk.py) call the same helpers
+directly.
+
+Receivers of one signal run in no particular order, so none of them depends
+on another's side effects: what post_save receivers diff against is
+captured before the save (capture_previous_values) and only read after it.
+"""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .models import (
+    Artifact,
+    ArtifactCompetency,
+    ArtifactSimilarity,
+    Category,
+    CommitCodeReference,
+    Competency,
+    SubCompetency,
+    Technology,
+)
+from .embeddings import embedding_digest, schedule_embedding_refresh
+from .events import queue_event
+from .history import sync_experience
+from . import rollups
+from .similarity import schedule_refresh
+from .sync import (
+    record_changes,
+    record_code_reference_users,
+    record_competency_referrers,
+)
+
+# Model -> (tag list field, Technology counter it feeds)
+TECHNOLOGY_FIELDS = {
+    Artifact: ("tech_stack", "artifact_count"),
+    Competency: ("tags", "competency_count"),
+}
+
+# M2M through model -> (source field, target field)
+RELATIONS = {
+    ArtifactCompetency: ("artifact", "competency"),
+    Competency.related_competencies.through: ("from_competency", "to_competency"),
+    SubCompetency.code_references.through: ("subcompetency", "commitcodereference"),
+}
+
+
+def stored_tags(sender, instance, field):
+    """The row's tags in the DB, not edits made to the instance since."""
+    loaded = getattr(instance, "_loaded_values", {})
+    if field in loaded:
+        return loaded[field]
+    if instance.pk:
+        # Built by hand (or loaded with the field deferred): ask the DB
+        return (
+            sender.objects.filter(pk=instance.pk)
+            .order_by()
+            .values_list(field, flat=True)
+            .first()
+            or []
+        )
+    return []
+
+
+def writes(sender, update_fields, field):
+    """Whether a save with `update_fields` writes `field` (name or attname)."""
+    return update_fields is None or any(
+        sender._meta.get_field(name).attname == field for name in update_fields
+    )
+
+
+@receiver(pre_save, sender=Artifact)
+@receiver(pre_save, sender=Competency)
+def capture_previous_values(sender, instance, update_fields=None, **kwargs):
+    """
+    The stored values of every tracked field (None for a new row), unless
+    the save writes none of them ({}).
+    """
+    fields = sender.tracked_fields
+    if not any(writes(sender, update_fields, field) for field in fields):
+        instance._previous_values = {}
+        return
+
+    loaded = getattr(instance, "_loaded_values", {})
+    if all(field in loaded for field in fields):
+        instance._previous_values = {field: loaded[field] for field in fields}
+    elif instance.pk is not None:
+        # Built by hand (or loaded with fields deferred): ask the DB
+        instance._previous_values = (
+            sender.objects.filter(pk=instance.pk).order_by().values(*fields).first()
+        )
+    else:
+        instance._previous_values = None
+
+
+def changed(sender, instance, field, update_fields):
+    """Whether this save gave an existing row a new value of tracked `field`."""
+    previous = instance._previous_values
+    return (
+        previous is not None
+        and field in previous
+        and writes(sender, update_fields, field)
+        and previous[field] != getattr(instance, field)
+    )
+
+
+def cleared_sources(sender, instance):
+    """
+    The source-side pks linked to `instance` on pre_clear. A clear() from the
+    target side sends no pk_set, and by post_clear the links are gone.
+    """
+    source, target = RELATIONS[sender]
+    return list(
+        sender.objects.filter(**{target: instance})
+        .order_by()
+        .values_list(f"{source}_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Artifact)
+@receiver(post_save, sender=Competency)
+def remember_saved_values(sender, instance, update_fields=None, **kwargs):
+    # The next save diffs against what this one stored
+    instance.remember_loaded_values(
+        None
+        if update_fields is None
+        else {sender._meta.get_field(name).attname for name in update_fields}
+    )
+
+
+@receiver(post_save, sender=Artifact)
+def refresh_similar_artifacts(sender, instance, created, update_fields=None, **kwargs):
+    if created or changed(sender, instance, "tech_stack", update_fields):
+        schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=ArtifactCompetency)
+@receiver(post_delete, sender=ArtifactCompetency)
+def refresh_linked_artifact(sender, instance, **kwargs):
+    schedule_refresh([instance.artifact_id])
+
+
+@receiver(m2m_changed, sender=ArtifactCompetency)
+def refresh_relinked_artifacts(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            schedule_refresh([instance.pk])
+    elif action == "pre_clear":
+        schedule_refresh(cleared_sources(sender, instance))
+    elif action.startswith("post_") and pk_set:
+        schedule_refresh(pk_set)
+
+
+@receiver(pre_delete, sender=Artifact)
+def refresh_artifacts_listing(sender, instance, **kwargs):
+    # Their lists lose this artifact (cascade) and need a replacement
+    schedule_refresh(
+        ArtifactSimilarity.objects.filter(similar=instance).values_list(
+            "artifact_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Competency)
+def sync_competency_experience(sender, instance, created, update_fields=None, **kwargs):
+    if created or changed(sender, instance, "history", update_fields):
+        sync_experience([instance])
+
+
+@receiver(post_save, sender=Competency)
+def log_competency_referrers(sender, instance, update_fields=None, **kwargs):
+    if any(
+        changed(sender, instance, field, update_fields)
+        for field in ("name", "competency_type", "category_id")
+    ):
+        record_competency_referrers([instance.pk])
+
+
+# Rollup key fields (see rollups.py)
+ROLLUP_FIELDS = ("date_created", "status", "complexity")
+
+
+@receiver(post_save, sender=Artifact)
+def update_artifact_rollups(sender, instance, update_fields=None, **kwargs):
+    if not any(writes(sender, update_fields, field) for field in ROLLUP_FIELDS):
+        return
+
+    row = instance._previous_values
+    previous = (
+        (rollups.month_of(row["date_created"]), row["status"], row["complexity"])
+        if row is not None
+        else None
+    )
+    current = rollups.artifact_key(instance)
+    rollups.record_artifacts([previous], [current])
+    if previous is not None and previous[0] != current[0]:
+        rollups.move_artifact_month(instance.pk, current[0])
+
+
+@receiver(post_delete, sender=Artifact)
+def release_artifact_rollups(sender, instance, **kwargs):
+    rollups.record_artifacts([rollups.artifact_key(instance)], [None])
+
+
+@receiver(pre_save, sender=ArtifactCompetency)
+def capture_previous_link(sender, instance, **kwargs):
+    instance._previous_link = (
+        ArtifactCompetency.objects.filter(pk=instance.pk)
+        .values_list("artifact_id", "competency_id", "role")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=ArtifactCompetency)
+def update_link_rollups(sender, instance, **kwargs):
+    previous = instance.__dict__.pop("_previous_link", None)
+    (current,) = rollups.link_tuples([instance])
+    if previous != current:
+        rollups.record_links(added=[current], removed=[previous] if previous else [])
+
+
+@receiver(post_delete, sender=ArtifactCompetency)
+def release_link_rollups(sender, instance, **kwargs):
+    # Also covers remove()/clear()/set(), which delete through the queryset
+    rollups.record_links(removed=rollups.link_tuples([instance]))
+
+
+@receiver(m2m_changed, sender=ArtifactCompetency)
+def add_relation_rollups(sender, instance, action, reverse, pk_set, **kwargs):
+    # add() inserts with bulk_create(): no post_save
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        links = ArtifactCompetency.objects.filter(
+            competency=instance, artifact_id__in=pk_set
+        )
+    else:
+        links = ArtifactCompetency.objects.filter(
+            artifact=instance, competency_id__in=pk_set
+        )
+    rollups.record_links(
+        added=links.order_by().values_list("artifact_id", "competency_id", "role")
+    )
+
+
+@receiver(post_save, sender=Competency)
+def move_category_rollups(sender, instance, update_fields=None, **kwargs):
+    if changed(sender, instance, "category_id", update_fields):
+        rollups.record_recategorized(
+            instance.pk, instance._previous_values["category_id"], instance.category_id
+        )
+
+
+@receiver(post_save, sender=Artifact)
+@receiver(post_save, sender=Competency)
+def update_technology_counts(sender, instance, update_fields=None, **kwargs):
+    field, counter = TECHNOLOGY_FIELDS[sender]
+    if not writes(sender, update_fields, field):
+        return
+
+    previous = instance._previous_values
+    Technology.objects.record_usage(
+        counter,
+        [previous[field] if previous is not None else []],
+        [getattr(instance, field)],
+    )
+
+
+@receiver(pre_delete, sender=Artifact)
+@receiver(pre_delete, sender=Competency)
+def release_technology_counts(sender, instance, **kwargs):
+    # Before the delete, while the row can still be read; in the delete's
+    # transaction, so a failed delete releases nothing
+    field, counter = TECHNOLOGY_FIELDS[sender]
+    Technology.objects.record_usage(
+        counter, [stored_tags(sender, instance, field)], [[]]
+    )
+
+
+@receiver(post_save, sender=Artifact)
+@receiver(post_save, sender=Competency)
+@receiver(post_save, sender=SubCompetency)
+def refresh_embedding(sender, instance, update_fields=None, **kwargs):
+    # Similar items and semantic search read the vector
+    sources = sender.embedding_source_fields
+    if update_fields is not None and not set(sources) & set(update_fields):
+        return
+    if embedding_digest(instance.embedding_text()) != instance.embedding_digest:
+        schedule_embedding_refresh(sender, [instance.pk])
+
+
+# Models whose writes are published as change events (see events.py).
+# Derived tables (technologies, similarities, experience) are not.
+EVENT_MODELS = {
+    Category: "category",
+    Competency: "competency",
+    SubCompetency: "sub_competency",
+    CommitCodeReference: "code_reference",
+    Artifact: "artifact",
+}
+
+
+def publish_save(sender, instance, created, **kwargs):
+    queue_event(EVENT_MODELS[sender], instance.pk, "create" if created else "update")
+
+
+def publish_delete(sender, instance, **kwargs):
+    queue_event(EVENT_MODELS[sender], instance.pk, "delete")
+
+
+for model in EVENT_MODELS:
+    post_save.connect(publish_save, sender=model)
+    post_delete.connect(publish_delete, sender=model)
+
+
+@receiver(post_save, sender=ArtifactCompetency)
+@receiver(post_delete, sender=ArtifactCompetency)
+def publish_link_change(sender, instance, **kwargs):
+    queue_event("artifact", instance.artifact_id, "update")
+
+
+@receiver(m2m_changed, sender=ArtifactCompetency)
+@receiver(m2m_changed, sender=Competency.related_competencies.through)
+@receiver(m2m_changed, sender=SubCompetency.code_references.through)
+def publish_relation_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            queue_event(EVENT_MODELS[type(instance)], instance.pk, "update")
+        return
+    # instance is the target side; the rows that changed are the sources
+    if action == "pre_clear":
+        pks = cleared_sources(sender, instance)
+    elif action.startswith("post_") and pk_set:
+        pks = pk_set
+    else:
+        return
+    for pk in pks:
+        queue_event(EVENT_MODELS[model], pk, "update")
+
+
+# API documents in the delta sync log (see sync.py). Writes to the rows
+# nested inside them are logged as updates of the enclosing document.
+SYNC_RESOURCES = {
+    Category: "categories",
+    Competency: "competencies",
+    Artifact: "artifacts",
+}
+
+
+def log_save(sender, instance, created, **kwargs):
+    record_changes(
+        SYNC_RESOURCES[sender], [instance.pk], "create" if created else "update"
+    )
+
+
+def log_delete(sender, instance, **kwargs):
+    record_changes(SYNC_RESOURCES[sender], [instance.pk], "delete")
+
+
+for model in SYNC_RESOURCES:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+
+
+@receiver(post_save, sender=Category)
+def copy_category_display_order(sender, instance, created, **kwargs):
+    # Competency.category_display_order (the default ordering) follows it.
+    # Queryset writes skip this: `manage.py rebuild_competency_order`
+    if not created:
+        instance.competencies.exclude(
+            category_display_order=instance.display_order
+        ).update(category_display_order=instance.display_order)
+
+
+@receiver(post_save, sender=Category)
+def log_category_dependents(sender, instance, created, **kwargs):
+    # Competencies nest the category and artifacts show its name
+    if not created:
+        record_changes(
+            "competencies", instance.competencies.values_list("pk", flat=True)
+        )
+        record_changes(
+            "artifacts",
+            ArtifactCompetency.objects.filter(competency__category=instance)
+            .values_list("artifact_id", flat=True)
+            .distinct(),
+        )
+
+
+@receiver(pre_delete, sender=Competency)
+def log_deleted_competency_referrers(sender, instance, **kwargs):
+    record_competency_referrers([instance.pk])
+
+
+@receiver(post_save, sender=SubCompetency)
+@receiver(post_delete, sender=SubCompetency)
+def log_sub_competency_change(sender, instance, **kwargs):
+    record_changes("competencies", [instance.parent_id])
+
+
+@receiver(post_save, sender=CommitCodeReference)
+@receiver(pre_delete, sender=CommitCodeReference)
+def log_code_reference_change(sender, instance, **kwargs):
+    record_code_reference_users([instance.pk])
+
+
+@receiver(post_save, sender=ArtifactCompetency)
+@receiver(post_delete, sender=ArtifactCompetency)
+def log_link_change(sender, instance, **kwargs):
+    record_changes("artifacts", [instance.artifact_id])
+
+
+def _log_linked(model, pks):
+    if model is SubCompetency:
+        record_changes(
+            "competencies",
+            SubCompetency.objects.filter(pk__in=pks)
+            .values_list("parent_id", flat=True)
+            .distinct(),
+        )
+    else:
+        record_changes(SYNC_RESOURCES[model], pks)
+
+
+@receiver(m2m_changed, sender=ArtifactCompetency)
+@receiver(m2m_changed, sender=Competency.related_competencies.through)
+@receiver(m2m_changed, sender=SubCompetency.code_references.through)
+def log_relation_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            _log_linked(type(instance), [instance.pk])
+    elif action == "pre_clear":
+        _log_linked(model, cleared_sources(sender, instance))
+    elif action.startswith("post_") and pk_set:
+        _log_linked(model, pk_set)
@@ -0,0 +1,254 @@
+"""
+Precomputed "similar projects" (ArtifactSimilarity rows).
+
+Each artifact is a sparse feature vector: one feature per linked competency,
+weighted by role, plus one per tech_stack entry. Similarity is the cosine of
+those vectors. A full rebuild is one sparse matrix product (in row blocks);
+writes queue only the artifacts they touch (see schedule_refresh), and the
+refresh loads only those and the artifacts sharing a feature with them.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Artifact, ArtifactCompetency, ArtifactSimilarity, Technology
+from .transactions import on_commit_batch
+
+ROLE_WEIGHTS = {"primary": 3.0, "secondary": 2.0, "supporting": 1.0}
+TECH_WEIGHT = 1.0
+
+# Neighbours stored per artifact
+TOP_K = 10
+
+# Stored score precision
+SCORE_DIGITS = 6
+
+# Rows per sparse product, bounding memory for the (block x all) score matrix
+BLOCK_SIZE = 2000
+
+
+def load_features(artifact_ids=None):
+    """
+    {artifact id: {feature: weight}} for `artifact_ids` (default: every
+    artifact), plus {artifact id: tech_stack} as stored.
+    """
+    artifacts = Artifact.objects.order_by()
+    links = ArtifactCompetency.objects.order_by()
+    if artifact_ids is not None:
+        artifacts = artifacts.filter(pk__in=artifact_ids)
+        links = links.filter(artifact_id__in=artifact_ids)
+
+    features, stacks = {}, {}
+    for pk, tech_stack in artifacts.values_list("pk", "tech_stack"):
+        stacks[pk] = tech_stack
+        features[pk] = {f"t:{name.lower()}": TECH_WEIGHT for name in tech_stack}
+    for artifact_id, competency_id, role in links.values_list(
+        "artifact_id", "competency_id", "role"
+    ):
+        if artifact_id in features:
+            features[artifact_id][f"c:{competency_id}"] = ROLE_WEIGHTS.get(role, 1.0)
+    return features, stacks
+
+
+def feature_matrix(artifact_ids=None):
+    """
+    Returns (artifact ids, CSR matrix with one L2-normalized row per artifact),
+    for `artifact_ids` or every artifact. Rows are in id order, which breaks
+    score ties the same way for any subset.
+    """
+    # Imported here: scipy adds ~150 ms to every worker's startup otherwise
+    from scipy import sparse
+
+    features, _ = load_features(artifact_ids)
+    ids = sorted(features)
+    columns = {}
+    rows, cols, weights = [], [], []
+    for row, pk in enumerate(ids):
+        for feature, weight in features[pk].items():
+            rows.append(row)
+            cols.append(columns.setdefault(feature, len(columns)))
+            weights.append(weight)
+
+    matrix = sparse.csr_matrix(
+        (np.array(weights, dtype=np.float64), (rows, cols)),
+        shape=(len(ids), max(len(columns), 1)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return ids, sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def sharing_artifacts(features, stacks):
+    """
+    Ids of the artifacts sharing a competency or a technology with any of
+    the given ones (from load_features), through indexed lookups: the
+    competency link index and the tech_stack GIN index.
+    """
+    competencies = {
+        feature[2:]
+        for weights in features.values()
+        for feature in weights
+        if feature.startswith("c:")
+    }
+    ids = set(
+        ArtifactCompetency.objects.filter(competency_id__in=competencies)
+        .order_by()
+        .values_list("artifact_id", flat=True)
+        .distinct()
+    )
+    names = {name for stack in stacks.values() for name in stack}
+    if names:
+        # Features are case-insensitive: match every spelling in use
+        spellings = names | set(
+            Technology.objects.filter(
+                key__in={name.lower() for name in names}
+            ).values_list("name", flat=True)
+        )
+        ids.update(
+            Artifact.objects.filter(tech_stack__overlap=sorted(spellings))
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+    return ids
+
+
+def top_neighbours(matrix, row_indices, k=TOP_K):
+    """
+    {row: [(other row, score), ...]} best-first, for each requested row.
+    """
+    neighbours = {}
+    row_indices = list(row_indices)
+    for start in range(0, len(row_indices), BLOCK_SIZE):
+        block = row_indices[start : start + BLOCK_SIZE]
+        scores = matrix[block].dot(matrix.T).tocsr()
+        for offset, row in enumerate(block):
+            lo, hi = scores.indptr[offset], scores.indptr[offset + 1]
+            others, values = scores.indices[lo:hi], scores.data[lo:hi]
+            keep = (others != row) & (values > 0)
+            # Rounded to the stored precision so ties break the same way
+            # (by row, i.e. by id) in full rebuilds and incremental patches
+            others, values = others[keep], np.round(values[keep], SCORE_DIGITS)
+            order = np.lexsort((others, -values))[:k]
+            neighbours[row] = [(int(others[i]), float(values[i])) for i in order]
+    return neighbours
+
+
+def _similarity_rows(artifact_id, neighbours):
+    return [
+        ArtifactSimilarity(
+            artifact_id=artifact_id,
+            similar_id=similar_id,
+            score=score,
+            rank=rank,
+        )
+        for rank, (similar_id, score) in enumerate(neighbours, start=1)
+    ]
+
+
+def rebuild_similarities(batch_size=1000):
+    """Recompute every artifact's neighbours. Returns the number of rows written."""
+    ids, matrix = feature_matrix()
+    neighbours = top_neighbours(matrix, range(len(ids)))
+
+    objs = []
+    for row, best in neighbours.items():
+        objs.extend(
+            _similarity_rows(ids[row], [(ids[other], score) for other, score in best])
+        )
+    with transaction.atomic():
+        ArtifactSimilarity.objects.all().delete()
+        ArtifactSimilarity.objects.bulk_create(objs, batch_size=batch_size)
+    return len(objs)
+
+
+def refresh_similarities(artifact_ids, batch_size=1000):
+    """
+    Update the neighbour lists affected by changes to `artifact_ids`.
+
+    Touched artifacts get their lists recomputed. Every other artifact only
+    needs its scores against the touched ones patched in; a full recompute is
+    needed only when a touched artifact sat in a full list, because the
+    replacement may be a neighbour that wasn't stored.
+
+    Only the artifacts sharing a feature with the recomputed ones are loaded
+    (see sharing_artifacts), so the cost follows the neighbourhood of the
+    write, not the size of the dataset.
+    """
+    features, stacks = load_features(artifact_ids)
+    touched = set(features)
+    if not touched:
+        return 0
+    sharing = sharing_artifacts(features, stacks) - touched
+
+    stored = defaultdict(list)
+    lists = ArtifactSimilarity.objects.filter(
+        Q(artifact_id__in=sharing)
+        | Q(
+            artifact_id__in=ArtifactSimilarity.objects.filter(
+                similar_id__in=touched
+            ).values("artifact_id")
+        )
+    ).order_by("artifact_id", "rank")
+    for artifact_id, similar_id, score in lists.values_list(
+        "artifact_id", "similar_id", "score"
+    ):
+        stored[artifact_id].append((similar_id, score))
+
+    # Full lists that lose a touched artifact are recomputed: their
+    # neighbourhoods are needed too
+    recompute = set(touched)
+    for artifact_id in set(stored) - touched:
+        old = stored[artifact_id]
+        if len(old) >= TOP_K and any(pk in touched for pk, _ in old):
+            recompute.add(artifact_id)
+    losers = recompute - touched
+    loaded = touched | sharing | losers
+    if losers:
+        loser_features, loser_stacks = load_features(losers)
+        loaded |= sharing_artifacts(loser_features, loser_stacks)
+
+    ids, matrix = feature_matrix(loaded)
+    index = {pk: row for row, pk in enumerate(ids)}
+    touched_rows = [index[pk] for pk in sorted(touched)]
+    cross = matrix[touched_rows].dot(matrix.T).tocsc()
+
+    patched = {}
+    for artifact_id in (sharing | set(stored)) - recompute:
+        if artifact_id not in index:
+            continue
+        old = stored.get(artifact_id, [])
+        kept = [(pk, score) for pk, score in old if pk not in touched]
+        column = cross[:, index[artifact_id]]
+        added = [
+            (ids[touched_rows[row]], float(np.round(score, SCORE_DIGITS)))
+            for row, score in zip(column.indices, column.data)
+            if score > 0
+        ]
+        # Ties by id, as in top_neighbours()
+        merged = sorted(kept + added, key=lambda item: (-item[1], item[0]))
+        merged = merged[:TOP_K]
+        if merged != old:
+            patched[artifact_id] = merged
+
+    rows = [index[pk] for pk in recompute if pk in index]
+    for row, best in top_neighbours(matrix, rows).items():
+        patched[ids[row]] = [(ids[other], score) for other, score in best]
+
+    objs = []
+    for artifact_id, best in patched.items():
+        objs.extend(_similarity_rows(artifact_id, best))
+    with transaction.atomic():
+        ArtifactSimilarity.objects.filter(artifact_id__in=patched).delete()
+        ArtifactSimilarity.objects.bulk_create(objs, batch_size=batch_size)
+    return len(patched)
+
+
+def schedule_refresh(artifact_ids):
+    """
+    Refresh the lists affected by `artifact_ids` once the current transaction
+    commits, coalescing every write in the transaction into one refresh.
+    """
+    on_commit_batch("similarity", refresh_similarities, artifact_ids)
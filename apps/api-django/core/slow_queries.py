@@ -0,0 +1,184 @@
+"""
+Slow-query recorder: evidence for index tuning from the real query mix.
+
+Every statement slower than SLOW_QUERY_MS is fingerprinted (literals, IN
+lists and VALUES rows normalized away) and handed to a background thread,
+which adds it to its fingerprint's aggregates in SlowQuery. At most once per
+SLOW_QUERY_EXPLAIN_INTERVAL per fingerprint, that thread also re-runs the
+statement under EXPLAIN (ANALYZE, BUFFERS), in a transaction it rolls back,
+and flags sequential scans of tables with at least
+SLOW_QUERY_LARGE_TABLE_ROWS rows. Results are in the admin ("Slow
+queries"), worst total time first.
+
+Nothing extra runs on the request thread beyond timing each statement, and
+with SLOW_QUERY_MS = 0 not even that: no wrapper is installed.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_VALUES = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b", re.IGNORECASE)
+_PARENTHESIZED = re.compile(r"\([^()]*\)")
+_FROM = re.compile(r"\bFROM\b", re.IGNORECASE)
+# Functions whose effects EXPLAIN ANALYZE would repeat
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:pg_(?:try_)?advisory_\w+|nextval|setval|set_config|pg_notify"
+    r"|pg_sleep\w*|pg_cancel_backend|pg_terminate_backend)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def fingerprint(sql):
+    """(key, normalized SQL): statements differing only in values share a key."""
+    normalized = _NUMBER.sub("?", _STRING.sub("?", sql))
+    normalized = _VALUES.sub("VALUES (...)", _IN_LIST.sub("IN (...)", normalized))
+    normalized = " ".join(normalized.split())
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
+
+
+_local = threading.local()
+
+
+def _mark_recorder_thread():
+    # The recorder's own queries aren't timed
+    _local.recording = True
+
+
+# One thread: aggregates are written in order and EXPLAINs never pile up
+_recorder = ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="slow-queries",
+    initializer=_mark_recorder_thread,
+)
+_pending = set()  # Futures, so tests can wait for them
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper (see install): queues statements over SLOW_QUERY_MS."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_MS and not getattr(
+            _local, "recording", False
+        ):
+            # executemany() params are a whole batch: not kept for EXPLAIN
+            future = _recorder.submit(
+                _record, sql, None if many else params, duration_ms
+            )
+            _pending.add(future)
+            future.add_done_callback(_pending.discard)
+
+
+@receiver(connection_created)
+def install(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_MS and time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def _record(sql, params, duration_ms):
+    try:
+        record_query(sql, params, duration_ms)
+    except Exception:
+        logger.exception("Couldn't record a slow query")
+    finally:
+        # Kept open between items, up to CONN_MAX_AGE, like a request's
+        close_old_connections()
+
+
+def record_query(sql, params, duration_ms):
+    """Adds one slow execution to its fingerprint, with a plan when due."""
+    key, normalized = fingerprint(sql)
+    plan = seq_scans = None
+    if params is not None and explainable(sql) and plan_due(key):
+        plan = explain(sql, params)
+        seq_scans = large_seq_scans(plan)
+    SlowQuery.objects.record(key, normalized, duration_ms, plan, seq_scans)
+
+
+def explainable(sql):
+    """
+    EXPLAIN ANALYZE executes the statement: only queries reading a table
+    (a top-level FROM; not function calls such as SELECT
+    pg_advisory_xact_lock(...)), without row locks or side-effecting calls.
+    """
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return False
+    if _LOCKING.search(sql) or _SIDE_EFFECTS.search(sql):
+        return False
+    top_level = _STRING.sub("?", sql)
+    while True:
+        stripped = _PARENTHESIZED.sub(" ", top_level)
+        if stripped == top_level:
+            break
+        top_level = stripped
+    return bool(_FROM.search(top_level))
+
+
+def plan_due(key):
+    since = timezone.now() - timedelta(seconds=settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+    return not SlowQuery.objects.filter(
+        fingerprint=key, plan_captured_at__gte=since
+    ).exists()
+
+
+def explain(sql, params):
+    """The statement's EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output."""
+    with transaction.atomic(), connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('statement_timeout', %s, true)",
+            [str(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)],
+        )
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+            return cursor.fetchone()[0][0]
+        finally:
+            # Whatever the statement did is undone
+            transaction.set_rollback(True)
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def large_seq_scans(plan):
+    """Tables of at least SLOW_QUERY_LARGE_TABLE_ROWS that `plan` seq-scans."""
+    tables = sorted(
+        {
+            node["Relation Name"]
+            for node in plan_nodes(plan["Plan"])
+            if node["Node Type"] == "Seq Scan"
+        }
+    )
+    if not tables:
+        return []
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class"
+            " WHERE relname = ANY(%s) AND relkind IN ('r', 'p', 'm')"
+            " AND reltuples >= %s",
+            [tables, settings.SLOW_QUERY_LARGE_TABLE_ROWS],
+        )
+        return sorted(row[0] for row in cursor.fetchall())
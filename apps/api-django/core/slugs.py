@@ -0,0 +1,55 @@
+"""
+Collision-free slug allocation for slug-keyed models.
+"""
+
+from django.db import connection
+from django.db.models import Q
+
+
+def lock_slug_allocation(model):
+    """
+    Serialize slug allocation for `model` until the current transaction ends,
+    so two concurrent creators can't both claim "portfolio-3".
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))", [model._meta.db_table]
+        )
+
+
+def allocate_slugs(model, base_slugs, reserved=()):
+    """
+    Return one free slug per entry in `base_slugs` (in order), using a single
+    prefix query for the whole batch. Collisions get "-1", "-2", ... suffixes,
+    both against existing rows and within the batch itself.
+
+    `reserved` holds slugs already claimed by the caller (e.g. explicit ids in
+    the same batch). Call inside a transaction holding `lock_slug_allocation`.
+    """
+    bases = {base for base in base_slugs if base}
+    taken = set(reserved)
+    if bases:
+        prefix_match = Q()
+        for base in bases:
+            prefix_match |= Q(pk=base) | Q(pk__startswith=f"{base}-")
+        taken.update(
+            model.objects.filter(prefix_match).order_by().values_list("pk", flat=True)
+        )
+
+    next_suffix = {}
+    slugs = []
+    for base in base_slugs:
+        if not base:
+            # Leave empty so model validation reports it
+            slugs.append(base)
+            continue
+
+        slug = base
+        counter = next_suffix.get(base, 1)
+        while slug in taken:
+            slug = f"{base}-{counter}"
+            counter += 1
+        next_suffix[base] = counter
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
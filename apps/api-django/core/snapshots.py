@@ -0,0 +1,303 @@
+"""
+Binary snapshots of the atlas dataset, for review environments and for
+reproducing production data locally (`manage.py snapshot` / `restore_snapshot`).
+
+A snapshot is a zip archive:
+
+- manifest.json: format version, the core migration it was taken at, and
+  per table its columns (name and SQL type) and row count.
+- tables/<table>.bin: the table in PostgreSQL's binary COPY format.
+
+Every core table is included (M2M and through tables too, and the derived
+ones: technologies, similarities, rollups, rankings), except the
+operational logs in EXCLUDED_MODELS. Export streams each COPY ... TO STDOUT
+straight into its compressed member, inside one REPEATABLE READ transaction
+so the tables are mutually consistent.
+
+Restore runs in one transaction: it drops the tables' primary keys, unique
+and foreign key constraints and indexes, streams each member into COPY ...
+FROM STDIN, then recreates them (one sort per index instead of a b-tree
+insert per row, one validation pass per foreign key, and no FK ordering
+problems while loading), resets the id sequences and ANALYZEs the tables.
+The change log is reset in the same transaction, and a reset event goes
+out on commit: sync cursors and event streams from before the restore
+describe other data, so their clients must start over.
+"""
+
+import json
+import zipfile
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+
+from .cache import bump_version_on_commit
+from .events import queue_reset
+from .models import ChangeLogEntry, RequestProfile, SlowQuery
+from .sync import reset_changes
+
+FORMAT = "engineering-atlas-snapshot"
+VERSION = 1
+
+# Logs of the instance they were recorded on, not part of the dataset.
+# (Change log cursors are transaction ids: meaningless on another server.
+# A restore resets the log instead, see reset_changes().)
+EXCLUDED_MODELS = (ChangeLogEntry, RequestProfile, SlowQuery)
+
+CHUNK_SIZE = 1 << 20
+
+# Dropped before the load; recreated afterwards in this order, so primary
+# keys exist before the foreign keys that reference them
+CONSTRAINT_TYPES = ("p", "u", "x", "f")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def snapshot_tables():
+    """Core tables in dependency order (referenced tables first)."""
+    models = [
+        model
+        for model in apps.get_app_config("core").get_models(include_auto_created=True)
+        if model not in EXCLUDED_MODELS
+        and model._meta.managed
+        and not model._meta.proxy
+    ]
+    tables = {model._meta.db_table: model for model in models}
+    ordered, visiting = [], set()
+
+    def visit(table):
+        if table in ordered or table in visiting:
+            return
+        visiting.add(table)
+        for field in tables[table]._meta.concrete_fields:
+            target = field.related_model
+            if field.many_to_one or field.one_to_one:
+                target_table = target._meta.db_table
+                if target_table in tables and target_table != table:
+                    visit(target_table)
+        ordered.append(table)
+
+    for table in sorted(tables):
+        visit(table)
+    return ordered
+
+
+def table_columns(cursor, table):
+    """[(column, SQL type)] in table order."""
+    cursor.execute(
+        "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute"
+        " WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped"
+        " ORDER BY attnum",
+        [table],
+    )
+    return [list(row) for row in cursor.fetchall()]
+
+
+def current_migration():
+    return (
+        MigrationRecorder.Migration.objects.filter(app="core")
+        .order_by("-id")
+        .values_list("name", flat=True)
+        .first()
+    )
+
+
+def quote(name):
+    return connection.ops.quote_name(name)
+
+
+def column_list(columns):
+    return ", ".join(quote(name) for name, _ in columns)
+
+
+def export_snapshot(path, compresslevel=6):
+    """Write a snapshot to `path`. Returns the manifest."""
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "created_at": timezone.now().isoformat(),
+        "migration": current_migration(),
+        "tables": [],
+    }
+    with (
+        transaction.atomic(),
+        connection.cursor() as cursor,
+        zipfile.ZipFile(
+            path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        ) as archive,
+    ):
+        if len(connection.atomic_blocks) == 1:
+            # First statement of the transaction: one snapshot for all tables
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        for table in snapshot_tables():
+            columns = table_columns(cursor, table)
+            with (
+                archive.open(f"tables/{table}.bin", "w", force_zip64=True) as member,
+                cursor.copy(
+                    f"COPY {quote(table)} ({column_list(columns)})"
+                    " TO STDOUT (FORMAT binary)"
+                ) as copy,
+            ):
+                for chunk in copy:
+                    member.write(chunk)
+            manifest["tables"].append(
+                {"table": table, "columns": columns, "rows": cursor.rowcount}
+            )
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(archive):
+    try:
+        manifest = json.loads(archive.read("manifest.json"))
+    except KeyError:
+        raise SnapshotError("Not a snapshot: manifest.json is missing.")
+    if manifest.get("format") != FORMAT:
+        raise SnapshotError("Not an engineering-atlas snapshot.")
+    if manifest.get("version") != VERSION:
+        raise SnapshotError(
+            f"Snapshot format version {manifest.get('version')} is not supported"
+            f" (expected {VERSION})."
+        )
+    return manifest
+
+
+def check_schema(cursor, manifest):
+    """The binary format has no conversions: columns must match exactly."""
+    problems = []
+    known = set(snapshot_tables())
+    for entry in manifest["tables"]:
+        table = entry["table"]
+        if table not in known:
+            problems.append(f"{table}: not a table of this schema")
+        elif table_columns(cursor, table) != entry["columns"]:
+            problems.append(f"{table}: columns differ")
+    if problems:
+        raise SnapshotError(
+            f"The snapshot was taken at migration {manifest['migration']} and"
+            f" doesn't match this database ({current_migration()}): "
+            + "; ".join(problems)
+        )
+
+
+def deferred_constraints(cursor, tables):
+    """
+    (table, name, type, definition) of the constraints to drop during the
+    load: on the tables, plus foreign keys into them from other tables.
+    """
+    cursor.execute(
+        "SELECT conrelid::regclass::text, conname, contype,"
+        " pg_get_constraintdef(oid) FROM pg_constraint"
+        " WHERE contype = ANY(%s) AND (conrelid::regclass::text = ANY(%s)"
+        " OR (contype = 'f' AND confrelid::regclass::text = ANY(%s)))",
+        [list(CONSTRAINT_TYPES), tables, tables],
+    )
+    return cursor.fetchall()
+
+
+def deferred_indexes(cursor, tables):
+    """(name, definition) of the indexes that don't back a constraint."""
+    cursor.execute(
+        "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)"
+        " FROM pg_index i WHERE i.indrelid::regclass::text = ANY(%s)"
+        " AND NOT EXISTS (SELECT 1 FROM pg_constraint c"
+        " WHERE c.conindid = i.indexrelid AND c.contype = ANY(%s))",
+        [tables, list(CONSTRAINT_TYPES)],
+    )
+    return cursor.fetchall()
+
+
+def reset_sequences(cursor, tables):
+    for table in tables:
+        cursor.execute(
+            "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass"
+            " AND attnum > 0 AND NOT attisdropped"
+            " AND pg_get_serial_sequence(%s, attname) IS NOT NULL",
+            [table, table],
+        )
+        for (column,) in cursor.fetchall():
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s),"
+                f" coalesce(max({quote(column)}), 1), max({quote(column)}) IS NOT NULL)"
+                f" FROM {quote(table)}",
+                [table, column],
+            )
+
+
+def restore_snapshot(path, replace=False, progress=None):
+    """
+    Load a snapshot into this database, replacing the tables' contents
+    (which must be empty unless `replace`). Returns the manifest.
+    """
+    progress = progress or (lambda message: None)
+    with (
+        zipfile.ZipFile(path) as archive,
+        transaction.atomic(),
+        connection.cursor() as cursor,
+    ):
+        manifest = read_manifest(archive)
+        check_schema(cursor, manifest)
+        tables = [entry["table"] for entry in manifest["tables"]]
+
+        if not replace:
+            for table in tables:
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {quote(table)})")
+                if cursor.fetchone()[0]:
+                    raise SnapshotError(
+                        f"{table} isn't empty; restore with --replace to overwrite."
+                    )
+        # Writes earlier in this transaction leave deferred FK checks
+        # queued, and TRUNCATE refuses tables with pending trigger events
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"TRUNCATE {', '.join(quote(table) for table in tables)}")
+
+        constraints = deferred_constraints(cursor, tables)
+        indexes = deferred_indexes(cursor, tables)
+        # Foreign keys first: they depend on the primary keys
+        for table, name, _, _ in sorted(constraints, key=lambda c: c[2] != "f"):
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote(name)}")
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+        progress(f"Deferred {len(constraints)} constraints and {len(indexes)} indexes")
+
+        for entry in manifest["tables"]:
+            table = entry["table"]
+            with (
+                archive.open(f"tables/{table}.bin") as member,
+                cursor.copy(
+                    f"COPY {quote(table)} ({column_list(entry['columns'])})"
+                    # Truncated in this transaction: rows can be written
+                    # frozen, sparing the first VACUUM a rewrite
+                    " FROM STDIN (FORMAT binary, FREEZE)"
+                ) as copy,
+            ):
+                while chunk := member.read(CHUNK_SIZE):
+                    copy.write(chunk)
+            progress(f"Loaded {entry['rows']} rows into {table}")
+
+        for kind in CONSTRAINT_TYPES[:-1]:
+            for table, name, contype, definition in constraints:
+                if contype == kind:
+                    cursor.execute(
+                        f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}"
+                    )
+        for _, definition in indexes:
+            cursor.execute(definition)
+        for table, name, contype, definition in constraints:
+            if contype == "f":
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}"
+                )
+        progress("Recreated constraints and indexes")
+
+        reset_sequences(cursor, tables)
+        cursor.execute(f"ANALYZE {', '.join(quote(table) for table in tables)}")
+
+        reset_changes()
+        queue_reset()
+        for namespace in ("categories", "competencies", "artifacts"):
+            bump_version_on_commit(namespace)
+    return manifest
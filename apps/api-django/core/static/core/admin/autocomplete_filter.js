@@ -0,0 +1,11 @@
+'use strict';
+{
+    // Navigate when an AutocompleteFilter select changes (see core/admin_tools.py)
+    const $ = django.jQuery;
+    $(document).on('change', '[data-autocomplete-filter] select', function() {
+        const container = this.closest('[data-autocomplete-filter]');
+        window.location.search = this.value
+            ? container.dataset.autocompleteFilter.replace('__value__', encodeURIComponent(this.value))
+            : container.dataset.clearUrl;
+    });
+}
@@ -0,0 +1,163 @@
+"""
+Delta sync: a change log of API documents (categories, competencies,
+artifacts), written by signals.py in the same transaction as the change and
+read back by /api/sync/ in transaction order.
+
+- The cursor is a Postgres transaction id. A page only includes transactions
+  older than every transaction still in progress (the snapshot's xmin), so a
+  transaction that commits late can never land behind a cursor already handed
+  out.
+- Logging a change also invalidates the resource's cached responses
+  (cache.py namespaces are named after the resources).
+- Entries only name the document. The sync response carries its current
+  state, or a tombstone if it no longer exists, so entries can be coalesced
+  freely and their order within a page doesn't matter.
+- A "prune" marker ends the log's reach: cursors below its txid get None
+  from read_changes() (410 from /api/sync/). Left by prune_changes() and by
+  snapshot restores (reset_changes()).
+"""
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .cache import bump_version_on_commit
+from .models import (
+    ArtifactCompetency,
+    ChangeLogEntry,
+    Competency,
+    SubCompetency,
+)
+
+RESOURCES = ("categories", "competencies", "artifacts")
+
+# Entries per sync page. A page never splits a transaction.
+PAGE_SIZE = 1000
+
+
+def record_changes(resource, ids, op="update"):
+    """Log `op` for each document id (duplicates are dropped)."""
+    ids = sorted({str(pk) for pk in ids})
+    if ids:
+        ChangeLogEntry.objects.bulk_create(
+            [ChangeLogEntry(resource=resource, object_id=pk, op=op) for pk in ids]
+        )
+        bump_version_on_commit(resource)
+
+
+def record_competency_referrers(competency_ids):
+    """
+    Documents that embed a competency's name, type or category name:
+    competencies linking it as related, and artifacts using it.
+    """
+    through = Competency.related_competencies.through
+    record_changes(
+        "competencies",
+        through.objects.filter(to_competency_id__in=competency_ids).values_list(
+            "from_competency_id", flat=True
+        ),
+    )
+    record_changes(
+        "artifacts",
+        ArtifactCompetency.objects.filter(competency_id__in=competency_ids)
+        .values_list("artifact_id", flat=True)
+        .distinct(),
+    )
+
+
+def record_code_reference_users(reference_ids):
+    """Competencies whose sub-competencies nest these code references."""
+    through = SubCompetency.code_references.through
+    record_changes(
+        "competencies",
+        through.objects.filter(commitcodereference_id__in=reference_ids)
+        .values_list("subcompetency__parent_id", flat=True)
+        .distinct(),
+    )
+
+
+def stable_txid():
+    """
+    Newest transaction id at or below which every transaction has finished
+    (committed or rolled back) as of this query.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0] - 1
+
+
+def pruned_through():
+    """Highest txid whose entries may have been pruned (0 if never pruned)."""
+    return (
+        ChangeLogEntry.objects.filter(op="prune").aggregate(txid=Max("txid"))["txid"]
+        or 0
+    )
+
+
+def read_changes(since, page_size=PAGE_SIZE):
+    """
+    Documents changed after cursor `since`.
+
+    Returns (cursor, has_more, {resource: {ids}}), or None if entries after
+    `since` have been pruned (the client must resync from scratch).
+    """
+    if since < pruned_through():
+        return None
+
+    stable = stable_txid()
+    entries = list(
+        ChangeLogEntry.objects.filter(txid__gt=since, txid__lte=stable)
+        .exclude(op="prune")
+        .order_by("txid", "id")
+        .values_list("txid", "resource", "object_id")[: page_size + 1]
+    )
+
+    has_more = len(entries) > page_size
+    if has_more:
+        # Stop before the transaction that straddles the page boundary,
+        # unless it alone fills the page: then take all of it
+        boundary = entries[page_size][0]
+        entries = [entry for entry in entries if entry[0] < boundary]
+        if not entries:
+            entries = list(
+                ChangeLogEntry.objects.filter(txid=boundary)
+                .exclude(op="prune")
+                .values_list("txid", "resource", "object_id")
+            )
+
+    changed = {resource: set() for resource in RESOURCES}
+    for _, resource, object_id in entries:
+        changed[resource].add(object_id)
+
+    if entries:
+        cursor = entries[-1][0]
+    else:
+        # Nothing new up to `stable`: skip ahead so later scans start there
+        cursor = max(since, stable)
+    return cursor, has_more, changed
+
+
+def prune_changes(before):
+    """
+    Delete entries created before `before`, leaving a marker so clients with
+    an older cursor are told to resync. Returns the number deleted.
+    """
+    old = ChangeLogEntry.objects.filter(created_at__lt=before).exclude(op="prune")
+    horizon = old.aggregate(txid=Max("txid"))["txid"]
+    if horizon is None:
+        return 0
+
+    with transaction.atomic():
+        ChangeLogEntry.objects.filter(op="prune").delete()
+        deleted, _ = ChangeLogEntry.objects.filter(txid__lte=horizon).delete()
+        ChangeLogEntry.objects.create(txid=horizon, op="prune")
+    return deleted
+
+
+def reset_changes():
+    """
+    For data replaced wholesale (a snapshot restore): empties the log and
+    leaves a prune marker at the current transaction's id, so every cursor
+    handed out before it must resync. Call inside that transaction.
+    """
+    ChangeLogEntry.objects.all().delete()
+    ChangeLogEntry.objects.create(op="prune")  # txid defaults to this one
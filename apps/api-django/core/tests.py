@@ -1,7 +1,68 @@
-from rest_framework.test import APITestCase
-from rest_framework import status
+import asyncio
+import functools
+import gzip
+import json
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import wait
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from rest_framework.test import (
+    APIRequestFactory,
+    APITestCase,
+    APITransactionTestCase,
+)
+from rest_framework import status, viewsets
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from .models import Category, Competency, Artifact, ArtifactCompetency
+from django.utils import timezone
+from .admin_tools import EstimatedCountPaginator
+from .bulk import BatchValidationError, create_artifacts
+from .embeddings import update_embeddings
+from .serializers import CategorySerializer
+from .views import (
+    ArtifactViewSet,
+    CompetencyViewSet,
+    NormalizedResponseMixin,
+    prebuilt_schema,
+)
+from . import centrality, events, metrics, profiling, renderers, rollups
+from . import seed_export, signals, slow_queries, snapshots, throttling
+from .budgets import QueryBudget
+from .cache import bump_version, coalesced
+from .compression import accepted_encoding
+from . import compression
+from . import cache as cache_module
+from .models import (
+    Category,
+    Competency,
+    Artifact,
+    ArtifactCompetency,
+    ArtifactSimilarity,
+    ChangeLogEntry,
+    CommitCodeReference,
+    SubCompetency,
+    RequestProfile,
+    SlowQuery,
+    Technology,
+)
+from .rendering import render_markdown
+from .similarity import rebuild_similarities
+from .management.commands import warm_cache
+from .sync import prune_changes, read_changes, stable_txid
 
 
 class AtlasApiTests(APITestCase):
@@ -97,3 +158,1675 @@ class AtlasApiTests(APITestCase):
 
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["id"], "engineering-atlas")
+
+
+class MarkdownRenderingTests(APITestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Backend", display_order=1)
+        self.competency = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=self.category,
+            competency_type="language",
+            proficiency="Expert",
+            summary="**Primary** language.",
+        )
+
+    def test_summary_rendered_on_save(self):
+        self.assertEqual(
+            self.competency.summary_html, "<p><strong>Primary</strong> language.</p>"
+        )
+
+    def test_render_skipped_when_source_unchanged(self):
+        self.assertFalse(self.competency.render_markdown())
+        self.competency.summary = "Changed."
+        self.assertTrue(self.competency.render_markdown())
+
+    def test_rendered_html_is_sanitized(self):
+        html = render_markdown(
+            '<script>alert(1)</script>[x](javascript:alert(1)) <b onclick="x">hi</b>'
+        )
+        self.assertNotIn("script", html)
+        self.assertNotIn("javascript", html)
+        self.assertNotIn("onclick", html)
+
+    def test_html_fields_are_opt_in(self):
+        url = reverse("competency-detail", args=["python"])
+        self.assertNotIn("summary_html", self.client.get(url).data)
+
+        response = self.client.get(url + "?html=true")
+        self.assertEqual(response.data["summary_html"], self.competency.summary_html)
+
+
+class BulkArtifactTests(APITestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Backend", display_order=1)
+        self.competency = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=self.category,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        Artifact.objects.create(
+            title="Portfolio",
+            complexity="beginner",
+            demo_type="case-study",
+            description="First.",
+        )
+
+    def portfolio(self, **extra):
+        return {
+            "title": "Portfolio",
+            "complexity": "beginner",
+            "demo_type": "case-study",
+            "description": "Another one.",
+            **extra,
+        }
+
+    def test_batch_slugs_allocated_without_collisions(self):
+        created = create_artifacts([self.portfolio() for _ in range(3)])
+        self.assertEqual(
+            [obj.id for obj in created], ["portfolio-1", "portfolio-2", "portfolio-3"]
+        )
+
+    def test_query_count_independent_of_batch_size(self):
+        items = [self.portfolio(competencies=[{"id": "python", "role": "primary"}])]
+        with CaptureQueriesContext(connection) as small:
+            create_artifacts(items * 2)
+        with CaptureQueriesContext(connection) as large:
+            create_artifacts(items * 20)
+        self.assertEqual(len(large), len(small))
+
+    def test_invalid_batch_writes_nothing(self):
+        bad = self.portfolio(status="complete", demo_type="live-site")
+        with self.assertRaises(BatchValidationError) as ctx:
+            create_artifacts([self.portfolio(), bad])
+        self.assertIn("live_url", ctx.exception.errors[1])
+        self.assertEqual(Artifact.objects.count(), 1)
+
+    def test_malformed_payloads_are_item_errors(self):
+        items = [
+            self.portfolio(competencies=[{"id": ["python"], "role": "primary"}]),
+            self.portfolio(competencies=[{"id": "python", "role": {"x": 1}}]),
+            self.portfolio(tech_stack="Python"),
+            self.portfolio(id=["portfolio"]),
+        ]
+        with self.assertRaises(BatchValidationError) as ctx:
+            create_artifacts(items)
+        errors = ctx.exception.errors
+        self.assertEqual(
+            errors[0]["competencies"], ["Each competency id must be a string."]
+        )
+        self.assertEqual(errors[1]["competencies"], ["Invalid role '{'x': 1}'."])
+        self.assertEqual(errors[2]["tech_stack"], ["Expected a list of strings."])
+        self.assertEqual(errors[3]["id"], ["Expected a string."])
+
+    def test_batch_endpoint_rejects_malformed_payloads(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            reverse("artifact-batch"),
+            [self.portfolio(tech_stack="Python")],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_endpoint_requires_permission(self):
+        url = reverse("artifact-batch")
+        response = self.client.post(url, [self.portfolio()], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_authenticate(user)
+        response = self.client.post(url, [self.portfolio()], format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["id"], "portfolio-1")
+
+
+class TechnologyDictionaryTests(APITestCase):
+    def setUp(self):
+        self.artifact = Artifact.objects.create(
+            id="atlas",
+            title="Atlas",
+            complexity="advanced",
+            demo_type="case-study",
+            description="Portfolio.",
+            tech_stack=["Python", "Django"],
+        )
+
+    def counts(self):
+        return dict(Technology.objects.values_list("name", "artifact_count"))
+
+    def test_counts_follow_writes(self):
+        self.assertEqual(self.counts(), {"Python": 1, "Django": 1})
+
+        self.artifact.tech_stack = ["Python", "React"]
+        self.artifact.save()
+        self.assertEqual(self.counts(), {"Python": 1, "Django": 0, "React": 1})
+
+        self.artifact.delete()
+        self.assertEqual(self.counts(), {"Python": 0, "Django": 0, "React": 0})
+
+    def test_delete_releases_the_stored_tags(self):
+        # Edited but never saved: the row still holds Python and Django
+        self.artifact.tech_stack = ["Go"]
+        self.artifact.delete()
+        self.assertEqual(self.counts(), {"Python": 0, "Django": 0})
+
+    def test_bulk_create_canonicalizes_and_counts(self):
+        created = create_artifacts(
+            [
+                {
+                    "title": "Other",
+                    "complexity": "beginner",
+                    "demo_type": "case-study",
+                    "description": "x",
+                    "tech_stack": ["python", "Go"],
+                }
+            ]
+        )
+        self.assertEqual(created[0].tech_stack, ["Python", "Go"])
+        self.assertEqual(self.counts(), {"Python": 2, "Django": 1, "Go": 1})
+
+    def test_rebuild_matches_incremental_counts(self):
+        before = self.counts()
+        Technology.objects.rebuild()
+        self.assertEqual(self.counts(), before)
+
+    def test_autocomplete_endpoint(self):
+        response = self.client.get(reverse("technology-list") + "?q=py")
+        self.assertEqual([row["name"] for row in response.data], ["Python"])
+
+
+class AdminPerformanceTests(APITestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Backend", display_order=1)
+        self.competency = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=self.category,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def test_unfiltered_count_uses_planner_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_competency")
+
+        paginator = EstimatedCountPaginator(Competency.objects.all(), 10)
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            with self.assertNumQueries(1):
+                self.assertEqual(paginator.count, 1)
+
+        filtered = EstimatedCountPaginator(Competency.objects.filter(name="x"), 10)
+        with override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            self.assertEqual(filtered.count, 0)
+
+    def test_autocomplete_filter_renders_selected_option_only(self):
+        url = reverse("admin:core_competency_changelist")
+        response = self.client.get(url + "?category__id__exact=backend")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-autocomplete-filter="')
+        self.assertContains(response, '<option value="backend" selected>')
+
+    def test_code_search_is_opt_in(self):
+        CommitCodeReference.objects.create(
+            commit_hash="a" * 40,
+            file_path="core/models.py",
+            start_line=1,
+            cached_snippet="def needle(): pass",
+        )
+        url = reverse("admin:core_commitcodereference_changelist")
+        response = self.client.get(url + "?q=needle")
+        self.assertEqual(response.context["cl"].result_count, 0)
+
+        response = self.client.get(url + "?q=needle&search_code=1")
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+
+class EmbeddingTests(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Backend", display_order=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            for slug, name, summary in [
+                ("postgres", "PostgreSQL", "Relational database tuning and indexing."),
+                ("mysql", "MySQL", "Relational database replication and indexing."),
+                ("css", "CSS", "Layout with flexbox and grid."),
+            ]:
+                Competency.objects.create(
+                    id=slug,
+                    name=name,
+                    category=category,
+                    competency_type="tooling",
+                    proficiency="Advanced",
+                    summary=summary,
+                )
+
+    def test_only_changed_rows_are_reembedded(self):
+        self.assertEqual(update_embeddings(Competency), 0)
+        self.assertEqual(update_embeddings(Competency, force=True), 3)
+
+        # Bypasses the write hooks
+        Competency.objects.filter(id="css").update(summary="Responsive layout.")
+        self.assertEqual(update_embeddings(Competency), 1)
+
+    def test_saves_reembed_on_commit(self):
+        update_embeddings(Competency)
+        css = Competency.objects.get(id="css")
+        before = css.embedding_digest
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            css.summary = "Responsive layout."
+            css.save()
+            css.save(update_fields=["proficiency"])
+        self.assertEqual(len(callbacks), 1)
+        css.refresh_from_db()
+        self.assertNotEqual(css.embedding_digest, before)
+        self.assertEqual(update_embeddings(Competency), 0)
+
+        # No text change, nothing scheduled
+        with self.captureOnCommitCallbacks() as callbacks:
+            css.save()
+        self.assertEqual(callbacks, [])
+
+    def test_loaded_embedding_passes_validation(self):
+        update_embeddings(Competency)
+        competency = Competency.objects.defer(None).get(id="css")
+        competency.full_clean()
+
+    def test_similar_competencies(self):
+        update_embeddings(Competency)
+        url = reverse("competency-similar", args=["postgres"])
+        response = self.client.get(url, {"k": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], ["mysql", "css"])
+        self.assertGreater(
+            response.data[0]["similarity"], response.data[1]["similarity"]
+        )
+
+    def test_semantic_search(self):
+        update_embeddings(Competency)
+        url = reverse("semantic-search")
+        response = self.client.get(url, {"q": "grid layout", "type": "competencies"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["competencies"])
+        self.assertEqual(response.data["competencies"][0]["id"], "css")
+
+        response = self.client.get(url, {"q": "x", "type": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SimilarArtifactTests(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Backend", display_order=1)
+        for slug in ["python", "django", "css"]:
+            Competency.objects.create(
+                id=slug,
+                name=slug.title(),
+                category=category,
+                competency_type="language",
+                proficiency="Expert",
+                summary="Skill.",
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_artifacts(
+                [
+                    self.project(
+                        "api", ["Postgres"], python="primary", django="primary"
+                    ),
+                    self.project("cli", ["Click"], python="primary"),
+                    self.project("site", ["Postgres"], css="primary"),
+                    self.project("theme", [], css="supporting"),
+                ]
+            )
+
+    def project(self, slug, tech_stack, **roles):
+        return {
+            "id": slug,
+            "title": slug.title(),
+            "complexity": "beginner",
+            "demo_type": "case-study",
+            "description": "Project.",
+            "tech_stack": tech_stack,
+            "competencies": [{"id": c, "role": r} for c, r in roles.items()],
+        }
+
+    def stored(self):
+        return sorted(
+            ArtifactSimilarity.objects.values_list(
+                "artifact_id", "similar_id", "rank", "score"
+            )
+        )
+
+    def test_similar_endpoint_ranks_by_weighted_overlap(self):
+        response = self.client.get(reverse("artifact-similar", args=["api"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data], ["cli", "site"])
+        self.assertGreater(
+            response.data[0]["similarity"], response.data[1]["similarity"]
+        )
+
+        response = self.client.get(reverse("artifact-similar", args=["missing"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            site = Artifact.objects.get(id="site")
+            site.tech_stack = ["Click"]
+            site.save()
+            ArtifactCompetency.objects.create(
+                artifact=site, competency_id="python", role="secondary"
+            )
+            ArtifactCompetency.objects.filter(artifact_id="cli").delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Artifact.objects.get(id="theme").delete()
+
+        incremental = self.stored()
+        rebuild_similarities()
+        self.assertEqual(incremental, self.stored())
+
+    def test_refresh_loads_only_the_neighbourhood(self):
+        from . import similarity
+
+        loaded = []
+
+        def spy(artifact_ids=None):
+            loaded.append(set(artifact_ids))
+            return feature_matrix(artifact_ids)
+
+        feature_matrix = similarity.feature_matrix
+        with mock.patch.object(similarity, "feature_matrix", spy):
+            similarity.refresh_similarities(["cli"])
+        # Shares python with api; site and theme are never read
+        self.assertEqual(loaded, [{"api", "cli"}])
+
+
+class CompetencyHistoryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        histories = {
+            "cpp": [
+                {"role": "Engineer", "company": "Mechdyne", "year": "2021-2023"},
+                {"role": "Embedded", "company": "Gridpoint", "year": "2013-2016"},
+            ],
+            "python": [
+                {"role": "Lead", "company": "Black Lantern", "year": "2023-Present"}
+            ],
+        }
+        # Committed, so later writes in a test get their own on-commit hooks
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Backend", display_order=1)
+            for slug, history in histories.items():
+                Competency.objects.create(
+                    id=slug,
+                    name=slug.title(),
+                    category=category,
+                    competency_type="language",
+                    proficiency="Expert",
+                    summary="Skill.",
+                    history=history,
+                )
+
+    def ids(self, **params):
+        response = self.client.get(reverse("competency-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(item["id"] for item in response.data)
+
+    def test_history_filters(self):
+        self.assertEqual(self.ids(company="Mechdyne"), ["cpp"])
+        self.assertEqual(self.ids(year_from=2022), ["cpp", "python"])
+        self.assertEqual(self.ids(year_to=2015), ["cpp"])
+        # Company and years must match the same entry
+        self.assertEqual(self.ids(company="Gridpoint", year_from=2020), [])
+
+    def test_unparseable_years_match_no_range(self):
+        cpp = Competency.objects.get(id="cpp")
+        cpp.history = [{"role": "Engineer", "company": "Mechdyne", "year": "a while"}]
+        cpp.save()
+        self.assertEqual(self.ids(company="Mechdyne"), ["cpp"])
+        self.assertEqual(self.ids(year_from=2022), ["python"])
+        self.assertEqual(self.ids(year_to=2030), ["python"])
+
+    def test_timeline_cached_until_next_write(self):
+        url = reverse("competency-timeline")
+        first = self.client.get(url).data
+        self.assertEqual(
+            [(row["company"], row["year_start"], row["year_end"]) for row in first],
+            [
+                ("Black Lantern", 2023, None),
+                ("Mechdyne", 2021, 2023),
+                ("Gridpoint", 2013, 2016),
+            ],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data, first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cpp = Competency.objects.get(id="cpp")
+            cpp.history = cpp.history[:1]
+            cpp.save()
+        companies = [row["company"] for row in self.client.get(url).data]
+        self.assertEqual(companies, ["Black Lantern", "Mechdyne"])
+
+
+class ChangeEventTests(APITestCase):
+    def test_stream_unavailable_without_redis(self):
+        with override_settings(REDIS_URL=""):
+            response = self.client.get(reverse("change-events"))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @skipUnless(settings.REDIS_URL, "REDIS_URL is not set")
+    def test_writes_publish_once_after_commit(self):
+        client = events.get_client()
+        client.delete(events.VERSION_KEY, events.REPLAY_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name="Backend", display_order=1)
+            category.display_order = 2
+            category.save()
+            removed = Category.objects.create(name="Frontend", display_order=3)
+            removed_pk = removed.pk
+            removed.delete()
+            self.assertEqual(client.llen(events.REPLAY_KEY), 0)
+
+        replay = asyncio.run(events.replay_since(0))
+        self.assertEqual(
+            [json.loads(frame.split(b"data: ")[1]) for _, frame in replay],
+            [
+                {"model": "category", "id": category.pk, "op": "create", "version": 1},
+                {
+                    "model": "category",
+                    "id": removed_pk,
+                    "op": "delete",
+                    "version": 2,
+                },
+            ],
+        )
+        self.assertEqual(asyncio.run(events.replay_since(2)), [])
+        # Ahead of the server: the client must refetch
+        self.assertIsNone(asyncio.run(events.replay_since(5)))
+
+    def test_target_side_clear_updates_linked_rows(self):
+        category = Category.objects.create(name="Backend", display_order=1)
+        python = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=category,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        atlas = Artifact.objects.create(
+            id="atlas",
+            title="Atlas",
+            complexity="advanced",
+            demo_type="case-study",
+            description="Portfolio.",
+        )
+        ArtifactCompetency.objects.create(
+            artifact=atlas, competency=python, role="primary"
+        )
+
+        sub = SubCompetency.objects.create(
+            parent=python, name="Typing", desc="Type hints."
+        )
+        reference = CommitCodeReference.objects.create(
+            commit_hash="a" * 40, file_path="core/sync.py", start_line=1
+        )
+        sub.code_references.add(reference)
+
+        with mock.patch.object(signals, "queue_event") as queue_event:
+            reference.subcompetency_set.clear()
+        queue_event.assert_called_once_with("sub_competency", sub.pk, "update")
+
+        # The link rows' own post_delete hooks fire too; flushes dedupe
+        with mock.patch.object(signals, "schedule_refresh") as schedule_refresh:
+            python.artifacts.clear()
+        for call in schedule_refresh.call_args_list:
+            self.assertEqual(list(call.args[0]), ["atlas"])
+
+    @skipUnless(settings.REDIS_URL, "REDIS_URL is not set")
+    def test_reset_is_replayed(self):
+        client = events.get_client()
+        client.delete(events.VERSION_KEY, events.REPLAY_KEY)
+        events.publish_events([("category", "backend", "update")])
+        self.assertEqual(events.publish_reset(), 2)
+
+        (_, change), (_, reset) = asyncio.run(events.replay_since(0))
+        self.assertIn(b"event: change", change)
+        self.assertEqual(reset, b"id: 2\nevent: reset\ndata: {}\n\n")
+
+    @skipUnless(settings.REDIS_URL, "REDIS_URL is not set")
+    def test_stream_subscribes_before_first_read(self):
+        async def run():
+            stream = events.event_stream()
+            events.broadcaster.broadcast(events.format_event(b'{"version": 7}'))
+            frames = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return frames
+
+        retry, frame = asyncio.run(run())
+        self.assertTrue(retry.startswith(b"retry:"))
+        self.assertTrue(frame.startswith(b"id: 7\n"))
+        self.assertFalse(events.broadcaster.subscribers)
+
+
+# Transaction ids only become visible to sync once the writing transaction
+# has finished, so these tests commit for real
+class DeltaSyncTests(APITransactionTestCase):
+    def setUp(self):
+        self.cursor = self.client.get(reverse("sync")).data["cursor"]
+        self.backend = Category.objects.create(name="Backend", display_order=1)
+        self.python = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=self.backend,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        self.atlas = Artifact.objects.create(
+            id="engineering-atlas",
+            title="Engineering Atlas",
+            status="in-progress",
+            complexity="advanced",
+            demo_type="live-site",
+            description="The mothership project.",
+        )
+        ArtifactCompetency.objects.create(
+            artifact=self.atlas, competency=self.python, role="primary"
+        )
+
+    def sync(self):
+        response = self.client.get(reverse("sync"), {"since": self.cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(response.data["cursor"], self.cursor)
+        self.cursor = response.data["cursor"]
+        updated = {
+            name: sorted(doc["id"] for doc in docs)
+            for name, docs in response.data["updated"].items()
+        }
+        return updated, response.data["deleted"]
+
+    def test_changes_since_cursor(self):
+        updated, deleted = self.sync()
+        self.assertEqual(
+            updated,
+            {
+                "categories": ["backend"],
+                "competencies": ["python"],
+                "artifacts": ["engineering-atlas"],
+            },
+        )
+        self.assertEqual(self.sync()[0]["artifacts"], [])
+
+        # Renaming a competency changes the artifacts that show its name
+        self.python.name = "Python 3"
+        self.python.save()
+        self.atlas.delete()
+        updated, deleted = self.sync()
+        self.assertEqual(updated["competencies"], ["python"])
+        self.assertEqual(updated["artifacts"], [])
+        self.assertEqual(deleted["artifacts"], ["engineering-atlas"])
+
+    def test_nested_and_relation_changes(self):
+        self.sync()
+        sub = SubCompetency.objects.create(
+            parent=self.python, name="Typing", desc="Type hints."
+        )
+        self.assertEqual(self.sync()[0]["competencies"], ["python"])
+
+        reference = CommitCodeReference.objects.create(
+            commit_hash="a" * 40, file_path="core/sync.py", start_line=1
+        )
+        sub.code_references.add(reference)
+        self.sync()
+        reference.delete()
+        self.assertEqual(self.sync()[0]["competencies"], ["python"])
+
+        self.python.artifacts.clear()
+        self.assertEqual(self.sync()[0]["artifacts"], ["engineering-atlas"])
+
+    def test_pruned_cursor_must_resync(self):
+        stale = self.cursor
+        self.sync()
+        self.assertGreater(prune_changes(timezone.now() + timedelta(days=1)), 0)
+        response = self.client.get(reverse("sync"), {"since": stale})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        # Start over from a fresh cursor
+        self.cursor = self.client.get(reverse("sync")).data["cursor"]
+        updated, deleted = self.sync()
+        self.assertFalse(any(updated.values()) or any(deleted.values()))
+
+
+class WarmCacheTests(APITransactionTestCase):
+    def setUp(self):
+        backend = Category.objects.create(name="Backend", display_order=1)
+        self.python = Competency.objects.create(
+            id="python",
+            name="Python",
+            category=backend,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        Artifact.objects.create(
+            id="engineering-atlas",
+            title="Engineering Atlas",
+            status="in-progress",
+            complexity="advanced",
+            demo_type="live-site",
+            description="The mothership project.",
+        )
+        self.command = warm_cache.Command()
+
+    def paths(self, routes):
+        return {(path, tuple(sorted(params.items()))) for _, _, path, params in routes}
+
+    def test_all_routes(self):
+        paths = self.paths(self.command.all_routes())
+        self.assertLessEqual(
+            {
+                ("/api/competencies/", ()),
+                ("/api/competencies/", (("proficiency", "Expert"),)),
+                ("/api/competencies/python/", ()),
+                ("/api/artifacts/engineering-atlas/", ()),
+                ("/api/categories/backend/", ()),
+            },
+            paths,
+        )
+
+    def test_changed_routes_read_every_page(self):
+        cursor = stable_txid()
+        self.python.summary = "Still the primary language."
+        self.python.save()
+        Artifact.objects.filter(id="engineering-atlas").delete()
+
+        one_per_page = functools.partial(read_changes, page_size=1)
+        with mock.patch.object(warm_cache, "read_changes", one_per_page):
+            paths = self.paths(self.command.changed_routes(cursor))
+        self.assertIn(("/api/competencies/python/", ()), paths)
+        # Lists of a changed resource are re-rendered, deleted details aren't
+        self.assertIn(("/api/artifacts/", ()), paths)
+        self.assertNotIn(("/api/artifacts/engineering-atlas/", ()), paths)
+        self.assertFalse(any(path.startswith("/api/categories/") for path, _ in paths))
+
+    def test_cursor_advances_only_when_every_route_rendered(self):
+        missing = (
+            ArtifactViewSet,
+            "retrieve",
+            reverse("artifact-detail", args=["missing"]),
+            {},
+        )
+        all_routes = warm_cache.Command.all_routes
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory,
+                }
+            }
+        ):
+            with mock.patch.object(
+                warm_cache.Command,
+                "all_routes",
+                lambda command: all_routes(command) + [missing],
+            ):
+                call_command(
+                    "warm_cache",
+                    workers=1,
+                    host="testserver",
+                    stdout=StringIO(),
+                    stderr=StringIO(),
+                )
+            self.assertIsNone(cache.get(warm_cache.CURSOR_KEY))
+
+            call_command("warm_cache", workers=1, host="testserver", stdout=StringIO())
+            self.assertIsNotNone(cache.get(warm_cache.CURSOR_KEY))
+
+
+class CoalescedCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "payload"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(coalesced("herd", "list", compute))
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["payload"] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(metrics.value("computed"), 1)
+        self.assertEqual(metrics.value("waited"), 9)
+        self.assertEqual(metrics.value("duplicate"), 0)
+
+    def test_stale_entry_served_while_refreshing(self):
+        coalesced("stale", "list", lambda: "old")
+        bump_version("stale")  # A write
+
+        self.assertEqual(coalesced("stale", "list", lambda: "new"), "old")
+        wait(list(cache_module._refreshing))
+        self.assertEqual(coalesced("stale", "list", lambda: "newer"), "new")
+        self.assertEqual(metrics.value("stale"), 1)
+
+    def test_list_responses_cached(self):
+        Category.objects.create(name="Backend", display_order=1)
+        url = reverse("category-list")
+        first = self.client.get(url).data
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).data, first)
+        self.assertEqual(metrics.value("hit"), 1)
+
+        detail = reverse("category-detail", args=["backend"])
+        self.assertEqual(self.client.get(detail).data["name"], "Backend")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(detail).data["name"], "Backend")
+
+
+class AtlasFixtureTestCase(APITestCase):
+    """Three competencies in two categories, linked and used by an artifact."""
+
+    def setUp(self):
+        cache.clear()
+        backend = Category.objects.create(name="Backend", display_order=1)
+        systems = Category.objects.create(name="Systems", display_order=2)
+        for slug, category in [("python", backend), ("cpp", systems), ("go", backend)]:
+            Competency.objects.create(
+                id=slug,
+                name=slug.title(),
+                category=category,
+                competency_type="language",
+                proficiency="Expert",
+                summary="Skill.",
+            )
+        python = Competency.objects.get(id="python")
+        python.related_competencies.add("cpp", "go")
+        sub = SubCompetency.objects.create(parent=python, name="Typing", desc="Hints.")
+        sub.code_references.add(
+            CommitCodeReference.objects.create(
+                commit_hash="a" * 40, file_path="core/bundle.py", start_line=1
+            )
+        )
+        self.add_artifact("engineering-atlas", ["python", "cpp"])
+
+    def add_artifact(self, slug, competencies):
+        artifact = Artifact.objects.create(
+            id=slug,
+            title=slug.title(),
+            status="in-progress",
+            complexity="advanced",
+            demo_type="live-site",
+            description="Project.",
+        )
+        for competency in competencies:
+            ArtifactCompetency.objects.create(
+                artifact=artifact, competency_id=competency, role="primary"
+            )
+
+
+class BundleTests(AtlasFixtureTestCase):
+    def test_bundle_matches_list_endpoints(self):
+        bundle = self.client.get(reverse("bundle")).data
+        for section, basename in [
+            ("categories", "category"),
+            ("competencies", "competency"),
+            ("artifacts", "artifact"),
+        ]:
+            listed = self.client.get(reverse(f"{basename}-list")).data
+            self.assertEqual(bundle[section], listed)
+
+    def test_bundle_query_count_is_fixed(self):
+        with self.assertNumQueries(7):
+            self.client.get(reverse("bundle"))
+        self.add_artifact("portfolio", ["go"])
+        self.add_artifact("lab", ["python", "go"])
+        cache.clear()
+        with self.assertNumQueries(7):
+            self.client.get(reverse("bundle"))
+
+    def test_batch_ids(self):
+        url = reverse("competency-list")
+        response = self.client.get(url, {"ids": "go,python,missing"})
+        self.assertEqual(sorted(row["id"] for row in response.data), ["go", "python"])
+
+        too_many = ",".join(f"id-{n}" for n in range(101))
+        response = self.client.get(url, {"ids": too_many})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NormalizedResponseTests(AtlasFixtureTestCase):
+    def test_default_shape_is_unchanged(self):
+        row = self.client.get(reverse("competency-detail", args=["python"])).data
+        self.assertEqual(row["category"]["name"], "Backend")
+        self.assertEqual(row["related_competencies"][0]["name"], "Go")
+
+    def test_competencies_reference_entity_tables(self):
+        url = reverse("competency-list")
+        nested = self.client.get(url, {"category": "backend"}).data
+        data = self.client.get(url, {"category": "backend", "shape": "normalized"}).data
+        entities = data["entities"]
+
+        self.assertEqual([row["id"] for row in data["results"]], ["go", "python"])
+        python = data["results"][1]
+        self.assertEqual(python["category"], "backend")
+        self.assertEqual(python["related_competencies"], ["go", "cpp"])
+        # "cpp" is in another category, outside the filtered results
+        self.assertEqual(list(entities["categories"]), ["backend", "systems"])
+        self.assertEqual(
+            entities["competencies"]["cpp"],
+            {
+                "id": "cpp",
+                "name": "Cpp",
+                "competency_type": "language",
+                "category": "systems",
+            },
+        )
+        # Same information as the nested shape
+        self.assertEqual(entities["categories"]["backend"], dict(nested[1]["category"]))
+        self.assertEqual(python["sub_competencies"], nested[1]["sub_competencies"])
+
+    def test_artifacts_reference_entity_tables(self):
+        url = reverse("artifact-detail", args=["engineering-atlas"])
+        nested = self.client.get(url).data
+        data = self.client.get(url, {"shape": "normalized"}).data
+        entities = data["entities"]
+        resolved = [
+            {
+                "id": link["id"],
+                "name": entities["competencies"][link["id"]]["name"],
+                "category_name": entities["categories"][
+                    entities["competencies"][link["id"]]["category"]
+                ]["name"],
+                "role": link["role"],
+            }
+            for link in data["result"]["competencies"]
+        ]
+        self.assertEqual(resolved, [dict(link) for link in nested["competencies"]])
+
+    def test_normalized_bundle(self):
+        data = self.client.get(reverse("bundle"), {"shape": "normalized"}).data
+        known = {row["id"] for row in data["competencies"]}
+        links = data["artifacts"][0]["competencies"]
+        self.assertEqual(links[0], {"id": "python", "role": "primary"})
+        self.assertTrue(all(link["id"] in known for link in links))
+        self.assertEqual(data["competencies"][1]["category"], "backend")
+
+    def test_unknown_shape(self):
+        response = self.client.get(reverse("artifact-list"), {"shape": "flat"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_views_must_define_referenced(self):
+        class CategoryView(NormalizedResponseMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = Category.objects.all()
+            serializer_class = normalized_serializer_class = CategorySerializer
+
+        view = CategoryView.as_view({"get": "list"})
+        request = APIRequestFactory().get("/", {"shape": "normalized"})
+        with self.assertRaisesMessage(ImproperlyConfigured, "referenced()"):
+            view(request)
+        self.assertEqual(view(APIRequestFactory().get("/")).status_code, 200)
+
+
+class CompetencyOrderingTests(AtlasFixtureTestCase):
+    def ordered_ids(self):
+        return list(Competency.objects.values_list("id", flat=True))
+
+    def test_order_follows_category_writes(self):
+        self.assertNotIn("JOIN", str(Competency.objects.all().query))
+        self.assertEqual(self.ordered_ids(), ["go", "python", "cpp"])
+
+        systems = Category.objects.get(pk="systems")
+        systems.display_order = 0
+        systems.save()
+        self.assertEqual(self.ordered_ids(), ["cpp", "go", "python"])
+
+        python = Competency.objects.get(pk="python")
+        python.category_id = "systems"
+        python.save(update_fields=["category"])
+        self.assertEqual(self.ordered_ids(), ["cpp", "python", "go"])
+
+    def test_rebuild_repairs_queryset_updates(self):
+        Category.objects.filter(pk="systems").update(display_order=0)
+        self.assertEqual(self.ordered_ids(), ["go", "python", "cpp"])  # Stale
+
+        call_command("rebuild_competency_order", stdout=StringIO())
+        self.assertEqual(self.ordered_ids(), ["cpp", "go", "python"])
+        self.assertEqual(Competency.objects.rebuild_category_order(), 0)
+
+
+class RollupTests(AtlasFixtureTestCase):
+    def assert_matches_rebuild(self):
+        incremental = rollups.stats()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollups.stats())
+
+    def test_rollups_follow_writes(self):
+        month = f"{timezone.localdate():%Y-%m}"
+        self.assertEqual(
+            rollups.stats(),
+            {
+                "competency_usage": {"cpp": {"primary": 1}, "python": {"primary": 1}},
+                "artifacts_by_month": [
+                    {
+                        "month": month,
+                        "status": "in-progress",
+                        "complexity": "advanced",
+                        "artifacts": 1,
+                    }
+                ],
+                "artifacts_by_category": [
+                    {"category": "backend", "month": month, "artifacts": 1},
+                    {"category": "systems", "month": month, "artifacts": 1},
+                ],
+            },
+        )
+
+        artifact = Artifact.objects.get(pk="engineering-atlas")
+        artifact.competencies.add("go", through_defaults={"role": "supporting"})
+        artifact.competencies.remove("cpp")
+        link = ArtifactCompetency.objects.get(artifact=artifact, competency="python")
+        link.role = "secondary"
+        link.save()
+        artifact.status = "complete"
+        artifact.live_url = "https://example.com"
+        artifact.save(update_fields=["status", "live_url"])
+        self.add_artifact("other", ["cpp"])
+        python = Competency.objects.get(pk="python")
+        python.category_id = "systems"
+        python.save()
+
+        stats = rollups.stats()
+        self.assertEqual(
+            stats["competency_usage"],
+            {
+                "cpp": {"primary": 1},
+                "go": {"supporting": 1},
+                "python": {"secondary": 1},
+            },
+        )
+        self.assertEqual(
+            [(row["status"], row["artifacts"]) for row in stats["artifacts_by_month"]],
+            [("complete", 1), ("in-progress", 1)],
+        )
+        self.assertEqual(
+            [(r["category"], r["artifacts"]) for r in stats["artifacts_by_category"]],
+            [("backend", 1), ("systems", 2)],
+        )
+        self.assert_matches_rebuild()
+
+        Competency.objects.get(pk="cpp").delete()
+        artifact.delete()
+        self.assert_matches_rebuild()
+
+    def test_write_hooks_run_in_any_order(self):
+        # Receivers share no state, so reversing them changes nothing
+        self.addCleanup(post_save.sender_receivers_cache.clear)
+        self.addCleanup(setattr, post_save, "receivers", post_save.receivers)
+        post_save.receivers = post_save.receivers[::-1]
+        post_save.sender_receivers_cache.clear()
+
+        python = Competency.objects.get(pk="python")
+        python.category_id = "systems"
+        python.tags = ["Typing"]  # Not written by the first save
+        python.save(update_fields=["category"])
+        self.assertFalse(Technology.objects.filter(competency_count__gt=0).exists())
+        python.category_id = "backend"
+        python.history = [{"role": "Engineer", "company": "Atlas", "year": "2020"}]
+        python.save()
+
+        self.assert_matches_rebuild()
+        self.assertEqual(
+            list(Technology.objects.values_list("name", "competency_count")),
+            [("Typing", 1)],
+        )
+        self.assertEqual(python.experience.get().company, "Atlas")
+
+    def test_bulk_upsert_updates_rollups(self):
+        create_artifacts(
+            [
+                {
+                    "id": "engineering-atlas",
+                    "title": "Atlas",
+                    "status": "planned",
+                    "complexity": "beginner",
+                    "demo_type": "case-study",
+                    "description": "x",
+                    "competencies": [{"id": "go", "role": "primary"}],
+                },
+                {
+                    "title": "New",
+                    "complexity": "beginner",
+                    "demo_type": "case-study",
+                    "description": "x",
+                    "competencies": [{"id": "python", "role": "secondary"}],
+                },
+            ],
+            update_existing=True,
+        )
+        self.assertEqual(
+            rollups.stats()["competency_usage"],
+            {"go": {"primary": 1}, "python": {"secondary": 1}},
+        )
+        self.assert_matches_rebuild()
+
+    def test_stats_endpoint_reads_only_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["competency_usage"]["python"], {"primary": 1})
+        for query in queries.captured_queries:
+            self.assertNotIn('core_artifact"', query["sql"])
+            self.assertNotIn("core_artifactcompetency", query["sql"])
+
+
+class CentralityTests(AtlasFixtureTestCase):
+    def test_betweenness_matches_brandes_on_a_path(self):
+        from scipy import sparse
+
+        # 0 - 1 - 2 - 3 - 4: the middle node is on 4 of the 6 other pairs
+        edges = [(0, 1), (1, 2), (2, 3), (3, 4)]
+        adjacency = sparse.csr_matrix(
+            ([1.0] * 4, ([a for a, _ in edges], [b for _, b in edges])), shape=(5, 5)
+        )
+        structure = centrality.undirected(adjacency)
+        scores = centrality.betweenness_centrality(structure, batch=2)
+        self.assertEqual(list(scores.round(4)), [0, 0.5, 0.6667, 0.5, 0])
+        self.assertEqual(
+            list(centrality.degree_centrality(structure)), [0.25, 0.5, 0.5, 0.5, 0.25]
+        )
+        ranks, _ = centrality.pagerank(structure)
+        self.assertAlmostEqual(ranks.sum(), 1)
+        self.assertEqual(ranks.argmax(), 1)
+
+    def test_ranks_only_when_the_graph_changes(self):
+        self.assertIsNotNone(centrality.rank_competencies())
+        self.assertIsNone(centrality.rank_competencies())
+
+        python = Competency.objects.get(pk="python")
+        self.assertGreater(python.pagerank, 0)
+        self.assertEqual(python.degree_centrality, 1.0)  # Linked to everything
+
+        ArtifactCompetency.objects.filter(competency="cpp").update(role="secondary")
+        self.assertIsNotNone(centrality.rank_competencies())
+
+    def test_ordering_by_centrality(self):
+        centrality.rank_competencies()
+        response = self.client.get(
+            reverse("competency-list"), {"ordering": "centrality"}
+        )
+        ids = [row["id"] for row in response.data]
+        # cpp: linked from python and from the artifact
+        self.assertEqual(ids, ["cpp", "python", "go"])
+
+        response = self.client.get(reverse("competency-list"), {"ordering": "name"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SnapshotTests(AtlasFixtureTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "atlas.snapshot.zip"
+
+    def test_round_trip(self):
+        manifest = snapshots.export_snapshot(self.path)
+        rows = {entry["table"]: entry["rows"] for entry in manifest["tables"]}
+        self.assertEqual(rows["core_competency"], 3)
+        self.assertEqual(rows["core_competency_related_competencies"], 2)
+        self.assertEqual(rows["core_subcompetency_code_references"], 1)
+        self.assertNotIn("core_changelogentry", rows)
+        # Referenced tables come first
+        tables = list(rows)
+        self.assertLess(tables.index("core_category"), tables.index("core_competency"))
+
+        Artifact.objects.all().delete()
+        Competency.objects.filter(pk="go").update(name="Golang")
+        with self.assertRaises(snapshots.SnapshotError):
+            snapshots.restore_snapshot(self.path)
+
+        snapshots.restore_snapshot(self.path, replace=True)
+        self.assertEqual(Competency.objects.get(pk="go").name, "Go")
+        self.assertEqual(
+            list(
+                ArtifactCompetency.objects.order_by("competency").values_list(
+                    "artifact", "competency"
+                )
+            ),
+            [("engineering-atlas", "cpp"), ("engineering-atlas", "python")],
+        )
+        self.assertEqual(
+            Competency.objects.get(pk="python").related_competencies.count(), 2
+        )
+        # Sequences continue after the restored ids
+        reference = CommitCodeReference.objects.create(
+            commit_hash="b" * 40, file_path="core/snapshots.py", start_line=1
+        )
+        self.assertGreater(
+            reference.pk, CommitCodeReference.objects.get(commit_hash="a" * 40).pk
+        )
+
+    def test_restore_resets_change_tracking(self):
+        snapshots.export_snapshot(self.path)
+        cursor = stable_txid()
+        Competency.objects.filter(pk="go").update(name="Golang")
+        with mock.patch.object(snapshots, "queue_reset") as queue_reset:
+            snapshots.restore_snapshot(self.path, replace=True)
+        queue_reset.assert_called_once()
+
+        # Clients holding an older cursor start over, and so does warm_cache
+        self.assertIsNone(read_changes(cursor))
+        self.assertIsNone(warm_cache.Command().changed_routes(cursor))
+        self.assertEqual(
+            list(ChangeLogEntry.objects.values_list("op", flat=True)), ["prune"]
+        )
+
+    def test_rejects_other_archives(self):
+        with zipfile.ZipFile(self.path, "w") as archive:
+            archive.writestr("data.json", "[]")
+        with self.assertRaises(snapshots.SnapshotError):
+            snapshots.restore_snapshot(self.path)
+
+
+class SeedExportTests(AtlasFixtureTestCase):
+    def test_exports_what_seed_data_loads(self):
+        from .management.commands.seed_data import Command as SeedCommand
+
+        SubCompetency.objects.create(
+            parent_id="python", name="Async", desc="Await.", display_order=1
+        )
+        Competency.objects.filter(pk="python").update(showcase_priority="high")
+        with tempfile.TemporaryDirectory() as directory:
+            counts = seed_export.export_seeds(directory, chunk_size=2)
+            self.assertEqual(counts, {"competencies": 3, "artifacts": 1})
+            competencies = json.loads(Path(directory, "competencies.json").read_text())
+            artifacts = json.loads(Path(directory, "artifacts.json").read_text())
+
+            self.assertEqual(
+                [item["id"] for item in competencies], ["cpp", "go", "python"]
+            )
+            python = competencies[2]
+            self.assertEqual(python["category"], "Backend")
+            self.assertEqual(sorted(python["related_ids"]), ["cpp", "go"])
+            self.assertEqual(python["showcasePriority"], "high")
+            self.assertEqual(
+                [sub["name"] for sub in python["sub_competencies"]], ["Typing", "Async"]
+            )
+            self.assertEqual(
+                artifacts[0]["competencies"],
+                [{"id": "python", "role": "primary"}, {"id": "cpp", "role": "primary"}],
+            )
+
+            # Loading the export into an empty database gives the same export
+            Artifact.objects.all().delete()
+            Competency.objects.all().delete()
+            seed = SeedCommand(stdout=mock.Mock())
+            seed.seed_competencies(Path(directory, "competencies.json"))
+            seed.seed_artifacts(Path(directory, "artifacts.json"))
+            self.assertEqual(list(seed_export.competency_seeds()), competencies)
+            self.assertEqual(list(seed_export.artifact_seeds()), artifacts)
+
+    def test_export_seed_export_round_trip_is_unchanged(self):
+        from .management.commands.seed_data import Command as SeedCommand
+
+        with tempfile.TemporaryDirectory() as directory:
+            seed_export.export_seeds(directory)
+            # Curated values the database can't hold
+            path = Path(directory, "artifacts.json")
+            artifacts = json.loads(path.read_text())
+            artifacts[0]["date_created"] = "2025-02-01"
+            seed_export.write_json_array(path, artifacts)
+            before = {
+                name: Path(directory, name).read_bytes()
+                for name in ("competencies.json", "artifacts.json")
+            }
+
+            Artifact.objects.all().delete()
+            Competency.objects.all().delete()
+            seed = SeedCommand(stdout=mock.Mock())
+            seed.seed_competencies(Path(directory, "competencies.json"))
+            seed.seed_artifacts(path)
+            seed_export.export_seeds(directory)
+            for name, content in before.items():
+                self.assertEqual(Path(directory, name).read_bytes(), content, name)
+
+    def test_keeps_keys_the_database_doesnt_hold(self):
+        sub = SubCompetency.objects.get(parent_id="python")
+        previous = [
+            {"id": "python", "name": "Old", "atlas_demo": "/demo", "artifacts": ["a"]},
+            {"id": "retired", "name": "Gone", "atlas_demo": "/gone"},
+        ]
+        previous[0]["sub_competencies"] = [{"id": sub.pk, "code_anchor": "L1"}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory, "competencies.json")
+            path.write_text(json.dumps(previous))
+            seed_export.export_seeds(directory)
+            competencies = json.loads(path.read_text())
+
+        self.assertEqual([item["id"] for item in competencies], ["cpp", "go", "python"])
+        python = competencies[2]
+        self.assertEqual(list(python)[:3], ["id", "name", "atlas_demo"])
+        self.assertEqual((python["name"], python["artifacts"]), ("Python", ["a"]))
+        self.assertEqual(python["sub_competencies"][0]["code_anchor"], "L1")
+        self.assertEqual(python["sub_competencies"][0]["name"], "Typing")
+        self.assertNotIn("atlas_demo", competencies[0])
+
+
+class BinaryRendererTests(AtlasFixtureTestCase):
+    def fetch(self, url, accept):
+        response = self.client.get(url, HTTP_ACCEPT=accept)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], accept)
+        return response.content
+
+    def assert_same_as_json(self, accept, decode):
+        for url in [
+            reverse("competency-list"),
+            reverse("artifact-detail", args=["engineering-atlas"]),
+            reverse("bundle"),
+        ]:
+            expected = json.loads(self.client.get(url).content)
+            self.assertEqual(decode(self.fetch(url, accept)), expected)
+
+    @skipUnless(renderers.msgpack, "msgpack is not installed")
+    def test_msgpack(self):
+        self.assert_same_as_json("application/msgpack", renderers.msgpack.unpackb)
+
+    @skipUnless(renderers.cbor2, "cbor2 is not installed")
+    def test_cbor(self):
+        self.assert_same_as_json("application/cbor", renderers.cbor2.loads)
+
+    @skipUnless(renderers.msgpack, "msgpack is not installed")
+    def test_errors_use_the_negotiated_format(self):
+        response = self.client.get(
+            reverse("artifact-list"),
+            {"shape": "flat"},
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("shape", renderers.msgpack.unpackb(response.content))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class PrecompressedResponseTests(AtlasFixtureTestCase):
+    def test_negotiated_encodings(self):
+        url = reverse("competency-list")
+        plain = self.client.get(url)
+        self.assertNotIn("Content-Encoding", plain)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        for header in ("Accept", "Accept-Encoding"):
+            self.assertIn(header, response["Vary"])
+
+        preferred = next(iter(compression.ENCODERS))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br, zstd")
+        self.assertEqual(response["Content-Encoding"], preferred)
+
+    def test_compressed_once_per_cache_write(self):
+        calls = []
+
+        def counting_gzip(body):
+            calls.append(len(body))
+            return gzip.compress(body)
+
+        url = reverse("artifact-list")
+        with mock.patch.dict(compression.ENCODERS, {"gzip": counting_gzip}):
+            for _ in range(3):
+                self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        # JSON and MessagePack bodies (when installed), on the first request
+        self.assertEqual(len(calls), 2 if renderers.msgpack else 1)
+
+    def test_small_bodies_are_not_compressed(self):
+        url = reverse("category-detail", args=["backend"])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotIn("Accept-Encoding", response["Vary"])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, identity;q=0")
+        self.assertEqual(response.status_code, 406)
+
+    def test_browsable_api_is_rendered(self):
+        response = self.client.get(
+            reverse("competency-list"),
+            HTTP_ACCEPT="text/html",
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_accepted_encoding(self):
+        available = ["identity", "br", "zstd", "gzip"]
+        self.assertEqual(accepted_encoding("", available), "identity")
+        self.assertEqual(accepted_encoding("gzip;q=0.5, br;q=0.1", available), "gzip")
+        self.assertEqual(accepted_encoding("GZIP", ["identity"]), "identity")
+        self.assertEqual(accepted_encoding("*;q=0", ["identity", "gzip"]), None)
+        self.assertEqual(
+            accepted_encoding("*, identity;q=0", ["identity", "gzip"]), "gzip"
+        )
+
+
+class OpenApiSchemaTests(APITestCase):
+    def setUp(self):
+        prebuilt_schema.cache_clear()
+        self.addCleanup(prebuilt_schema.cache_clear)
+
+    def test_prebuilt_schema_is_served_as_is(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as schema:
+            schema.write(b'{"openapi": "3.0.3"}')
+            schema.flush()
+            with override_settings(OPENAPI_SCHEMA_FILE=Path(schema.name)):
+                response = self.client.get(reverse("schema"))
+        self.assertEqual(response.content, b'{"openapi": "3.0.3"}')
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi+json")
+
+    @override_settings(OPENAPI_SCHEMA_FILE=Path("/nonexistent/openapi.json"))
+    def test_generated_without_a_prebuilt_file(self):
+        response = self.client.get(reverse("schema"))
+        self.assertEqual(response.status_code, 200)
+        paths = json.loads(response.content)["paths"]
+        self.assertIn("/api/competencies/", paths)
+        # APIViews document their responses too
+        for path in ["/api/bundle/", "/api/stats/", "/api/sync/", "/api/search/"]:
+            content = paths[path]["get"]["responses"]["200"]["content"]
+            self.assertIn("$ref", content["application/json"]["schema"])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_INTERVAL_MS=1)
+class RequestProfilingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def slow_snapshot(self):
+        time.sleep(0.05)
+        return {}
+
+    def test_staff_profile_captures_the_view(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(metrics, "snapshot", self.slow_snapshot):
+            response = self.client.get(reverse("metrics") + "?profile=1")
+
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual(
+            (profile.trigger, profile.username, profile.status_code),
+            ("staff", "admin", 200),
+        )
+        self.assertGreater(profile.sample_count, 0)
+        self.assertIn("get (core/views.py:", profile.stacks)
+
+        url = reverse("admin:core_requestprofile_speedscope", args=[profile.pk])
+        document = json.loads(self.client.get(url).content)
+        frames = [frame["name"] for frame in document["shared"]["frames"]]
+        self.assertIn("slow_snapshot", frames)
+        self.assertEqual(
+            document["profiles"][0]["endValue"],
+            sum(document["profiles"][0]["weights"]),
+        )
+
+    def test_only_signed_or_staff_requests_are_profiled(self):
+        url = reverse("category-list")
+        self.assertNotIn("X-Profile-Id", self.client.get(url + "?profile=1"))
+        response = self.client.get(url, headers={"X-Profile": "forged"})
+        self.assertNotIn("X-Profile-Id", response)
+
+        response = self.client.get(url, headers={"X-Profile": profiling.make_token()})
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual((profile.trigger, profile.username), ("header", ""))
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_is_not_loaded(self):
+        headers = {"X-Profile": profiling.make_token()}
+        response = self.client.get(reverse("category-list"), headers=headers)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+
+class SlowQueryTests(APITestCase):
+    def test_fingerprint_ignores_values(self):
+        first = slow_queries.fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s) AND name = 'x' LIMIT 21"
+        )
+        second = slow_queries.fingerprint(
+            "SELECT *  FROM t WHERE id IN (%s) AND name = 'it''s' LIMIT 5"
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first[1], "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?"
+        )
+
+    def test_only_table_reads_are_explained(self):
+        sql, _ = Category.objects.filter(name__contains="end").query.sql_with_params()
+        self.assertTrue(slow_queries.explainable(sql))
+        self.assertTrue(
+            slow_queries.explainable('SELECT COUNT(*) FROM "core_category"')
+        )
+        for sql in [
+            "SELECT pg_advisory_xact_lock(hashtext(%s))",
+            "SELECT EXTRACT(year FROM now())",
+            "SELECT nextval('core_category_id_seq') FROM core_category",
+            'SELECT * FROM "core_category" FOR UPDATE',
+            'UPDATE "core_category" SET "name" = %s',
+        ]:
+            self.assertFalse(slow_queries.explainable(sql), sql)
+
+    def test_explain_is_rolled_back(self):
+        category = Category.objects.create(name="Backend", display_order=1)
+        slow_queries.explain(
+            'WITH renamed AS (UPDATE "core_category" SET "name" = %s RETURNING 1)'
+            " SELECT * FROM renamed",
+            ["Renamed"],
+        )
+        category.refresh_from_db()
+        self.assertEqual(category.name, "Backend")
+
+    @override_settings(SLOW_QUERY_LARGE_TABLE_ROWS=1)
+    def test_aggregated_with_a_sampled_plan(self):
+        for name in ["Backend", "Systems"]:
+            Category.objects.create(name=name, display_order=1)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_category")
+        query = Category.objects.filter(name__contains="end").query
+        sql, params = query.sql_with_params()
+
+        with mock.patch.object(
+            slow_queries, "explain", wraps=slow_queries.explain
+        ) as explain:
+            slow_queries.record_query(sql, params, 120)
+            slow_queries.record_query(sql, params, 80)
+        self.assertEqual(explain.call_count, 1)  # Once per interval
+
+        entry = SlowQuery.objects.get()
+        self.assertEqual((entry.calls, entry.total_ms, entry.max_ms), (2, 200, 120))
+        self.assertIn("Execution Time", entry.plan)  # ANALYZE
+        self.assertIn("Shared Hit Blocks", entry.plan["Plan"])  # BUFFERS
+        self.assertEqual(entry.seq_scan_tables, ["core_category"])
+
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "pw")
+        )
+        url = reverse("admin:core_slowquery_changelist")
+        self.assertContains(self.client.get(url + "?seq_scan=yes"), "core_category")
+
+    @override_settings(SLOW_QUERY_MS=0.001)
+    def test_slow_statements_are_recorded_off_the_request_thread(self):
+        with mock.patch.object(slow_queries, "record_query") as record:
+            with connection.execute_wrapper(slow_queries.time_query):
+                list(Category.objects.all())
+            wait(list(slow_queries._pending))
+        sql, params, duration_ms = record.call_args.args
+        self.assertIn('FROM "core_category"', sql)
+        self.assertGreater(duration_ms, 0)
+
+
+# The budget's own transaction is only used outside an enclosing one
+class QueryBudgetTests(APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        category = Category.objects.create(name="Backend", display_order=1)
+        Competency.objects.create(
+            id="python",
+            name="Python",
+            category=category,
+            competency_type="language",
+            proficiency="Expert",
+            summary="Primary language.",
+        )
+        self.url = reverse("competency-list")
+
+    def budget(self, **limits):
+        return mock.patch.object(
+            CompetencyViewSet, "query_budgets", {"list": QueryBudget(**limits)}
+        )
+
+    def statement_timeout(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            return cursor.fetchone()[0]
+
+    def test_slow_statement_is_cancelled(self):
+        slow = Competency.objects.extra(where=["pg_sleep(0.5) IS NOT NULL"])
+        with self.budget(statement_timeout_ms=50), mock.patch.object(
+            CompetencyViewSet, "get_queryset", lambda view: slow
+        ):
+            started = time.monotonic()
+            response = self.client.get(self.url)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(response.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+        self.assertEqual(
+            response["Retry-After"], str(settings.QUERY_BUDGET_RETRY_AFTER)
+        )
+        self.assertEqual(metrics.value("budget:statement_timeout"), 1)
+        # Scoped to the request's transaction
+        self.assertEqual(self.statement_timeout(), "0")
+
+    def test_query_count(self):
+        with self.budget(max_queries=1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(metrics.value("budget:queries", "CompetencyViewSet.list"), 1)
+        with self.budget(max_queries=10, db_time_ms=1000):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_enclosing_transaction_keeps_its_timeout(self):
+        with transaction.atomic(), self.budget(statement_timeout_ms=1500):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(self.statement_timeout(), "0")
+
+
+@skipUnless(settings.REDIS_URL, "REDIS_URL is not set")
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"cheap": "5/min", "expensive": "2/min"},
+    }
+)
+class ThrottleTests(AtlasFixtureTestCase):
+    def setUp(self):
+        super().setUp()
+        self.clear_buckets()
+        self.addCleanup(self.clear_buckets)
+        metrics.reset()
+
+    def clear_buckets(self):
+        client = throttling.get_script().registered_client
+        keys = list(client.scan_iter(f"{throttling.KEY_PREFIX}:*"))
+        if keys:
+            client.delete(*keys)
+
+    def test_search_has_its_own_smaller_budget(self):
+        url = reverse("artifact-list")
+        for _ in range(2):
+            response = self.client.get(url, {"search": "atlas"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, {"search": "other"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One token every 30 seconds
+        self.assertIn(int(response["Retry-After"]), range(29, 31))
+        self.assertEqual(metrics.value("throttled", "expensive"), 1)
+
+        # Cheap requests draw from another bucket
+        for params in ({}, {"ids": "engineering-atlas"}, {"shape": "normalized"}):
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        response = self.client.get(reverse("semantic-search"), {"q": "python"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_single_filters_are_cheap(self):
+        url = reverse("artifact-list")
+        for status_value in ["in-progress", "complete", "planned"]:
+            response = self.client.get(url, {"status": status_value})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for _ in range(2):
+            response = self.client.get(
+                url, {"status": "complete", "demo_type": "live-site"}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url, {"status": "planned", "demo_type": "live-site"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_warming_is_not_throttled(self):
+        warm_cache._start_worker("testserver")
+        route = (
+            CompetencyViewSet,
+            "retrieve",
+            reverse("competency-detail", args=["python"]),
+            {},
+        )
+        for _ in range(7):
+            self.assertEqual(warm_cache.render(route)[1], 200)
+
+    def test_buckets_refill(self):
+        url = reverse("competency-detail", args=["python"])
+        for _ in range(5):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 429)
+
+        # Twelve seconds later, one token is back
+        client = throttling.get_script().registered_client
+        for key in client.scan_iter(f"{throttling.KEY_PREFIX}:cheap:*"):
+            client.hincrby(key, "at", -12000)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 429)
+
+    def test_forwarded_for_headers_share_the_bucket(self):
+        url = reverse("competency-detail", args=["python"])
+        for n in range(5):
+            response = self.client.get(url, HTTP_X_FORWARDED_FOR=f"203.0.113.{n}")
+            self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_X_FORWARDED_FOR="198.51.100.7")
+        self.assertEqual(response.status_code, 429)
+
+    def test_lets_requests_through_when_redis_is_down(self):
+        from redis import ConnectionError
+
+        with (
+            mock.patch.object(throttling, "get_script", side_effect=ConnectionError),
+            self.assertLogs("core.throttling", "WARNING"),
+        ):
+            for _ in range(7):
+                response = self.client.get(reverse("competency-list"))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,159 @@
+"""
+Request throttling shared by every worker, so one client hammering uncached
+query variants can't take all of the database connections (pgbouncer has 20).
+
+Each client (user id, else IP) has a token bucket per scope in Redis. The
+IP is REMOTE_ADDR, or the X-Forwarded-For entry added by the last of
+REST_FRAMEWORK["NUM_PROXIES"] proxies, never one the client chose:
+
+- "cheap": detail views, bare lists, ?ids= lookups, lists filtered on one
+  filterset field (the routes warm_cache pre-renders), and everything else.
+- "expensive": ?search=, other parameters and combined filters (each new
+  combination is a cache miss), and semantic search.
+
+Rates come from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]: "600/min" is a
+bucket of 600 tokens refilled at 10 per second, so bursts up to the full
+bucket are allowed. Refill and take happen in one Lua script (one round trip,
+atomic across workers, timed by the Redis clock). Over budget: 429 with
+Retry-After, the time until the next token.
+
+Disabled when REDIS_URL is unset or THROTTLE_ENABLED is off. Requests are
+let through if Redis can't be reached: throttling protects the database,
+it shouldn't become a way to take the API down.
+"""
+
+import logging
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+from .events import REDIS_INSTALLED
+
+logger = logging.getLogger(__name__)
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+KEY_PREFIX = "atlas:throttle"
+
+# A check shouldn't hold a request up much longer than the query it guards
+REDIS_TIMEOUT = 0.1
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS[1]: bucket. ARGV: capacity, refill per millisecond.
+# Returns {allowed (0/1), milliseconds until the next token}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', now)
+-- Gone once it would be full again: idle clients cost nothing
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1000)
+return {allowed, wait}
+"""
+
+
+def throttling_enabled():
+    return settings.THROTTLE_ENABLED and bool(settings.REDIS_URL) and REDIS_INSTALLED
+
+
+_script = None
+
+
+def get_script():
+    """The registered script (EVALSHA, loaded on first NOSCRIPT)."""
+    global _script
+    if _script is None:
+        import redis
+
+        client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=REDIS_TIMEOUT,
+            socket_connect_timeout=REDIS_TIMEOUT,
+        )
+        _script = client.register_script(TOKEN_BUCKET_SCRIPT)
+    return _script
+
+
+def parse_rate(rate):
+    """ "600/min" -> (600 tokens, refilled per 60 seconds)."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class ThrottleScopeMixin:
+    """
+    Views pick their scope with `throttle_scope`. Lists are EXPENSIVE with a
+    query parameter outside `cheap_params` other than a single exact-match
+    filter from `filterset_fields` (search, ordering, combined filters).
+    """
+
+    throttle_scope = CHEAP
+    # Presentation only, or primary key lookups (?ids=)
+    cheap_params = frozenset({"format", "html", "shape", "ids"})
+
+    def get_throttle_scope(self, request):
+        if getattr(self, "action", None) == "list":
+            params = set(request.query_params) - self.cheap_params
+            filters = params & set(getattr(self, "filterset_fields", ()))
+            if params - filters or len(filters) > 1:
+                return EXPENSIVE
+        return self.throttle_scope
+
+
+class TokenBucketThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        self.delay = None
+        if not throttling_enabled():
+            return True
+
+        if hasattr(view, "get_throttle_scope"):
+            scope = view.get_throttle_scope(request)
+        else:
+            scope = getattr(view, "throttle_scope", CHEAP)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, seconds = parse_rate(rate)
+
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = self.get_ident(request)
+
+        from redis import RedisError
+
+        try:
+            allowed, delay_ms = get_script()(
+                keys=[f"{KEY_PREFIX}:{scope}:{ident}"],
+                args=[capacity, capacity / (seconds * 1000)],
+            )
+        except RedisError:
+            logger.warning("Throttle check failed; letting the request through")
+            return True
+        if allowed:
+            return True
+        metrics.increment("throttled", scope)
+        self.delay = delay_ms / 1000
+        return False
+
+    def wait(self):
+        # DRF rounds it up into the Retry-After header
+        return self.delay
@@ -0,0 +1,41 @@
+"""
+Helpers for work that must wait for the current transaction to commit.
+"""
+
+from django.db import connection, transaction
+
+
+class _CommitBatch:
+    def __init__(self, flush):
+        self.flush = flush
+        self.items = []
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.flush(self.items)
+
+
+def on_commit_batch(name, flush, items):
+    """
+    Queue `items` for `flush(all_items)`, called once when the current
+    transaction commits, so N writes in a transaction cost one flush.
+    Outside a transaction, flushes immediately. `flush` runs as a robust
+    callback: derived-data failures are logged rather than failing the write.
+    """
+    attr = f"_commit_batch_{name}"
+    batch = getattr(connection, attr, None)
+    queued = (
+        batch is not None
+        and not batch.done
+        and any(func is batch for _, func, _ in connection.run_on_commit)
+    )
+    if queued:
+        batch.items.extend(items)
+        return
+
+    # First call in this transaction (or the last one was rolled back)
+    batch = _CommitBatch(flush)
+    batch.items.extend(items)
+    setattr(connection, attr, batch)
+    transaction.on_commit(batch, robust=True)
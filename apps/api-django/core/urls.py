@@ -1,12 +1,32 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, CompetencyViewSet, ArtifactViewSet
+from .views import (
+    BundleView,
+    CategoryViewSet,
+    CompetencyViewSet,
+    ArtifactViewSet,
+    TechnologyViewSet,
+    MetricsView,
+    SemanticSearchView,
+    StatsView,
+    SyncView,
+    change_events,
+    openapi_schema,
+)
 
 router = DefaultRouter()
 router.register(r"categories", CategoryViewSet)
 router.register(r"competencies", CompetencyViewSet)
 router.register(r"artifacts", ArtifactViewSet)
+router.register(r"technologies", TechnologyViewSet)
 
 urlpatterns = [
+    path("search/", SemanticSearchView.as_view(), name="semantic-search"),
+    path("bundle/", BundleView.as_view(), name="bundle"),
+    path("events/", change_events, name="change-events"),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("stats/", StatsView.as_view(), name="stats"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("schema/", openapi_schema, name="schema"),
     path("", include(router.urls)),
 ]
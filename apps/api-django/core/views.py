@@ -1,4 +1,18 @@
-from rest_framework import viewsets, filters
+import hashlib
+import functools
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Exists, F, OuterRef, Q
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
+from pgvector.django import CosineDistance
+from rest_framework import viewsets, filters, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 # We try to import DjangoFilterBackend, but fallback if not installed
 try:
@@ -6,20 +20,315 @@ try:
 except ImportError:
     DjangoFilterBackend = None
 
-from .models import Competency, Artifact, Category
-from .serializers import CompetencySerializer, ArtifactSerializer, CategorySerializer
+from .budgets import QueryBudget, QueryBudgetMixin
+from .bulk import BatchValidationError, create_artifacts
+from .bundle import load_bundle
+from . import metrics
+from .cache import cached, coalesced
+from .compression import precompressed_response, represent
+from .embeddings import embed_query
+from .events import event_stream, events_enabled
+from .history import experience_timeline
+from .rollups import stats
+from .throttling import EXPENSIVE, ThrottleScopeMixin
+from .models import (
+    Competency,
+    CompetencyExperience,
+    Artifact,
+    Category,
+    SubCompetency,
+    Technology,
+)
+from .serializers import (
+    CompetencySerializer,
+    ArtifactSerializer,
+    BundleSerializer,
+    CategorySerializer,
+    CompetencyReferenceSerializer,
+    MetricsSerializer,
+    NormalizedArtifactSerializer,
+    NormalizedCompetencySerializer,
+    SemanticSearchSerializer,
+    StatsSerializer,
+    SubCompetencySerializer,
+    SyncSerializer,
+    TechnologySerializer,
+)
+from .sync import read_changes, stable_txid
+
+# Upper bound for ?ids= batch retrieval
+MAX_BATCH_IDS = 100
+
+# Database budgets (see budgets.py). Requests normally use a fraction of
+# them: 4-11 queries and under 15 ms of database time on the seed data.
+READ_BUDGET = QueryBudget(max_queries=20, statement_timeout_ms=3000, db_time_ms=5000)
+# Lists take ?search=, an unindexed LIKE over text and tag columns
+LIST_BUDGET = QueryBudget(max_queries=12, statement_timeout_ms=1500, db_time_ms=3000)
+# Bulk writes are few and big
+BATCH_BUDGET = QueryBudget(statement_timeout_ms=30000)
+
+# Upper bound for ?k= on similarity/search endpoints. Kept at or below the
+# HNSW ef_search default (40) so the index can always return k rows.
+MAX_NEIGHBOURS = 40
+
+
+def parse_k(request, default=5):
+    try:
+        k = int(request.query_params.get("k", default))
+    except ValueError:
+        k = default
+    return max(1, min(k, MAX_NEIGHBOURS))
+
+
+def nearest(queryset, vector, k):
+    """Top-k rows by cosine distance to `vector` (served by the HNSW index)."""
+    return (
+        queryset.filter(embedding__isnull=False)
+        .annotate(distance=CosineDistance("embedding", vector))
+        .order_by("distance")[:k]
+    )
+
+
+def with_similarity(serializer, scores):
+    data = serializer.data
+    for item, score in zip(data, scores):
+        item["similarity"] = round(score, 4)
+    return data
+
+
+class SimilarItemsMixin:
+    """Adds /<id>/similar/?k=5 (nearest neighbours by embedding)."""
+
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        rows, scores = self.get_similar(request, pk)
+        return Response(with_similarity(self.get_serializer(rows, many=True), scores))
+
+    def get_similar(self, request, pk):
+        """Returns (rows, similarity scores), best first."""
+        model = self.queryset.model
+        vectors = list(model.objects.filter(pk=pk).values_list("embedding", flat=True))
+        if not vectors:
+            raise Http404
+        if vectors[0] is None:
+            # Not embedded yet (see `manage.py update_embeddings`)
+            return [], []
+
+        rows = list(
+            nearest(self.get_queryset().exclude(pk=pk), vectors[0], parse_k(request))
+        )
+        return rows, [1 - row.distance for row in rows]
+
+
+def query_digest(request):
+    # Host included: pagination links are absolute
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return hashlib.sha1(f"{request.get_host()}?{query}".encode()).hexdigest()
+
+
+class CoalescedResponseMixin:
+    """
+    Serves list() and retrieve() through cache.coalesced(): per distinct
+    query, one request recomputes while concurrent ones wait for it or get
+    the stale copy. Entries go stale when `cache_namespace` is written
+    (see sync.py), and are stored pre-rendered and pre-compressed
+    (see compression.py).
+    """
+
+    cache_namespace = None
+
+    def cache_name(self, request, pk=None):
+        # "response:": entries are represent() results, not bare data
+        digest = query_digest(request)
+        if pk is None:
+            return f"response:list:{digest}"
+        return f"response:detail:{pk}:{digest}"
+
+    def cached_response(self, name, compute):
+        renderers = self.get_renderers()
+        representation = coalesced(
+            self.cache_namespace, name, lambda: represent(compute(), renderers)
+        )
+        return precompressed_response(self.request, representation)
+
+    def list(self, request, *args, **kwargs):
+        parent_list = super().list
+        return self.cached_response(
+            self.cache_name(request),
+            lambda: parent_list(request, *args, **kwargs).data,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        parent_retrieve = super().retrieve
+        return self.cached_response(
+            self.cache_name(request, kwargs[self.lookup_field]),
+            lambda: parent_retrieve(request, *args, **kwargs).data,
+        )
+
+
+class MultiGetMixin:
+    """Adds ?ids=a,b,c to list(): several rows in one request."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ids = self.request.query_params.get("ids")
+        if ids is None or self.action != "list":
+            return queryset
+
+        ids = [pk for pk in dict.fromkeys(ids.split(",")) if pk]
+        if len(ids) > MAX_BATCH_IDS:
+            raise ValidationError({"ids": f"At most {MAX_BATCH_IDS} ids per request."})
+        return queryset.filter(pk__in=ids)
+
+
+def response_shape(request):
+    """?shape= : "nested" (the default) or "normalized"."""
+    shape = request.query_params.get("shape", "nested")
+    if shape not in ("nested", "normalized"):
+        raise ValidationError({"shape": 'Expected "nested" or "normalized".'})
+    return shape
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+def entity_tables(competencies, categories=()):
+    """
+    {"categories": {id: category}, "competencies": {id: reference}} for the
+    given competencies and the categories they (and `categories`) point at.
+    """
+    competencies = {competency.pk: competency for competency in competencies}
+    loaded = {category.pk: category for category in categories}
+    for competency in competencies.values():
+        if Competency.category.is_cached(competency):
+            loaded[competency.category_id] = competency.category
+    missing = {c.category_id for c in competencies.values()} - loaded.keys()
+    if missing:
+        loaded.update(Category.objects.in_bulk(missing))
+
+    ordered = sorted(loaded.values(), key=lambda category: category.display_order)
+    return {
+        "categories": {
+            row["id"]: row for row in CategorySerializer(ordered, many=True).data
+        },
+        "competencies": {
+            row["id"]: row
+            for row in CompetencyReferenceSerializer(
+                sorted(competencies.values(), key=lambda c: c.pk), many=True
+            ).data
+        },
+    }
+
+
+class NormalizedResponseMixin:
+    """
+    Opt-in ?shape=normalized for list() and retrieve(): categories and
+    competencies nested in items are replaced by ids, and each is sent once
+    in an "entities" table next to the items:
+    {"results": [...], "entities": {"categories": {...}, "competencies": {...}}}
+    ({"result": {...}, ...} for a single item).
+
+    Views set `normalized_serializer_class` and define `referenced(rows)`,
+    which returns the (competencies, categories) that `rows` point at.
+    """
+
+    normalized_serializer_class = None
+
+    def is_normalized(self):
+        normalized = (
+            getattr(self, "request", None) is not None
+            and self.action in ("list", "retrieve")
+            and response_shape(self.request) == "normalized"
+        )
+        if normalized and (
+            self.normalized_serializer_class is None or not hasattr(self, "referenced")
+        ):
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} must set normalized_serializer_class "
+                "and define referenced() to serve ?shape=normalized."
+            )
+        return normalized
+
+    def get_serializer_class(self):
+        if self.is_normalized():
+            return self.normalized_serializer_class
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_normalized():
+            return super().list(request, *args, **kwargs)
+        rows = list(self.filter_queryset(self.get_queryset()))
+        return Response(
+            {
+                "results": self.get_serializer(rows, many=True).data,
+                "entities": entity_tables(*self.referenced(rows)),
+            }
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_normalized():
+            return super().retrieve(request, *args, **kwargs)
+        row = self.get_object()
+        return Response(
+            {
+                "result": self.get_serializer(row).data,
+                "entities": entity_tables(*self.referenced([row])),
+            }
+        )
+
+
+class CategoryViewSet(CoalescedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all().order_by("display_order")
     serializer_class = CategorySerializer
     pagination_class = None  # Return all categories in one shot (for menus)
+    cache_namespace = "categories"
 
 
-class CompetencyViewSet(viewsets.ReadOnlyModelViewSet):
+class TechnologyViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Technology dictionary with usage counts (for filters and autocomplete).
+    Supported params: /api/technologies?q=py&used_by=artifacts
+    """
+
+    queryset = Technology.objects.all()
+    serializer_class = TechnologySerializer
+    pagination_class = None
+    lookup_value_regex = "[^/]+"  # Names like "C++20" or "Node.js"
+
+    autocomplete_limit = 20
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        used_by = self.request.query_params.get("used_by")
+        if used_by == "artifacts":
+            queryset = queryset.filter(artifact_count__gt=0)
+        elif used_by == "competencies":
+            queryset = queryset.filter(competency_count__gt=0)
+
+        # Prefix autocomplete on the lowercased key (served by its LIKE index)
+        prefix = self.request.query_params.get("q")
+        if prefix and self.action == "list":
+            return queryset.filter(key__startswith=prefix.lower()).order_by(
+                "-artifact_count", "-competency_count", "name"
+            )[: self.autocomplete_limit]
+
+        return queryset
+
+
+class CompetencyViewSet(
+    ThrottleScopeMixin,
+    QueryBudgetMixin,
+    CoalescedResponseMixin,
+    NormalizedResponseMixin,
+    MultiGetMixin,
+    SimilarItemsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     API endpoint for Skills.
     Supported filters: /api/competencies?category=backend
+    Batch retrieval: /api/competencies?ids=python,cpp
+    Normalized payload: /api/competencies?shape=normalized
+    Experience filters: ?company=Mechdyne&role=...&year_from=2015&year_to=2020
+    Most central first (see centrality.py): ?ordering=centrality
     """
 
     queryset = (
@@ -29,10 +338,14 @@ class CompetencyViewSet(viewsets.ReadOnlyModelViewSet):
             "related_competencies",
         )
         .all()
-        .order_by("category__display_order", "name")
+        .order_by("category_display_order", "name", "id")
     )
 
     serializer_class = CompetencySerializer
+    normalized_serializer_class = NormalizedCompetencySerializer
+    cache_namespace = "competencies"
+    query_budget = READ_BUDGET
+    query_budgets = {"list": LIST_BUDGET}
 
     # Configure Filtering
     filter_backends = [filters.SearchFilter]
@@ -47,11 +360,82 @@ class CompetencyViewSet(viewsets.ReadOnlyModelViewSet):
 
     search_fields = ["name", "summary", "tags"]
 
+    # ?ordering= values; each is served by an index
+    orderings = {"centrality": ("-pagerank", "id")}
+    cheap_params = ThrottleScopeMixin.cheap_params | {"ordering"}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        ordering = params.get("ordering")
+        if ordering:
+            if ordering not in self.orderings:
+                raise ValidationError(
+                    {"ordering": f"Expected one of: {', '.join(self.orderings)}."}
+                )
+            queryset = queryset.order_by(*self.orderings[ordering])
+
+        # Exact matches use JSON containment (served by the jsonb_path_ops index)
+        entry = {key: params[key] for key in ("company", "role") if params.get(key)}
+        if entry:
+            queryset = queryset.filter(history__contains=[entry])
+
+        # Year ranges need the parsed years, on the same history entry
+        year_from = self.year_param("year_from")
+        year_to = self.year_param("year_to")
+        if year_from is not None or year_to is not None:
+            experience = CompetencyExperience.objects.filter(
+                competency=OuterRef("pk"), **entry
+            )
+            if year_from is not None:
+                # No end year means "Present", but only on a parsed entry:
+                # unparseable ones have no years at all
+                experience = experience.filter(
+                    Q(year_end__isnull=True, year_start__isnull=False)
+                    | Q(year_end__gte=year_from)
+                )
+            if year_to is not None:
+                experience = experience.filter(year_start__lte=year_to)
+            queryset = queryset.filter(Exists(experience))
 
-class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
+        return queryset
+
+    def referenced(self, rows):
+        related = [c for row in rows for c in row.related_competencies.all()]
+        return related, [row.category for row in rows]
+
+    def year_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        if not value.isdigit():
+            raise ValidationError({name: "Expected a year, e.g. 2015."})
+        return int(value)
+
+    @action(detail=False, methods=["get"], pagination_class=None)
+    def timeline(self, request):
+        """
+        Experience per company and period across all competencies.
+        Cached until the next competency write.
+        """
+        return Response(cached("competencies", "timeline", experience_timeline))
+
+
+class ArtifactViewSet(
+    ThrottleScopeMixin,
+    QueryBudgetMixin,
+    CoalescedResponseMixin,
+    NormalizedResponseMixin,
+    MultiGetMixin,
+    SimilarItemsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     API endpoint for Projects.
     Supported filters: /api/artifacts?tech_stack=Python
+    Batch retrieval: /api/artifacts?ids=engineering-atlas,portfolio
+    Normalized payload: /api/artifacts?shape=normalized
     """
 
     # Optimized QuerySet
@@ -64,6 +448,10 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
     )
 
     serializer_class = ArtifactSerializer
+    normalized_serializer_class = NormalizedArtifactSerializer
+    cache_namespace = "artifacts"
+    query_budget = READ_BUDGET
+    query_budgets = {"list": LIST_BUDGET, "batch": BATCH_BUDGET}
 
     filter_backends = [filters.SearchFilter]
     if DjangoFilterBackend:
@@ -72,6 +460,8 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
 
     search_fields = ["title", "description"]
 
+    max_batch_size = 1000
+
     def get_queryset(self):
         """
         Custom filtering for the ArrayField (tech_stack)
@@ -85,3 +475,284 @@ class ArtifactViewSet(viewsets.ReadOnlyModelViewSet):
             return queryset.filter(tech_stack__contains=[tech])
 
         return queryset
+
+    def referenced(self, rows):
+        links = [link for row in rows for link in row.artifactcompetency_set.all()]
+        return [link.competency for link in links], []
+
+    def get_similar(self, request, pk):
+        """
+        "Similar projects" from the precomputed ArtifactSimilarity table
+        (shared competencies weighted by role, plus tech stack).
+        ?method=semantic ranks by description embedding instead.
+        """
+        if request.query_params.get("method") == "semantic":
+            return super().get_similar(request, pk)
+
+        rows = list(
+            self.get_queryset()
+            .filter(similar_to__artifact_id=pk)
+            .annotate(similarity_score=F("similar_to__score"))
+            .order_by("similar_to__rank")[: parse_k(request)]
+        )
+        if not rows and not Artifact.objects.filter(pk=pk).exists():
+            raise Http404
+        return rows, [row.similarity_score for row in rows]
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="batch",
+        permission_classes=[permissions.DjangoModelPermissions],
+    )
+    def batch(self, request):
+        """
+        Bulk create: POST a list of artifacts (optionally with "competencies").
+        Slugs are allocated for the whole batch at once; nothing is written
+        unless every item validates.
+        """
+        items = request.data
+        if not isinstance(items, list) or not all(
+            isinstance(item, dict) for item in items
+        ):
+            return Response(
+                {"detail": "Expected a JSON list of artifact objects."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.max_batch_size:
+            return Response(
+                {"detail": f"Batches are limited to {self.max_batch_size} items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            created = create_artifacts(items)
+        except BatchValidationError as exc:
+            return Response({"errors": exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.queryset.filter(id__in=[obj.id for obj in created])
+        by_id = {obj.id: obj for obj in queryset}
+        serializer = self.get_serializer([by_id[obj.id] for obj in created], many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SemanticSearchView(QueryBudgetMixin, APIView):
+    """
+    Embedding-based search across the atlas.
+    Supported params: /api/search?q=event sourcing&type=artifacts&k=10
+    """
+
+    sources = {
+        "competencies": (
+            CompetencyViewSet.queryset,
+            CompetencySerializer,
+        ),
+        "sub_competencies": (
+            SubCompetency.objects.prefetch_related("code_references"),
+            SubCompetencySerializer,
+        ),
+        "artifacts": (
+            ArtifactViewSet.queryset,
+            ArtifactSerializer,
+        ),
+    }
+    serializer_class = SemanticSearchSerializer  # For the OpenAPI schema
+    query_budget = READ_BUDGET
+    throttle_scope = EXPENSIVE
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"detail": "The q parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        requested = request.query_params.get("type")
+        if requested and requested not in self.sources:
+            return Response(
+                {"detail": f"type must be one of: {', '.join(self.sources)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        vector = embed_query(query)
+        k = parse_k(request)
+        results = {}
+        for name, (queryset, serializer_class) in self.sources.items():
+            if requested and name != requested:
+                continue
+            rows = list(nearest(queryset.all(), vector, k))
+            serializer = serializer_class(rows, many=True, context={"request": request})
+            results[name] = with_similarity(serializer, [1 - r.distance for r in rows])
+        return Response(results)
+
+
+class BundleView(QueryBudgetMixin, APIView):
+    """
+    Categories, competencies and artifacts in one response: /api/bundle/
+    Same shapes as the list endpoints; loaded in a fixed number of queries
+    (see bundle.py). With ?shape=normalized, competencies and artifacts use
+    the normalized item shapes and refer by id to the bundle's own
+    categories and competencies.
+    """
+
+    serializer_class = BundleSerializer  # For the OpenAPI schema
+    query_budget = READ_BUDGET
+
+    def get(self, request):
+        if response_shape(request) == "normalized":
+            competency_serializer = NormalizedCompetencySerializer
+            artifact_serializer = NormalizedArtifactSerializer
+        else:
+            competency_serializer = CompetencySerializer
+            artifact_serializer = ArtifactSerializer
+
+        def compute():
+            categories, competencies, artifacts = load_bundle()
+            context = {"request": request}
+            return {
+                "categories": CategorySerializer(
+                    categories, many=True, context=context
+                ).data,
+                "competencies": competency_serializer(
+                    competencies, many=True, context=context
+                ).data,
+                "artifacts": artifact_serializer(
+                    artifacts, many=True, context=context
+                ).data,
+            }
+
+        namespaces = ("categories", "competencies", "artifacts")
+        renderers = self.get_renderers()
+        representation = coalesced(
+            namespaces,
+            f"response:bundle:{query_digest(request)}",
+            lambda: represent(compute(), renderers),
+        )
+        return precompressed_response(request, representation)
+
+
+class StatsView(QueryBudgetMixin, APIView):
+    """
+    Dashboard counts: /api/stats/
+    Artifacts per competency and role, per month by status and complexity,
+    and per category and month. Read from the rollup tables only (see
+    rollups.py), never from artifacts and their links.
+    """
+
+    serializer_class = StatsSerializer  # For the OpenAPI schema
+    query_budget = READ_BUDGET
+
+    def get(self, request):
+        return Response(stats())
+
+
+class SyncView(APIView):
+    """
+    Delta sync: /api/sync/?since=<cursor>
+    Returns the current state of every document changed after `since`
+    ("updated") and the ids of deleted ones ("deleted"), plus the next cursor.
+    Without `since`, returns only a starting cursor: take it BEFORE the
+    initial full download. 410 means the log no longer reaches back to
+    `since`; start over.
+    """
+
+    serializer_class = SyncSerializer  # For the OpenAPI schema
+    sources = {
+        "categories": (CategoryViewSet.queryset, CategorySerializer),
+        "competencies": (CompetencyViewSet.queryset, CompetencySerializer),
+        "artifacts": (ArtifactViewSet.queryset, ArtifactSerializer),
+    }
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        if since is None:
+            return Response(self.payload(stable_txid(), False, {}, {}))
+        if not since.isdigit():
+            raise ValidationError({"since": "Expected a cursor from a previous sync."})
+
+        changes = read_changes(int(since))
+        if changes is None:
+            return Response(
+                {"detail": "This cursor has expired; sync from scratch."},
+                status=status.HTTP_410_GONE,
+            )
+
+        cursor, has_more, changed = changes
+        updated, deleted = {}, {}
+        for name, (queryset, serializer_class) in self.sources.items():
+            rows = list(queryset.filter(pk__in=changed[name])) if changed[name] else []
+            serializer = serializer_class(rows, many=True, context={"request": request})
+            updated[name] = serializer.data
+            deleted[name] = sorted(changed[name] - {str(row.pk) for row in rows})
+        return Response(self.payload(cursor, has_more, updated, deleted))
+
+    def payload(self, cursor, has_more, updated, deleted):
+        return {
+            "cursor": cursor,
+            "has_more": has_more,
+            "updated": {name: updated.get(name, []) for name in self.sources},
+            "deleted": {name: deleted.get(name, []) for name in self.sources},
+        }
+
+
+class MetricsView(APIView):
+    """Cache counters for this server process (staff only): /api/metrics/"""
+
+    serializer_class = MetricsSerializer  # For the OpenAPI schema
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+async def change_events(request):
+    """
+    Server-Sent Events stream of change events: /api/events/
+    Resumes from the Last-Event-ID header (or ?last_event_id=) when the
+    replay buffer still covers it. Needs an ASGI server (config.asgi).
+    """
+    if not events_enabled():
+        return JsonResponse(
+            {"detail": "Change events are disabled (REDIS_URL is not set)."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    last_version = int(last_id) if last_id and last_id.isdigit() else None
+
+    response = StreamingHttpResponse(
+        event_stream(last_version), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Don't let nginx buffer the stream
+    return response
+
+
+@functools.cache
+def prebuilt_schema():
+    """The OPENAPI_SCHEMA_FILE contents, or None if it wasn't built."""
+    try:
+        return settings.OPENAPI_SCHEMA_FILE.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def openapi_schema(request):
+    """
+    OpenAPI document: /api/schema/
+    Served from the file built at deploy time (see OPENAPI_SCHEMA_FILE);
+    without it, generated on each request by drf-spectacular (development).
+    """
+    body = prebuilt_schema()
+    if body is not None:
+        return HttpResponse(body, content_type="application/vnd.oai.openapi+json")
+    if not apps.is_installed("drf_spectacular"):
+        return JsonResponse(
+            {"detail": "The OpenAPI schema wasn't built for this deployment."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    from drf_spectacular.views import SpectacularJSONAPIView
+
+    return SpectacularJSONAPIView.as_view()(request)
@@ -7,13 +7,19 @@
 
 import type {
   CompetencyNode,
+  SubCompetency,
   Artifact,
+  ArtifactSkill,
   Proficiency,
   CompetencyType,
   ArtifactStatus,
   ArtifactComplexity,
   DemoType,
+  EntityTables,
+  NormalizedArtifact,
+  NormalizedCompetencyNode,
 } from '@atlas/types';
+import { decodeResponse, WIRE_MEDIA_TYPES, type WireFormat } from './wire';
 
 // ============================================================
 // CONFIGURATION
@@ -22,6 +28,11 @@ import type {
 export interface ApiConfig {
   baseUrl: string;
   timeout?: number;
+  // Response encoding; the decoded data is the same. 'msgpack' responses are
+  // smaller and ~4x cheaper for the API to encode, but decoding them in JS
+  // is slower than the native JSON.parse: use it when server CPU or bytes
+  // on the wire are the bottleneck (e.g. build-time fetch loops).
+  wireFormat?: WireFormat;
 }
 
 let config: ApiConfig = {
@@ -65,6 +76,99 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+// Similarity endpoints add a cosine similarity (1 = identical) to each item
+export type Scored<T> = T & { similarity: number };
+
+export type SemanticSearchType = 'competencies' | 'sub_competencies' | 'artifacts';
+
+// /search/ returns one group per type (or only the requested one)
+export interface SemanticSearchResults {
+  competencies?: Scored<CompetencyNode>[];
+  sub_competencies?: Scored<SubCompetency>[];
+  artifacts?: Scored<Artifact>[];
+}
+
+// /competencies/timeline/: experience per company and period
+export interface CompetencyTimelineEntry {
+  company: string;
+  year_start: number | null;
+  year_end: number | null; // null while current ("Present")
+  competency_count: number;
+  roles: string[];
+  competencies: string[]; // competency ids
+}
+
+// /events/ (Server-Sent Events): one per write, after commit
+export type ChangeModel =
+  | 'category'
+  | 'competency'
+  | 'sub_competency'
+  | 'code_reference'
+  | 'artifact';
+
+export interface ChangeEvent {
+  model: ChangeModel;
+  id: string | number;
+  op: 'create' | 'update' | 'delete';
+  version: number;
+}
+
+// ?shape=normalized: nested categories/competencies become ids into `entities`
+export interface NormalizedList<T> {
+  results: T[];
+  entities: EntityTables;
+}
+
+export interface NormalizedItem<T> {
+  result: T;
+  entities: EntityTables;
+}
+
+// /bundle/: the three list endpoints in one response (same shapes)
+export interface AtlasBundle {
+  categories: Category[];
+  competencies: CompetencyNode[];
+  artifacts: Artifact[];
+}
+
+// /bundle/?shape=normalized: ids refer to the bundle's own categories/competencies
+export interface NormalizedAtlasBundle {
+  categories: Category[];
+  competencies: NormalizedCompetencyNode[];
+  artifacts: NormalizedArtifact[];
+}
+
+// /sync/?since=: documents changed after a cursor, plus deletion tombstones.
+// Without `since` only `cursor` is meaningful: take it before the initial
+// full download. ApiError 410 means the cursor expired: start over.
+export interface SyncResponse {
+  cursor: number;
+  has_more: boolean; // Call again with `cursor` straight away
+  updated: {
+    categories: Category[];
+    competencies: CompetencyNode[];
+    artifacts: Artifact[];
+  };
+  deleted: {
+    categories: string[];
+    competencies: string[];
+    artifacts: string[];
+  };
+}
+
+// /stats/: dashboard counts, maintained incrementally on the server.
+// Months are "YYYY-MM" (month created).
+export interface AtlasStats {
+  competency_usage: Record<string, Partial<Record<ArtifactSkill['role'], number>>>;
+  artifacts_by_month: {
+    month: string;
+    status: ArtifactStatus;
+    complexity: ArtifactComplexity;
+    artifacts: number;
+  }[];
+  artifacts_by_category: { category: string; month: string; artifacts: number }[];
+}
+
 // Category doesn't have pagination (pagination_class = None)
 export interface Category {
   id: number;
@@ -83,6 +187,12 @@ export interface CompetencyFilters {
   proficiency?: Proficiency;
   portfolio_highlight?: boolean;
   search?: string;
+  ordering?: 'centrality'; // most central in the skills graph first
+  // Experience filters (match within a single history entry)
+  company?: string;
+  role?: string;
+  year_from?: number;
+  year_to?: number;
 }
 
 export interface ArtifactFilters {
@@ -112,6 +222,7 @@ async function apiFetch<T>(
       signal: controller.signal,
       headers: {
         'Content-Type': 'application/json',
+        Accept: WIRE_MEDIA_TYPES[config.wireFormat ?? 'json'],
         ...options.headers,
       },
     });
@@ -121,14 +232,14 @@ async function apiFetch<T>(
     if (!response.ok) {
       let data: unknown;
       try {
-        data = await response.json();
+        data = await decodeResponse(response);
       } catch {
-        // Response body wasn't JSON
+        // Response body wasn't JSON (or the negotiated binary format)
       }
       throw new ApiError(response.status, response.statusText, url, data);
     }
 
-    return response.json();
+    return decodeResponse<T>(response);
   } catch (error) {
     clearTimeout(timeoutId);
     
@@ -189,6 +300,25 @@ export async function getCompetency(id: number | string): Promise<CompetencyNode
   return apiFetch<CompetencyNode>(`/competencies/${id}/`);
 }
 
+// One request for many competencies (e.g. a detail view's related skills).
+// At most 100 ids; unknown ids are skipped.
+export async function getCompetenciesByIds(ids: string[]): Promise<CompetencyNode[]> {
+  if (ids.length === 0) return [];
+  return apiFetch<CompetencyNode[]>(`/competencies/${buildQueryString({ ids: ids.join(',') })}`);
+}
+
+// Smaller payload: each category and linked competency is sent once
+export async function getNormalizedCompetencies(
+  filters?: CompetencyFilters
+): Promise<NormalizedList<NormalizedCompetencyNode>> {
+  const query = buildQueryString({ ...filters, shape: 'normalized' });
+  return apiFetch<NormalizedList<NormalizedCompetencyNode>>(`/competencies/${query}`);
+}
+
+export async function getCompetencyTimeline(): Promise<CompetencyTimelineEntry[]> {
+  return apiFetch<CompetencyTimelineEntry[]>('/competencies/timeline/');
+}
+
 export async function getCompetenciesByCategory(
   categoryId: number
 ): Promise<PaginatedResponse<CompetencyNode>> {
@@ -220,6 +350,18 @@ export async function getArtifact(id: number | string): Promise<Artifact> {
   return apiFetch<Artifact>(`/artifacts/${id}/`);
 }
 
+export async function getArtifactsByIds(ids: string[]): Promise<Artifact[]> {
+  if (ids.length === 0) return [];
+  return apiFetch<Artifact[]>(`/artifacts/${buildQueryString({ ids: ids.join(',') })}`);
+}
+
+export async function getNormalizedArtifacts(
+  filters?: ArtifactFilters
+): Promise<NormalizedList<NormalizedArtifact>> {
+  const query = buildQueryString({ ...filters, shape: 'normalized' });
+  return apiFetch<NormalizedList<NormalizedArtifact>>(`/artifacts/${query}`);
+}
+
 export async function getArtifactsByStatus(
   status: ArtifactStatus
 ): Promise<PaginatedResponse<Artifact>> {
@@ -238,6 +380,85 @@ export async function searchArtifacts(
   return getArtifacts({ search: query });
 }
 
+// ============================================================
+// SIMILARITY & SEMANTIC SEARCH (embedding-based)
+// ============================================================
+
+export async function getSimilarCompetencies(
+  id: string,
+  k?: number
+): Promise<Scored<CompetencyNode>[]> {
+  return apiFetch<Scored<CompetencyNode>[]>(
+    `/competencies/${id}/similar/${buildQueryString({ k })}`
+  );
+}
+
+// Default: precomputed "similar projects" (shared competencies + tech stack).
+// method 'semantic' ranks by description embedding instead.
+export async function getSimilarArtifacts(
+  id: string,
+  options: { k?: number; method?: 'features' | 'semantic' } = {}
+): Promise<Scored<Artifact>[]> {
+  return apiFetch<Scored<Artifact>[]>(
+    `/artifacts/${id}/similar/${buildQueryString(options)}`
+  );
+}
+
+export async function semanticSearch(
+  q: string,
+  options: { type?: SemanticSearchType; k?: number } = {}
+): Promise<SemanticSearchResults> {
+  return apiFetch<SemanticSearchResults>(`/search/${buildQueryString({ q, ...options })}`);
+}
+
+// ============================================================
+// BUNDLE (whole atlas in one request)
+// ============================================================
+
+export async function getBundle(): Promise<AtlasBundle> {
+  return apiFetch<AtlasBundle>('/bundle/');
+}
+
+export async function getNormalizedBundle(): Promise<NormalizedAtlasBundle> {
+  return apiFetch<NormalizedAtlasBundle>('/bundle/?shape=normalized');
+}
+
+// ============================================================
+// DELTA SYNC
+// ============================================================
+
+export async function getChanges(since?: number): Promise<SyncResponse> {
+  return apiFetch<SyncResponse>(`/sync/${buildQueryString({ since })}`);
+}
+
+// ============================================================
+// STATS
+// ============================================================
+
+export async function getStats(): Promise<AtlasStats> {
+  return apiFetch<AtlasStats>('/stats/');
+}
+
+// ============================================================
+// CHANGE EVENTS (Server-Sent Events)
+// ============================================================
+
+// EventSource reconnects by itself and resumes from the last event id.
+// onReset fires when the server can't replay the gap: refetch everything.
+export function subscribeToChanges(
+  onChange: (event: ChangeEvent) => void,
+  onReset?: () => void
+): () => void {
+  const source = new EventSource(`${config.baseUrl}/events/`);
+  source.addEventListener('change', (message) => {
+    onChange(JSON.parse((message as MessageEvent<string>).data));
+  });
+  if (onReset) {
+    source.addEventListener('reset', () => onReset());
+  }
+  return () => source.close();
+}
+
 // ============================================================
 // CONVENIENCE: FETCH ALL (handles pagination)
 // ============================================================
@@ -251,8 +472,10 @@ export async function getAllCompetencies(
   while (url) {
     // Handle both relative and absolute URLs from pagination
     const fullUrl = url.startsWith('http') ? url : `${config.baseUrl}${url}`;
-    const response = await fetch(fullUrl);
-    const data: PaginatedResponse<CompetencyNode> = await response.json();
+    const response = await fetch(fullUrl, {
+      headers: { Accept: WIRE_MEDIA_TYPES[config.wireFormat ?? 'json'] },
+    });
+    const data = await decodeResponse<PaginatedResponse<CompetencyNode>>(response);
     
     results.push(...data.results);
     
@@ -276,8 +499,10 @@ export async function getAllArtifacts(
   
   while (url) {
     const fullUrl = url.startsWith('http') ? url : `${config.baseUrl}${url}`;
-    const response = await fetch(fullUrl);
-    const data: PaginatedResponse<Artifact> = await response.json();
+    const response = await fetch(fullUrl, {
+      headers: { Accept: WIRE_MEDIA_TYPES[config.wireFormat ?? 'json'] },
+    });
+    const data = await decodeResponse<PaginatedResponse<Artifact>>(response);
     
     results.push(...data.results);
     
@@ -34,3 +34,11 @@ export {
   searchArtifacts,
   getAllArtifacts,
 } from './client';
+
+// Binary wire formats (ApiConfig.wireFormat)
+export {
+  decodeCbor,
+  decodeMsgpack,
+  decodeResponse,
+  type WireFormat,
+} from './wire';
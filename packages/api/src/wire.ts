@@ -0,0 +1,305 @@
+/**
+ * Decoders for the API's binary wire formats (MessagePack and CBOR).
+ *
+ * Only what the server's renderers emit is supported: maps, arrays,
+ * strings, numbers, booleans, null and byte strings. Dependency-free so the
+ * package stays usable in the browser, Node and edge runtimes alike.
+ */
+
+export type WireFormat = 'json' | 'msgpack' | 'cbor';
+
+export const WIRE_MEDIA_TYPES: Record<WireFormat, string> = {
+  json: 'application/json',
+  msgpack: 'application/msgpack',
+  cbor: 'application/cbor',
+};
+
+const utf8 = new TextDecoder();
+
+class Reader {
+  offset = 0;
+  readonly view: DataView;
+
+  constructor(readonly bytes: Uint8Array) {
+    this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  }
+
+  private take(length: number): number {
+    const start = this.offset;
+    if (start + length > this.bytes.length) {
+      throw new RangeError('Unexpected end of binary response');
+    }
+    this.offset += length;
+    return start;
+  }
+
+  u8(): number {
+    return this.view.getUint8(this.take(1));
+  }
+  u16(): number {
+    return this.view.getUint16(this.take(2));
+  }
+  u32(): number {
+    return this.view.getUint32(this.take(4));
+  }
+  // 64-bit integers beyond 2^53 lose precision, as they would in JSON.parse
+  u64(): number {
+    return Number(this.view.getBigUint64(this.take(8)));
+  }
+  i8(): number {
+    return this.view.getInt8(this.take(1));
+  }
+  i16(): number {
+    return this.view.getInt16(this.take(2));
+  }
+  i32(): number {
+    return this.view.getInt32(this.take(4));
+  }
+  i64(): number {
+    return Number(this.view.getBigInt64(this.take(8)));
+  }
+  f16(): number {
+    const half = this.u16();
+    const exponent = (half >> 10) & 0x1f;
+    const fraction = half & 0x3ff;
+    const sign = half & 0x8000 ? -1 : 1;
+    if (exponent === 0) return sign * 2 ** -14 * (fraction / 1024);
+    if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+    return sign * 2 ** (exponent - 15) * (1 + fraction / 1024);
+  }
+  f32(): number {
+    return this.view.getFloat32(this.take(4));
+  }
+  f64(): number {
+    return this.view.getFloat64(this.take(8));
+  }
+  raw(length: number): Uint8Array {
+    const start = this.take(length);
+    return this.bytes.subarray(start, start + length);
+  }
+  str(length: number): string {
+    const start = this.take(length);
+    const end = start + length;
+    // Keys and short values are mostly ASCII: skip TextDecoder's call overhead
+    if (length <= 64) {
+      let out = '';
+      let i = start;
+      while (i < end && this.bytes[i] < 0x80) out += String.fromCharCode(this.bytes[i++]);
+      if (i === end) return out;
+    }
+    return utf8.decode(this.bytes.subarray(start, end));
+  }
+}
+
+// ============================================================
+// MESSAGEPACK (https://github.com/msgpack/msgpack/blob/master/spec.md)
+// ============================================================
+
+function readMsgpack(r: Reader): unknown {
+  const byte = r.u8();
+
+  if (byte <= 0x7f) return byte; // positive fixint
+  if (byte >= 0xe0) return byte - 0x100; // negative fixint
+  if ((byte & 0xf0) === 0x80) return readMsgpackMap(r, byte & 0x0f);
+  if ((byte & 0xf0) === 0x90) return readMsgpackArray(r, byte & 0x0f);
+  if ((byte & 0xe0) === 0xa0) return r.str(byte & 0x1f);
+
+  switch (byte) {
+    case 0xc0:
+      return null;
+    case 0xc2:
+      return false;
+    case 0xc3:
+      return true;
+    case 0xc4:
+      return r.raw(r.u8()).slice();
+    case 0xc5:
+      return r.raw(r.u16()).slice();
+    case 0xc6:
+      return r.raw(r.u32()).slice();
+    case 0xca:
+      return r.f32();
+    case 0xcb:
+      return r.f64();
+    case 0xcc:
+      return r.u8();
+    case 0xcd:
+      return r.u16();
+    case 0xce:
+      return r.u32();
+    case 0xcf:
+      return r.u64();
+    case 0xd0:
+      return r.i8();
+    case 0xd1:
+      return r.i16();
+    case 0xd2:
+      return r.i32();
+    case 0xd3:
+      return r.i64();
+    case 0xd9:
+      return r.str(r.u8());
+    case 0xda:
+      return r.str(r.u16());
+    case 0xdb:
+      return r.str(r.u32());
+    case 0xdc:
+      return readMsgpackArray(r, r.u16());
+    case 0xdd:
+      return readMsgpackArray(r, r.u32());
+    case 0xde:
+      return readMsgpackMap(r, r.u16());
+    case 0xdf:
+      return readMsgpackMap(r, r.u32());
+  }
+  throw new TypeError(`Unsupported MessagePack type 0x${byte.toString(16)}`);
+}
+
+function readMsgpackArray(r: Reader, length: number): unknown[] {
+  const items = new Array(length);
+  for (let i = 0; i < length; i++) items[i] = readMsgpack(r);
+  return items;
+}
+
+function readMsgpackMap(r: Reader, length: number): Record<string, unknown> {
+  const map: Record<string, unknown> = {};
+  for (let i = 0; i < length; i++) {
+    const key = String(readMsgpack(r));
+    map[key] = readMsgpack(r);
+  }
+  return map;
+}
+
+// ============================================================
+// CBOR (RFC 8949)
+// ============================================================
+
+const CBOR_BREAK = Symbol('break');
+
+function readCborLength(r: Reader, info: number): number {
+  if (info < 24) return info;
+  switch (info) {
+    case 24:
+      return r.u8();
+    case 25:
+      return r.u16();
+    case 26:
+      return r.u32();
+    case 27:
+      return r.u64();
+  }
+  throw new TypeError(`Unsupported CBOR length encoding ${info}`);
+}
+
+function readCbor(r: Reader): unknown {
+  const byte = r.u8();
+  const major = byte >> 5;
+  const info = byte & 0x1f;
+
+  if (major === 7) {
+    switch (info) {
+      case 20:
+        return false;
+      case 21:
+        return true;
+      case 22:
+        return null;
+      case 23:
+        return undefined;
+      case 25:
+        return r.f16();
+      case 26:
+        return r.f32();
+      case 27:
+        return r.f64();
+      case 31:
+        return CBOR_BREAK;
+    }
+    throw new TypeError(`Unsupported CBOR simple value ${info}`);
+  }
+
+  const indefinite = info === 31 && major >= 2 && major <= 5;
+  const length = indefinite ? -1 : readCborLength(r, info);
+
+  switch (major) {
+    case 0:
+      return length;
+    case 1:
+      return -1 - length;
+    case 2:
+    case 3: {
+      if (indefinite) {
+        const chunks: unknown[] = [];
+        for (let chunk = readCbor(r); chunk !== CBOR_BREAK; chunk = readCbor(r)) {
+          chunks.push(chunk);
+        }
+        return major === 3 ? chunks.join('') : concatBytes(chunks as Uint8Array[]);
+      }
+      return major === 3 ? r.str(length) : r.raw(length).slice();
+    }
+    case 4: {
+      const items: unknown[] = [];
+      for (let i = 0; indefinite || i < length; i++) {
+        const item = readCbor(r);
+        if (item === CBOR_BREAK) break;
+        items.push(item);
+      }
+      return items;
+    }
+    case 5: {
+      const map: Record<string, unknown> = {};
+      for (let i = 0; indefinite || i < length; i++) {
+        const key = readCbor(r);
+        if (key === CBOR_BREAK) break;
+        map[String(key)] = readCbor(r);
+      }
+      return map;
+    }
+    default:
+      // Tag (major 6): the server doesn't emit any; keep the tagged value
+      return readCbor(r);
+  }
+}
+
+function concatBytes(chunks: Uint8Array[]): Uint8Array {
+  const out = new Uint8Array(chunks.reduce((size, chunk) => size + chunk.length, 0));
+  let offset = 0;
+  for (const chunk of chunks) {
+    out.set(chunk, offset);
+    offset += chunk.length;
+  }
+  return out;
+}
+
+// ============================================================
+// PUBLIC API
+// ============================================================
+
+function decodeWith(read: (r: Reader) => unknown, data: ArrayBuffer | Uint8Array): unknown {
+  const reader = new Reader(data instanceof Uint8Array ? data : new Uint8Array(data));
+  const value = read(reader);
+  if (reader.offset !== reader.bytes.length) {
+    throw new TypeError('Trailing bytes after the binary response body');
+  }
+  return value;
+}
+
+export function decodeMsgpack<T = unknown>(data: ArrayBuffer | Uint8Array): T {
+  return decodeWith(readMsgpack, data) as T;
+}
+
+export function decodeCbor<T = unknown>(data: ArrayBuffer | Uint8Array): T {
+  return decodeWith(readCbor, data) as T;
+}
+
+// Decodes a fetch Response by its Content-Type (JSON when it isn't binary)
+export async function decodeResponse<T>(response: Response): Promise<T> {
+  const contentType = response.headers.get('Content-Type') ?? '';
+  if (contentType.startsWith(WIRE_MEDIA_TYPES.msgpack)) {
+    return decodeMsgpack<T>(await response.arrayBuffer());
+  }
+  if (contentType.startsWith(WIRE_MEDIA_TYPES.cbor)) {
+    return decodeCbor<T>(await response.arrayBuffer());
+  }
+  return response.json() as Promise<T>;
+}
@@ -58,6 +58,7 @@ export interface SubCompetency {
   id: string;
   name: string;
   desc: string;
+  desc_html?: string; // only with ?html=true
   display_order: number;
   code_references: CodeReference[];
 }
@@ -91,6 +92,7 @@ export interface CompetencyNode {
   competency_type: CompetencyType;
   proficiency: Proficiency;
   summary: string;
+  summary_html?: string; // only with ?html=true
   tags: string[];
 
   sub_competencies: SubCompetency[];
@@ -120,6 +122,7 @@ export interface Artifact {
   complexity: ArtifactComplexity;
   demo_type: DemoType;
   description: string;
+  description_html?: string; // only with ?html=true
   tech_stack: string[]; // array of strings
 
   repo_url: string;
@@ -129,3 +132,28 @@ export interface Artifact {
 
   competencies: ArtifactSkill[]; // the sorted list of badges
 }
+
+// --- NORMALIZED SHAPES (?shape=normalized) ---
+
+// matches CompetencyReferenceSerializer (entity table entries)
+export interface CompetencyReference extends CompetencyLink {
+  category: string; // id into the categories table
+}
+
+// matches NormalizedCompetencySerializer
+export interface NormalizedCompetencyNode
+  extends Omit<CompetencyNode, 'category' | 'related_competencies'> {
+  category: string;
+  related_competencies: string[];
+}
+
+// matches NormalizedArtifactSerializer
+export interface NormalizedArtifact extends Omit<Artifact, 'competencies'> {
+  competencies: { id: string; role: ArtifactSkill['role'] }[];
+}
+
+// each category and competency referenced by the items, once
+export interface EntityTables {
+  categories: Record<string, CompetencyNode['category']>;
+  competencies: Record<string, CompetencyReference>;
+}